@@ -0,0 +1,119 @@
+"""add checkout_loan function
+
+Revision ID: 9c4e2b7f1a05
+Revises: 3f1c9a7d2b64
+Create Date: 2026-10-18 10:02:41.730915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c4e2b7f1a05'
+down_revision: Union[str, Sequence[str], None] = '3f1c9a7d2b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Frozen copy of app.db.functions.CHECKOUT_LOAN at this revision
+CHECKOUT_LOAN = """
+CREATE OR REPLACE FUNCTION checkout_loan(
+    p_user_id integer,
+    p_book_id integer,
+    p_max_active integer,
+    p_loan_days integer
+) RETURNS TABLE (
+    status text,
+    active integer,
+    attempts integer,
+    loan_id integer,
+    copy_id integer,
+    loaned_at timestamptz,
+    due_to timestamptz
+) LANGUAGE plpgsql AS $$
+#variable_conflict use_column
+DECLARE
+    v_copy_id integer;
+    v_taken integer[] := '{}';
+BEGIN
+    active := 0;
+    attempts := 0;
+
+    IF NOT EXISTS (SELECT 1 FROM books b WHERE b.id = p_book_id) THEN
+        status := 'book_not_found';
+        RETURN NEXT;
+        RETURN;
+    END IF;
+
+    PERFORM 1 FROM users u WHERE u.id = p_user_id FOR UPDATE;
+    IF NOT FOUND THEN
+        status := 'user_not_found';
+        RETURN NEXT;
+        RETURN;
+    END IF;
+
+    SELECT count(*) INTO active
+    FROM loans l
+    WHERE l.user_id = p_user_id AND l.returned_at IS NULL;
+
+    IF active >= p_max_active THEN
+        status := 'max_active_loans_exceeded';
+        RETURN NEXT;
+        RETURN;
+    END IF;
+
+    LOOP
+        SELECT c.id INTO v_copy_id
+        FROM book_copies c
+        WHERE c.book_id = p_book_id
+          AND NOT EXISTS (
+              SELECT 1 FROM loans l
+              WHERE l.copy_id = c.id AND l.returned_at IS NULL
+          )
+          AND c.id <> ALL (v_taken)
+        LIMIT 1
+        FOR UPDATE OF c SKIP LOCKED;
+
+        IF NOT FOUND THEN
+            status := 'no_copies_available';
+            RETURN NEXT;
+            RETURN;
+        END IF;
+
+        attempts := attempts + 1;
+
+        BEGIN
+            INSERT INTO loans (user_id, copy_id, due_to, fine_cents, version)
+            VALUES (
+                p_user_id,
+                v_copy_id,
+                now() + make_interval(days => p_loan_days),
+                0,
+                1
+            )
+            RETURNING loans.id, loans.copy_id, loans.loaned_at, loans.due_to
+            INTO loan_id, copy_id, loaned_at, due_to;
+
+            status := 'created';
+            RETURN NEXT;
+            RETURN;
+        EXCEPTION WHEN unique_violation THEN
+            v_taken := v_taken || v_copy_id;
+        END;
+    END LOOP;
+END;
+$$
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(CHECKOUT_LOAN)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP FUNCTION IF EXISTS checkout_loan(integer, integer, integer, integer)")
@@ -0,0 +1,244 @@
+"""add users active_loans counter
+
+Revision ID: e7a1d5c3b9f2
+Revises: 9c4e2b7f1a05
+Create Date: 2026-10-18 11:27:03.551804
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a1d5c3b9f2'
+down_revision: Union[str, Sequence[str], None] = '9c4e2b7f1a05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Frozen copy of app.db.functions.CHECKOUT_LOAN at this revision
+CHECKOUT_LOAN = """
+CREATE OR REPLACE FUNCTION checkout_loan(
+    p_user_id integer,
+    p_book_id integer,
+    p_max_active integer,
+    p_loan_days integer
+) RETURNS TABLE (
+    status text,
+    active integer,
+    attempts integer,
+    loan_id integer,
+    copy_id integer,
+    loaned_at timestamptz,
+    due_to timestamptz
+) LANGUAGE plpgsql AS $$
+#variable_conflict use_column
+DECLARE
+    v_copy_id integer;
+    v_taken integer[] := '{}';
+BEGIN
+    active := 0;
+    attempts := 0;
+
+    IF NOT EXISTS (SELECT 1 FROM books b WHERE b.id = p_book_id) THEN
+        status := 'book_not_found';
+        RETURN NEXT;
+        RETURN;
+    END IF;
+
+    UPDATE users u SET active_loans = u.active_loans + 1
+    WHERE u.id = p_user_id AND u.active_loans < p_max_active
+    RETURNING u.active_loans INTO active;
+
+    IF NOT FOUND THEN
+        SELECT u.active_loans INTO active FROM users u WHERE u.id = p_user_id;
+        IF NOT FOUND THEN
+            status := 'user_not_found';
+            active := 0;
+        ELSE
+            status := 'max_active_loans_exceeded';
+        END IF;
+        RETURN NEXT;
+        RETURN;
+    END IF;
+
+    LOOP
+        SELECT c.id INTO v_copy_id
+        FROM book_copies c
+        WHERE c.book_id = p_book_id
+          AND NOT EXISTS (
+              SELECT 1 FROM loans l
+              WHERE l.copy_id = c.id AND l.returned_at IS NULL
+          )
+          AND c.id <> ALL (v_taken)
+        LIMIT 1
+        FOR UPDATE OF c SKIP LOCKED;
+
+        IF NOT FOUND THEN
+            UPDATE users u SET active_loans = u.active_loans - 1
+            WHERE u.id = p_user_id
+            RETURNING u.active_loans INTO active;
+            status := 'no_copies_available';
+            RETURN NEXT;
+            RETURN;
+        END IF;
+
+        attempts := attempts + 1;
+
+        BEGIN
+            INSERT INTO loans (user_id, copy_id, due_to, fine_cents, version)
+            VALUES (
+                p_user_id,
+                v_copy_id,
+                now() + make_interval(days => p_loan_days),
+                0,
+                1
+            )
+            RETURNING loans.id, loans.copy_id, loans.loaned_at, loans.due_to
+            INTO loan_id, copy_id, loaned_at, due_to;
+
+            status := 'created';
+            RETURN NEXT;
+            RETURN;
+        EXCEPTION WHEN unique_violation THEN
+            v_taken := v_taken || v_copy_id;
+        END;
+    END LOOP;
+END;
+$$
+"""
+
+# The function as of 9c4e2b7f1a05, restored on downgrade
+PREVIOUS_CHECKOUT_LOAN = """
+CREATE OR REPLACE FUNCTION checkout_loan(
+    p_user_id integer,
+    p_book_id integer,
+    p_max_active integer,
+    p_loan_days integer
+) RETURNS TABLE (
+    status text,
+    active integer,
+    attempts integer,
+    loan_id integer,
+    copy_id integer,
+    loaned_at timestamptz,
+    due_to timestamptz
+) LANGUAGE plpgsql AS $$
+#variable_conflict use_column
+DECLARE
+    v_copy_id integer;
+    v_taken integer[] := '{}';
+BEGIN
+    active := 0;
+    attempts := 0;
+
+    IF NOT EXISTS (SELECT 1 FROM books b WHERE b.id = p_book_id) THEN
+        status := 'book_not_found';
+        RETURN NEXT;
+        RETURN;
+    END IF;
+
+    PERFORM 1 FROM users u WHERE u.id = p_user_id FOR UPDATE;
+    IF NOT FOUND THEN
+        status := 'user_not_found';
+        RETURN NEXT;
+        RETURN;
+    END IF;
+
+    SELECT count(*) INTO active
+    FROM loans l
+    WHERE l.user_id = p_user_id AND l.returned_at IS NULL;
+
+    IF active >= p_max_active THEN
+        status := 'max_active_loans_exceeded';
+        RETURN NEXT;
+        RETURN;
+    END IF;
+
+    LOOP
+        SELECT c.id INTO v_copy_id
+        FROM book_copies c
+        WHERE c.book_id = p_book_id
+          AND NOT EXISTS (
+              SELECT 1 FROM loans l
+              WHERE l.copy_id = c.id AND l.returned_at IS NULL
+          )
+          AND c.id <> ALL (v_taken)
+        LIMIT 1
+        FOR UPDATE OF c SKIP LOCKED;
+
+        IF NOT FOUND THEN
+            status := 'no_copies_available';
+            RETURN NEXT;
+            RETURN;
+        END IF;
+
+        attempts := attempts + 1;
+
+        BEGIN
+            INSERT INTO loans (user_id, copy_id, due_to, fine_cents, version)
+            VALUES (
+                p_user_id,
+                v_copy_id,
+                now() + make_interval(days => p_loan_days),
+                0,
+                1
+            )
+            RETURNING loans.id, loans.copy_id, loans.loaned_at, loans.due_to
+            INTO loan_id, copy_id, loaned_at, due_to;
+
+            status := 'created';
+            RETURN NEXT;
+            RETURN;
+        EXCEPTION WHEN unique_violation THEN
+            v_taken := v_taken || v_copy_id;
+        END;
+    END LOOP;
+END;
+$$
+"""
+
+BACKFILL = """
+UPDATE users u SET active_loans = (
+    SELECT count(*) FROM loans l
+    WHERE l.user_id = u.id AND l.returned_at IS NULL
+)
+"""
+
+# The old checkout counted then inserted without a lock, so a user may hold
+# more loans than ck_user_active_loans_range allows; those must be returned
+# by hand before the constraint can exist
+OVER_LIMIT = """
+SELECT user_id, count(*) AS active
+FROM loans
+WHERE returned_at IS NULL
+GROUP BY user_id
+HAVING count(*) > 3
+ORDER BY user_id
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    over_limit = op.get_bind().execute(sa.text(OVER_LIMIT)).all()
+    if over_limit:
+        found = ", ".join(f"user {row.user_id} ({row.active})" for row in over_limit)
+        raise RuntimeError(f"return loans of users over 3 active loans: {found}")
+
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.add_column('users', sa.Column('active_loans', sa.Integer(), server_default='0', nullable=False))
+    # ### end Alembic commands ###
+    op.execute(BACKFILL)
+    op.create_check_constraint('ck_user_active_loans_range', 'users', 'active_loans >= 0 AND active_loans <= 3')
+    op.execute(CHECKOUT_LOAN)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(PREVIOUS_CHECKOUT_LOAN)
+    op.drop_constraint('ck_user_active_loans_range', 'users', type_='check')
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_column('users', 'active_loans')
+    # ### end Alembic commands ###
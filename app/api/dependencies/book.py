@@ -4,8 +4,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.dependencies.cache import get_book_cache
 from app.api.dependencies.db import get_db_async_session
 from app.cache.book import BookCache
+from app.db.pool import get_raw_pool
 from app.repositories.book import BookRepository
 from app.repositories.book_copy import BookCopyRepository
+from app.repositories.raw import RawBookRepository
 from app.services.book import BookService
 
 
@@ -14,6 +16,8 @@ def book_service() -> BookService:
         s: AsyncSession = get_db_async_session(),
         c: BookCache = get_book_cache(),
     ) -> BookService:
-        return BookService(BookRepository(s), BookCopyRepository(s), c)
+        pool = get_raw_pool("books")
+        books = BookRepository(s) if pool is None else RawBookRepository(s, pool)
+        return BookService(books, BookCopyRepository(s), c)
 
     return Depends(service)
@@ -1,11 +1,19 @@
 from fastapi import Depends
 
 from app.cache.book import BookCache
-from app.cache.client import get_redis_client
+from app.cache.registry import get_cache_registry
+from app.cache.user import UserCache
 
 
 def get_book_cache() -> BookCache:
     def get_book_cache() -> BookCache:
-        return BookCache(get_redis_client())
+        return get_cache_registry().books
 
     return Depends(get_book_cache)
+
+
+def get_user_cache() -> UserCache:
+    def get_user_cache() -> UserCache:
+        return get_cache_registry().users
+
+    return Depends(get_user_cache)
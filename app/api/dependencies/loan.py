@@ -1,21 +1,28 @@
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.dependencies.cache import get_user_cache
 from app.api.dependencies.db import get_db_async_session
-from app.repositories.book import BookRepository
-from app.repositories.book_copy import BookCopyRepository
+from app.cache.user import UserCache
+from app.db.pool import get_raw_pool
 from app.repositories.loan import LoanRepository
+from app.repositories.raw import RawLoanRepository, RawUserRepository
 from app.repositories.user import UserRepository
 from app.services.loan import LoanService
 
 
 def loan_service() -> LoanService:
-    def service(s: AsyncSession = get_db_async_session()) -> LoanService:
-        return LoanService(
-            LoanRepository(s),
-            UserRepository(s),
-            BookRepository(s),
-            BookCopyRepository(s),
+    def service(
+        s: AsyncSession = get_db_async_session(),
+        c: UserCache = get_user_cache(),
+    ) -> LoanService:
+        loan_pool, user_pool = get_raw_pool("loans"), get_raw_pool("users")
+        loans = (
+            LoanRepository(s) if loan_pool is None else RawLoanRepository(s, loan_pool)
         )
+        users = (
+            UserRepository(s) if user_pool is None else RawUserRepository(s, user_pool)
+        )
+        return LoanService(loans, users, c)
 
     return Depends(service)
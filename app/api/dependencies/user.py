@@ -1,13 +1,22 @@
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.dependencies.cache import get_user_cache
 from app.api.dependencies.db import get_db_async_session
+from app.cache.user import UserCache
+from app.db.pool import get_raw_pool
+from app.repositories.raw import RawUserRepository
 from app.repositories.user import UserRepository
 from app.services.user import UserService
 
 
 def user_service() -> UserService:
-    def service(s: AsyncSession = get_db_async_session()) -> UserService:
-        return UserService(UserRepository(s))
+    def service(
+        s: AsyncSession = get_db_async_session(),
+        c: UserCache = get_user_cache(),
+    ) -> UserService:
+        pool = get_raw_pool("users")
+        users = UserRepository(s) if pool is None else RawUserRepository(s, pool)
+        return UserService(users, c)
 
     return Depends(service)
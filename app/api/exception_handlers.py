@@ -7,6 +7,7 @@ from app.exceptions.domain import (
     BookAlreadyExists,
     BookNotFound,
     EmailAlreadyRegistered,
+    InvalidCursor,
     LoanAlreadyReturned,
     LoanConcurrentModification,
     LoanNotFound,
@@ -18,6 +19,7 @@ from app.exceptions.domain import (
 logger = structlog.get_logger("sgbd.api.exceptions")
 
 ERROR_MAP = {
+    InvalidCursor: (status.HTTP_400_BAD_REQUEST, "Invalid pagination cursor"),
     UserNotFound: (status.HTTP_404_NOT_FOUND, "User not found"),
     BookNotFound: (status.HTTP_404_NOT_FOUND, "Book not found"),
     LoanNotFound: (status.HTTP_404_NOT_FOUND, "Loan not found"),
@@ -3,14 +3,28 @@ from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.dependencies import get_db_async_session
+from app.cache.breaker import CircuitState
+from app.cache.client import get_redis_client
 
 router = APIRouter(tags=["health"])
 
 
+def _redis_status() -> dict[str, str | int]:
+    redis = get_redis_client()
+    if redis is None:
+        return {"status": "disabled"}
+
+    breaker = redis.breaker
+    status = "ok" if breaker.state is CircuitState.CLOSED else "unavailable"
+    return {"status": status, "circuit": breaker.state, "failures": breaker.failures}
+
+
 @router.get("/health", include_in_schema=False)
 async def health(session: AsyncSession = get_db_async_session()):
     try:
         await session.execute(text("SELECT 1"))
-        return {"status": "ok", "database": "ok"}
     except Exception:
         raise HTTPException(status_code=503, detail="Database unavailable") from None
+
+    # Redis is optional: an open circuit degrades the cache, not the service
+    return {"status": "ok", "database": "ok", "redis": _redis_status()}
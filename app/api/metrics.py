@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.cache import metrics
+from app.cache.registry import get_cache_registry
+
+router = APIRouter(tags=["metrics"])
+
+CONTENT_TYPE: str = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", include_in_schema=False)
+async def cache_metrics():
+    body = metrics.render(get_cache_registry().caches)
+    return PlainTextResponse(body, media_type=CONTENT_TYPE)
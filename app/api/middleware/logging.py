@@ -17,7 +17,7 @@ class LoggingMiddleware(BaseHTTPMiddleware):
         self.logger = structlog.get_logger("sgbd.api.http")
 
     async def dispatch(self, request: Request, call_next) -> Response:
-        if request.url.path == "/health":
+        if request.url.path in ("/health", "/metrics"):
             return await call_next(request)
 
         request_id = request.headers.get(REQUEST_ID_HEADER) or str(uuid.uuid4())
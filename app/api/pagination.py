@@ -0,0 +1,96 @@
+import base64
+import binascii
+import json
+from collections.abc import Callable, Sequence
+from datetime import datetime
+from typing import Any
+
+import orjson
+from fastapi import Query, Response
+from sqlalchemy import Row
+
+from app.db.pool import Record
+from app.exceptions.domain import InvalidCursor
+from app.schemas.page import Page
+from app.schemas.wire import WireModel
+
+MAX_PAGE_SIZE: int = 100
+
+# Ids are Postgres ``integer`` columns: larger values fail as bind parameters
+INT4_MIN: int = -(2**31)
+INT4_MAX: int = 2**31 - 1
+
+# A cursor holds the sort key of the last row of a page: (id), (due_to, id)
+# or (loaned_at, id)
+type CursorType = type[int] | type[datetime]
+
+
+def page_size(default: int) -> Any:
+    """``limit`` query parameter, capped at ``MAX_PAGE_SIZE``."""
+    return Query(default, ge=1, le=MAX_PAGE_SIZE)
+
+
+def encode_cursor(key: Sequence[int | datetime]) -> str:
+    values = [v.isoformat() if isinstance(v, datetime) else v for v in key]
+    data = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str | None, *types: CursorType) -> tuple[Any, ...] | None:
+    """Decode a cursor made by ``encode_cursor`` into a key of ``types``."""
+    if cursor is None:
+        return None
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError("wrong cursor arity")
+        return tuple(_decode_value(t, v) for t, v in zip(types, values, strict=True))
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError) as exc:
+        raise InvalidCursor(cursor=cursor) from exc
+
+
+def decode_id_cursor(cursor: str | None) -> int | None:
+    key = decode_cursor(cursor, int)
+    return None if key is None else key[0]
+
+
+def _decode_value(kind: CursorType, value: Any) -> int | datetime:
+    if kind is int and isinstance(value, int) and not isinstance(value, bool):
+        if not INT4_MIN <= value <= INT4_MAX:
+            raise ValueError(f"cursor value {value} is out of the integer range")
+        return value
+    if kind is datetime and isinstance(value, str):
+        parsed = datetime.fromisoformat(value)
+        if parsed.tzinfo is None:
+            raise ValueError("naive cursor timestamp")
+        return parsed
+    raise ValueError(f"cursor value {value!r} is not {kind.__name__}")
+
+
+def paginate[T: WireModel](
+    model: type[T],
+    rows: Sequence[Row[Any]] | Sequence[Record],
+    limit: int,
+    key: Callable[[Any], Sequence[int | datetime]],
+) -> Page[T] | Response:
+    """Build a page of ``model`` from up to ``limit + 1`` rows; the extra one
+    signals more.
+
+    Rows are column projections holding ``model``'s fields. They are validated
+    in one pass by pydantic-core, reading plain row attributes; FastAPI then
+    passes the returned instance through ``response_model`` as is.
+
+    Records from the raw asyncpg path (``app.repositories.raw``) already hold
+    the wire values: they skip validation and are encoded straight to JSON.
+    """
+    items = rows[:limit]
+    more = len(rows) > limit
+    next_cursor = encode_cursor(key(items[-1])) if more else None
+    if items and isinstance(items[0], Record):
+        page = {"items": [dict(item) for item in items], "next_cursor": next_cursor}
+        # UTC as "Z", like pydantic, so both paths send identical bodies
+        body = orjson.dumps(page, option=orjson.OPT_UTC_Z)
+        return Response(body, media_type="application/json")
+    return Page[model].model_validate({"items": items, "next_cursor": next_cursor})
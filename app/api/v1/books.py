@@ -1,23 +1,31 @@
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Response, status
 
 from app.api.dependencies import book_service
+from app.api.pagination import decode_id_cursor, page_size, paginate
 from app.schemas.book import BookCreate, BookResponse
 from app.schemas.book_copy import BookCopyResponse
+from app.schemas.page import Page
 from app.services.book import BookService
 
 router = APIRouter(prefix="/books", tags=["books"])
 
 
-@router.get("", response_model=list[BookResponse])
+@router.get("", response_model=Page[BookResponse])
 async def list_books(
-    offset: int = 0, limit: int = 50, books: BookService = book_service()
+    cursor: str | None = None,
+    limit: int = page_size(50),
+    books: BookService = book_service(),
 ):
-    return await books.list_all(offset=offset, limit=limit)
+    after = decode_id_cursor(cursor)
+    rows = await books.list_all(after=after, limit=limit + 1)
+    return paginate(BookResponse, rows, limit, lambda book: (book.id,))
 
 
 @router.get("/{book_id}", response_model=BookResponse)
 async def get_book(book_id: int, books: BookService = book_service()):
-    return await books.get_by_id(book_id=book_id)
+    # The cached entry carries the encoded BookResponse; skip re-validation
+    book = await books.get_by_id(book_id=book_id)
+    return Response(book.body, media_type="application/json")
 
 
 @router.post("", response_model=BookResponse, status_code=status.HTTP_201_CREATED)
@@ -1,7 +1,12 @@
+from datetime import datetime
+
 from fastapi import APIRouter, status
 
 from app.api.dependencies import loan_service
+from app.api.pagination import decode_cursor, page_size, paginate
+from app.db.models.loan import LoanStatus
 from app.schemas.loan import LoanCreate, LoanResponse
+from app.schemas.page import Page
 from app.services.loan import LoanService
 
 router = APIRouter(prefix="/loans", tags=["loans"])
@@ -12,23 +17,41 @@ async def create_loan(loan: LoanCreate, loans: LoanService = loan_service()):
     return await loans.create(user_id=loan.user_id, book_id=loan.book_id)
 
 
-@router.get("/users/{user_id}", response_model=list[LoanResponse])
-async def list_loans_by_user(user_id: int, loans: LoanService = loan_service()):
-    return await loans.list_by_user(user_id)
+@router.get("/users/{user_id}", response_model=Page[LoanResponse])
+async def list_loans_by_user(
+    user_id: int,
+    status: LoanStatus | None = None,
+    cursor: str | None = None,
+    limit: int = page_size(50),
+    loans: LoanService = loan_service(),
+):
+    after = decode_cursor(cursor, datetime, int)
+    rows = await loans.list_by_user(
+        user_id, status=status, after=after, limit=limit + 1
+    )
+    return paginate(LoanResponse, rows, limit, lambda loan: (loan.loaned_at, loan.id))
 
 
-@router.get("/active", response_model=list[LoanResponse])
+@router.get("/active", response_model=Page[LoanResponse])
 async def list_active_loans(
-    offset: int = 0, limit: int = 50, loans: LoanService = loan_service()
+    cursor: str | None = None,
+    limit: int = page_size(50),
+    loans: LoanService = loan_service(),
 ):
-    return await loans.list_active(offset=offset, limit=limit)
+    after = decode_cursor(cursor, datetime, int)
+    rows = await loans.list_active(after=after, limit=limit + 1)
+    return paginate(LoanResponse, rows, limit, lambda loan: (loan.due_to, loan.id))
 
 
-@router.get("/overdue", response_model=list[LoanResponse])
+@router.get("/overdue", response_model=Page[LoanResponse])
 async def list_overdue_loans(
-    offset: int = 0, limit: int = 50, loans: LoanService = loan_service()
+    cursor: str | None = None,
+    limit: int = page_size(50),
+    loans: LoanService = loan_service(),
 ):
-    return await loans.list_overdue(offset=offset, limit=limit)
+    after = decode_cursor(cursor, datetime, int)
+    rows = await loans.list_overdue(after=after, limit=limit + 1)
+    return paginate(LoanResponse, rows, limit, lambda loan: (loan.due_to, loan.id))
 
 
 @router.post("/{loan_id}/return", response_model=LoanResponse)
@@ -1,28 +1,52 @@
-from fastapi import APIRouter, status
+from datetime import datetime
 
+from fastapi import APIRouter, Response, status
+
+from app.api.dependencies.loan import loan_service
 from app.api.dependencies.user import user_service
+from app.api.pagination import decode_cursor, decode_id_cursor, page_size, paginate
+from app.db.models.loan import LoanStatus
 from app.schemas.loan import LoanResponse
+from app.schemas.page import Page
 from app.schemas.user import UserCreate, UserResponse
+from app.services.loan import LoanService
 from app.services.user import UserService
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 
-@router.get("", response_model=list[UserResponse])
+@router.get("", response_model=Page[UserResponse])
 async def list_users(
-    offset: int = 0, limit: int = 10, users: UserService = user_service()
+    cursor: str | None = None,
+    limit: int = page_size(10),
+    users: UserService = user_service(),
 ):
-    return await users.list_all(offset=offset, limit=limit)
+    after = decode_id_cursor(cursor)
+    rows = await users.list_all(after=after, limit=limit + 1)
+    return paginate(UserResponse, rows, limit, lambda user: (user.id,))
 
 
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user(user_id: int, users: UserService = user_service()):
-    return await users.get_by_id(user_id)
-
-
-@router.get("/{user_id}/loans", response_model=list[LoanResponse])
-async def get_user_loans(user_id: int, users: UserService = user_service()):
-    return await users.get_loans(user_id)
+    user = await users.get_by_id(user_id)
+    # The cached entry carries the encoded UserResponse; skip re-validation
+    return Response(user.body, media_type="application/json")
+
+
+@router.get("/{user_id}/loans", response_model=Page[LoanResponse])
+async def get_user_loans(
+    user_id: int,
+    status: LoanStatus | None = None,
+    cursor: str | None = None,
+    limit: int = page_size(50),
+    loans: LoanService = loan_service(),
+):
+    # Same listing as GET /loans/users/{user_id}
+    after = decode_cursor(cursor, datetime, int)
+    rows = await loans.list_by_user(
+        user_id, status=status, after=after, limit=limit + 1
+    )
+    return paginate(LoanResponse, rows, limit, lambda loan: (loan.loaned_at, loan.id))
 
 
 @router.post("", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
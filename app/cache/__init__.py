@@ -1,4 +1,14 @@
-from app.cache.book import BookCache
+from app.cache.book import BookCache, CachedBook
 from app.cache.client import get_redis_client
+from app.cache.registry import CacheRegistry, get_cache_registry
+from app.cache.user import CachedUser, UserCache
 
-__all__ = ["BookCache", "get_redis_client"]
+__all__ = [
+    "BookCache",
+    "CachedBook",
+    "CacheRegistry",
+    "CachedUser",
+    "UserCache",
+    "get_cache_registry",
+    "get_redis_client",
+]
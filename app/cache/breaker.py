@@ -0,0 +1,164 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from enum import StrEnum
+from typing import Any, Self
+
+import structlog
+from redis.asyncio import Redis
+from redis.asyncio.client import Pipeline, PubSub
+
+from app.cache.config import (
+    CACHE_BREAKER_PROBE_INTERVAL,
+    CACHE_BREAKER_THRESHOLD,
+    CACHE_REDIS_TIMEOUT,
+)
+
+logger = structlog.get_logger("sgbd.cache.breaker")
+
+
+class CircuitOpenError(ConnectionError):
+    """Raised instead of calling Redis while the circuit is open."""
+
+
+class CircuitState(StrEnum):
+    CLOSED = "closed"
+    OPEN = "open"
+
+
+class CircuitBreaker:
+    """Fails fast once a dependency keeps failing, until a probe succeeds.
+
+    Each call is bounded by ``timeout``. After ``threshold`` consecutive
+    failures the circuit opens: calls raise ``CircuitOpenError`` without
+    being attempted, while a background task runs ``probe`` every
+    ``probe_interval`` seconds and closes the circuit on its first success.
+    """
+
+    def __init__(
+        self,
+        probe: Callable[[], Awaitable[object]],
+        *,
+        threshold: int = CACHE_BREAKER_THRESHOLD,
+        timeout: float = CACHE_REDIS_TIMEOUT,
+        probe_interval: float = CACHE_BREAKER_PROBE_INTERVAL,
+    ):
+        self._probe = probe
+        self.threshold = threshold
+        self.timeout = timeout
+        self.probe_interval = probe_interval
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self._probing: asyncio.Task[None] | None = None
+
+    async def call[T](self, fn: Callable[[], Awaitable[T]]) -> T:
+        if self.state is CircuitState.OPEN:
+            raise CircuitOpenError("circuit open")
+
+        try:
+            async with asyncio.timeout(self.timeout):
+                result = await fn()
+        except Exception:
+            self._failed()
+            raise
+
+        self.failures = 0
+        return result
+
+    async def close(self) -> None:
+        if self._probing is not None:
+            self._probing.cancel()
+            try:
+                await self._probing
+            except asyncio.CancelledError:
+                pass
+            self._probing = None
+
+    def _failed(self) -> None:
+        self.failures += 1
+        if self.state is CircuitState.OPEN or self.failures < self.threshold:
+            return
+
+        self.state = CircuitState.OPEN
+        logger.warning("circuit_opened", failures=self.failures)
+        self._probing = asyncio.create_task(self._probe_until_closed())
+
+    async def _probe_until_closed(self) -> None:
+        while self.state is CircuitState.OPEN:
+            await asyncio.sleep(self.probe_interval)
+            try:
+                async with asyncio.timeout(self.timeout):
+                    await self._probe()
+            except Exception:
+                logger.debug("circuit_probe_failed", exc_info=True)
+                continue
+
+            self.state = CircuitState.CLOSED
+            self.failures = 0
+            logger.info("circuit_closed")
+        self._probing = None
+
+
+class GuardedPipeline:
+    """Pipeline whose round trip goes through the circuit breaker."""
+
+    def __init__(self, pipe: Pipeline, breaker: CircuitBreaker):
+        self._pipe = pipe
+        self._breaker = breaker
+
+    async def __aenter__(self) -> Self:
+        await self._pipe.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self._pipe.__aexit__(*exc)
+
+    def __getattr__(self, name: str) -> Any:
+        # Queuing commands is local; only execute talks to Redis
+        return getattr(self._pipe, name)
+
+    async def execute(self) -> list[Any]:
+        return await self._breaker.call(self._pipe.execute)
+
+
+class GuardedRedis:
+    """The subset of the Redis client used by the cache, behind a breaker."""
+
+    def __init__(self, redis: Redis, breaker: CircuitBreaker | None = None):
+        self._redis = redis
+        self.breaker = breaker or CircuitBreaker(redis.ping)
+
+    async def get(self, key: str) -> Any:
+        return await self.breaker.call(lambda: self._redis.get(key))
+
+    async def mget(self, keys: list[str]) -> list[Any]:
+        return await self.breaker.call(lambda: self._redis.mget(keys))
+
+    async def set(
+        self, key: str, value: Any, ex: int | None = None, nx: bool = False
+    ) -> Any:
+        return await self.breaker.call(
+            lambda: self._redis.set(key, value, ex=ex, nx=nx)
+        )
+
+    async def delete(self, *keys: str) -> int:
+        return await self.breaker.call(lambda: self._redis.delete(*keys))
+
+    async def publish(self, channel: str, message: str) -> int:
+        return await self.breaker.call(lambda: self._redis.publish(channel, message))
+
+    def pipeline(self, transaction: bool = True) -> GuardedPipeline:
+        return GuardedPipeline(
+            self._redis.pipeline(transaction=transaction), self.breaker
+        )
+
+    def pubsub(self) -> PubSub:
+        # Long-lived subscription with its own reconnect loop, not per-call
+        return self._redis.pubsub()
+
+    async def aclose(self) -> None:
+        await self.breaker.close()
+        await self._redis.aclose()
+
+
+# What the caches accept: the guarded client in the app, a bare one in tests
+type RedisClient = Redis | GuardedRedis
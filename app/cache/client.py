@@ -4,12 +4,13 @@ from typing import cast
 import structlog
 from redis.asyncio import ConnectionPool, Redis
 
+from app.cache.breaker import GuardedRedis
 from app.cache.config import REDIS_HOST, REDIS_PORT
 
 logger = structlog.get_logger("sgbd.cache.client")
 
 _pool: ConnectionPool | None = None
-_client: Redis | None = None
+_client: GuardedRedis | None = None
 
 
 async def init_redis() -> None:
@@ -19,10 +20,12 @@ async def init_redis() -> None:
         _pool = ConnectionPool.from_url(
             f"redis://{REDIS_HOST}:{REDIS_PORT}",
             max_connections=10,
-            decode_responses=True,
+            decode_responses=False,  # Cache payloads are binary
         )
-        _client = Redis(connection_pool=_pool)
-        await cast(Awaitable[bool], _client.ping())
+        redis = Redis(connection_pool=_pool)
+        await cast(Awaitable[bool], redis.ping())
+        # Commands fail fast while Redis keeps failing; see CircuitBreaker
+        _client = GuardedRedis(redis)
         logger.info("redis_connected", host=REDIS_HOST, port=REDIS_PORT)
     except Exception:
         logger.warning("redis_unavailable", host=REDIS_HOST, port=REDIS_PORT)
@@ -43,5 +46,5 @@ async def close_redis() -> None:
         _pool = None
 
 
-def get_redis_client() -> Redis | None:
+def get_redis_client() -> GuardedRedis | None:
     return _client
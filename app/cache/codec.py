@@ -0,0 +1,70 @@
+import json
+from typing import Any, Protocol
+
+import orjson
+
+
+class CodecError(ValueError):
+    pass
+
+
+class Codec(Protocol):
+    """Encodes cache payloads to bytes, tagged with a one-byte codec id."""
+
+    id: int
+    name: str
+
+    def encode(self, value: Any) -> bytes: ...
+
+    def decode(self, data: bytes) -> Any: ...
+
+
+class JsonCodec:
+    id: int = 1
+    name: str = "json"
+
+    def encode(self, value: Any) -> bytes:
+        return json.dumps(value, separators=(",", ":")).encode()
+
+    def decode(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec:
+    id: int = 2
+    name: str = "orjson"
+
+    def encode(self, value: Any) -> bytes:
+        return orjson.dumps(value)
+
+    def decode(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+
+CODECS: dict[int, Codec] = {codec.id: codec for codec in (JsonCodec(), OrjsonCodec())}
+
+
+def get_codec(name: str) -> Codec:
+    for codec in CODECS.values():
+        if codec.name == name:
+            return codec
+    raise ValueError(f"unknown cache codec: {name}")
+
+
+def pack(codec: Codec, value: Any) -> bytes:
+    return bytes((codec.id,)) + codec.encode(value)
+
+
+def unpack(data: bytes) -> Any:
+    """Decode a payload with whichever codec wrote it."""
+    if not data:
+        raise CodecError("empty payload")
+
+    codec = CODECS.get(data[0])
+    if codec is None:
+        raise CodecError(f"unknown codec id: {data[0]}")
+
+    try:
+        return codec.decode(data[1:])
+    except ValueError as exc:
+        raise CodecError(str(exc)) from exc
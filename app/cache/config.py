@@ -3,6 +3,28 @@ import os
 REDIS_HOST: str = os.environ.get("REDIS_HOST", "localhost")
 REDIS_PORT: int = int(os.environ.get("REDIS_PORT", "6379"))
 
-CACHE_REDIS_TTL: int = 300  # 5 minutes
-CACHE_MEMORY_TTL: int = 60  # 60 seconds
+# Entries are served as fresh for CACHE_FRESH_TTL; after that they are still
+# served (stale) until the tier TTL expires while a refresh runs in background.
+CACHE_FRESH_TTL: int = 300  # 5 minutes
+CACHE_REDIS_TTL: int = 900  # 15 minutes
+CACHE_MEMORY_TTL: int = 900  # 15 minutes, evicted early via pub/sub
 CACHE_MEMORY_MAXSIZE: int = 1000
+# In-memory eviction: "lru" (TTLCache) or "tinylfu" (scan-resistant W-TinyLFU)
+CACHE_MEMORY_POLICY: str = os.environ.get("CACHE_MEMORY_POLICY", "lru")
+CACHE_NEGATIVE_TTL: int = 30  # Tombstones for ids not found in the database
+CACHE_XFETCH_BETA: float = 1.0  # > 1 favors earlier refreshes
+
+# Startup warm-up of the most loaned books; CACHE_WARMUP_SIZE=0 disables it
+CACHE_WARMUP_SIZE: int = int(os.environ.get("CACHE_WARMUP_SIZE", "500"))
+CACHE_WARMUP_WINDOW_DAYS: int = 30
+CACHE_WARMUP_TIMEOUT: float = 5.0  # seconds
+
+CACHE_CODEC: str = os.environ.get("CACHE_CODEC", "orjson")  # orjson | json
+
+CACHE_INVALIDATION_CHANNEL: str = "sgbd:cache:invalidate"
+
+# Every Redis command gets CACHE_REDIS_TIMEOUT; after CACHE_BREAKER_THRESHOLD
+# consecutive failures Redis is skipped until a background PING succeeds.
+CACHE_REDIS_TIMEOUT: float = float(os.environ.get("CACHE_REDIS_TIMEOUT", "0.05"))
+CACHE_BREAKER_THRESHOLD: int = 5
+CACHE_BREAKER_PROBE_INTERVAL: float = 1.0  # seconds
@@ -0,0 +1,457 @@
+import asyncio
+import math
+import random
+import time
+from collections.abc import Awaitable, Callable, Iterable, Sequence
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, ClassVar, Final, Protocol, Self
+
+import structlog
+from redis.exceptions import RedisError
+
+from app.cache.breaker import CircuitOpenError, RedisClient
+from app.cache.codec import Codec, CodecError, get_codec, pack, unpack
+from app.cache.config import (
+    CACHE_CODEC,
+    CACHE_FRESH_TTL,
+    CACHE_MEMORY_MAXSIZE,
+    CACHE_MEMORY_POLICY,
+    CACHE_MEMORY_TTL,
+    CACHE_NEGATIVE_TTL,
+    CACHE_REDIS_TTL,
+    CACHE_XFETCH_BETA,
+)
+from app.cache.invalidation import InvalidationBus
+from app.cache.metrics import CacheMetrics, MeteredTTLCache
+from app.cache.singleflight import SingleFlight
+from app.cache.tinylfu import TinyLFUCache
+
+logger = structlog.get_logger("sgbd.cache.entity")
+
+
+class CachedValue(Protocol):
+    """Immutable snapshot of an entity, with its pre-encoded response body."""
+
+    id: int
+    body: bytes
+
+    def to_row(self) -> list[Any]: ...
+
+    @classmethod
+    def from_row(cls, row: Sequence[Any]) -> Self: ...
+
+
+class Tombstone(Enum):
+    NOT_FOUND = "not_found"
+
+
+# Returned by EntityCache.get for ids recently confirmed absent from the database
+NOT_FOUND: Final = Tombstone.NOT_FOUND
+
+
+@dataclass(frozen=True, slots=True)
+class _Entry[V]:
+    value: V | None  # None marks a tombstone
+    fresh_until: float  # Soft expiry (epoch seconds); hard expiry is the tier TTL
+    delta: float  # Seconds the last load took, scales the early refresh window
+
+    def is_fresh(self, now: float, beta: float = CACHE_XFETCH_BETA) -> bool:
+        if self.value is None:
+            return now < self.fresh_until
+        # XFetch: the closer to the soft expiry and the slower the load, the
+        # likelier an early refresh, so hot keys don't all expire together.
+        early = self.delta * beta * -math.log(1.0 - random.random())
+        return now + early < self.fresh_until
+
+
+def _memory_cache(
+    policy: str, metrics: CacheMetrics
+) -> MeteredTTLCache[str, _Entry[Any]] | TinyLFUCache[str, _Entry[Any]]:
+    match policy:
+        case "lru":
+            return MeteredTTLCache(CACHE_MEMORY_MAXSIZE, CACHE_MEMORY_TTL, metrics)
+        case "tinylfu":
+            return TinyLFUCache(CACHE_MEMORY_MAXSIZE, CACHE_MEMORY_TTL, metrics)
+        case _:
+            raise ValueError(f"unknown cache memory policy: {policy!r}")
+
+
+class EntityCache[V: CachedValue, M]:
+    """Two-tier (in-memory + Redis) read-through cache keyed by entity id.
+
+    Entries are fresh until ``CACHE_FRESH_TTL`` and kept by each tier until its
+    own TTL. A stale entry is still returned, and a background task reloads
+    it through ``loader``; without a loader stale entries count as misses.
+
+    Ids found missing are remembered for ``CACHE_NEGATIVE_TTL`` as tombstones,
+    reported by ``get`` as ``NOT_FOUND``.
+
+    Subclasses set the key ``namespace``, the payload ``schema_version`` and
+    the ``value_type``/``model_type`` pair; the value type converts models.
+    """
+
+    namespace: ClassVar[str]
+    # Bump whenever the cached payload layout changes. The version is part of
+    # the key, so processes on different versions never read each other's data.
+    schema_version: ClassVar[int]
+    value_type: type[V]
+    model_type: type[M]
+
+    def __init__(
+        self,
+        redis: RedisClient | None,
+        bus: InvalidationBus | None = None,
+        loader: Callable[[int], Awaitable[M | None]] | None = None,
+        codec: Codec | None = None,
+        memory_policy: str | None = None,
+    ):
+        self._redis = redis
+        self._codec = codec or get_codec(CACHE_CODEC)
+        self._bus = bus
+        self._loader = loader
+        self._flights = SingleFlight()
+        self._refreshing: dict[str, asyncio.Task[None]] = {}
+        self.metrics = CacheMetrics()
+        self._memory = _memory_cache(memory_policy or CACHE_MEMORY_POLICY, self.metrics)
+        self._log = logger.bind(cache=self.namespace)
+        if bus is not None:
+            bus.register(self)
+
+    def key(self, entity_id: int) -> str:
+        return f"{self.namespace}:v{self.schema_version}:{entity_id}"
+
+    def evict_local(self, key: str) -> None:
+        self._memory.pop(key, None)
+
+    def clear_local(self) -> None:
+        self._memory.clear()
+
+    def memory_usage(self) -> tuple[int, int]:
+        """Entries currently held in memory, and the in-memory capacity."""
+        return len(self._memory), int(self._memory.maxsize)
+
+    async def get(self, entity_id: int) -> V | Tombstone | None:
+        key = self.key(entity_id)
+
+        # Check in-memory cache first
+        tier = "memory"
+        entry = self._memory.get(key)
+
+        # Check Redis if available
+        if entry is None and self._redis is not None:
+            tier = "redis"
+            try:
+                with self.metrics.redis_call("get"):
+                    data = await self._redis.get(key)
+                if data is not None and (entry := self._deserialize(data)) is not None:
+                    self._memory[key] = entry
+            except Exception as exc:
+                self._redis_failed("redis_get_failed", exc, id=entity_id)
+
+        value = None if entry is None else self._serve(entity_id, entry, tier)
+        if value is not None:
+            return value
+
+        self.metrics.misses += 1
+        self._log.debug("cache_miss", id=entity_id)
+        return None
+
+    async def fetch(
+        self, entity_id: int, load: Callable[[], Awaitable[M | V | None]]
+    ) -> V | None:
+        """Read through the cache: a hit, ``None`` for a tombstone, else load."""
+        cached = await self.get(entity_id)
+        if cached is NOT_FOUND:
+            return None
+        if cached is not None:
+            return cached
+        return await self.get_or_load(entity_id, load)
+
+    async def get_many(self, entity_ids: Iterable[int]) -> dict[int, V | Tombstone]:
+        """Look up many entities with at most one Redis round trip (MGET).
+
+        Only hits are returned; ids absent from the result are misses.
+        """
+        ids = list(dict.fromkeys(entity_ids))
+        found: dict[int, V | Tombstone] = {}
+        remaining: list[int] = []
+
+        for entity_id in ids:
+            entry = self._memory.get(self.key(entity_id))
+            if entry is None:
+                remaining.append(entity_id)
+            elif (value := self._serve(entity_id, entry, "memory")) is not None:
+                found[entity_id] = value
+
+        if remaining and self._redis is not None:
+            keys = [self.key(entity_id) for entity_id in remaining]
+            try:
+                with self.metrics.redis_call("mget"):
+                    values = await self._redis.mget(keys)
+            except Exception as exc:
+                self._redis_failed("redis_mget_failed", exc, count=len(keys))
+                values = []
+
+            for entity_id, key, data in zip(remaining, keys, values, strict=False):
+                if data is None or (entry := self._deserialize(data)) is None:
+                    continue
+                self._memory[key] = entry
+                if (value := self._serve(entity_id, entry, "redis")) is not None:
+                    found[entity_id] = value
+
+        self.metrics.misses += len(ids) - len(found)
+        self._log.debug("cache_get_many", requested=len(ids), hits=len(found))
+        return found
+
+    async def get_many_or_load(
+        self,
+        entity_ids: Sequence[int],
+        load: Callable[[list[int]], Awaitable[Sequence[M]]],
+    ) -> dict[int, V]:
+        """Look up many entities, loading every miss with a single ``load`` call.
+
+        Loaded entities are written back in one pipeline; ids the loader does
+        not return get tombstones.
+        """
+        found = await self.get_many(entity_ids)
+        values = {k: v for k, v in found.items() if isinstance(v, self.value_type)}
+
+        missing = [i for i in dict.fromkeys(entity_ids) if i not in found]
+        if not missing:
+            return values
+
+        started = time.perf_counter()
+        loaded = [self._to_value(model) for model in await load(missing)]
+        delta = time.perf_counter() - started
+
+        loaded_ids = {value.id for value in loaded}
+        absent = [i for i in missing if i not in loaded_ids]
+        for value in await self.set_many(loaded, missing=absent, delta=delta):
+            values[value.id] = value
+        return values
+
+    async def get_or_load(
+        self, entity_id: int, load: Callable[[], Awaitable[M | V | None]]
+    ) -> V | None:
+        """Load a missing entity and populate the cache, once per key.
+
+        Concurrent misses for the same id in this process share one call to
+        ``load`` and one cache write. A missing entity leaves a tombstone.
+        """
+        return await self._flights.do(
+            self.key(entity_id), lambda: self._fill(entity_id, load)
+        )
+
+    async def set(self, obj: M | V, *, delta: float = 0.0) -> V:
+        value = self._to_value(obj)
+        entry = _Entry(value, fresh_until=time.time() + CACHE_FRESH_TTL, delta=delta)
+        await self._store(value.id, entry, CACHE_REDIS_TTL)
+        return value
+
+    async def set_missing(self, entity_id: int) -> None:
+        entry = _Entry[V](None, time.time() + CACHE_NEGATIVE_TTL, delta=0.0)
+        await self._store(entity_id, entry, CACHE_NEGATIVE_TTL)
+
+    async def set_many(
+        self,
+        objs: Iterable[M | V],
+        *,
+        missing: Iterable[int] = (),
+        delta: float = 0.0,
+        publish: bool = True,
+    ) -> list[V]:
+        """Cache many entities (and tombstones) with one pipelined round trip.
+
+        ``publish=False`` skips the invalidation broadcast, for values just
+        read from the database that leave no other process's copy stale.
+        """
+        now = time.time()
+        values = [self._to_value(obj) for obj in objs]
+        writes = [
+            (value.id, _Entry(value, now + CACHE_FRESH_TTL, delta), CACHE_REDIS_TTL)
+            for value in values
+        ]
+        writes += [
+            (i, _Entry[V](None, now + CACHE_NEGATIVE_TTL, 0.0), CACHE_NEGATIVE_TTL)
+            for i in missing
+            if not self._holds_value(self.key(i))
+        ]
+        if not writes:
+            return values
+
+        for entity_id, entry, _ in writes:
+            self._memory[self.key(entity_id)] = entry
+
+        if self._redis is not None:
+            bus = self._bus if publish else None
+            try:
+                async with self._redis.pipeline(transaction=False) as pipe:
+                    for entity_id, entry, ttl in writes:
+                        key = self.key(entity_id)
+                        tombstone = entry.value is None
+                        pipe.set(key, self._serialize(entry), ex=ttl, nx=tombstone)
+                        if bus is not None:
+                            bus.queue(pipe, key)
+                    with self.metrics.redis_call("pipeline"):
+                        results = await pipe.execute()
+                self._log.debug("cache_set_many", count=len(writes))
+                # One SET (then its PUBLISH, with a bus) per write
+                step = 1 if bus is None else 2
+                for (entity_id, _, _), stored in zip(
+                    writes, results[::step], strict=True
+                ):
+                    if not stored:
+                        self._memory.pop(self.key(entity_id), None)
+            except Exception as exc:
+                self._redis_failed("redis_set_many_failed", exc, count=len(writes))
+
+        return values
+
+    async def delete(self, entity_id: int) -> None:
+        key = self.key(entity_id)
+
+        self._memory.pop(key, None)
+
+        # Other processes drop their in-memory copy when the key is broadcast
+        if self._redis is not None:
+            try:
+                with self.metrics.redis_call("delete"):
+                    await self._redis.delete(key)
+                self._log.debug("cache_delete", id=entity_id)
+                await self._broadcast(key)
+            except Exception as exc:
+                self._redis_failed("redis_delete_failed", exc, id=entity_id)
+
+    async def close(self) -> None:
+        tasks = list(self._refreshing.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _holds_value(self, key: str) -> bool:
+        # Tombstones never replace values: a lookup that read the database
+        # before a create committed must not hide the row cached since
+        entry = self._memory.peek(key)
+        return entry is not None and entry.value is not None
+
+    def _to_value(self, obj: M | V) -> V:
+        if isinstance(obj, self.model_type):
+            return self.value_type.from_model(obj)  # type: ignore[attr-defined]
+        return obj  # type: ignore[return-value]
+
+    # Payloads are positional arrays, to keep field names out of every entry:
+    #   value:     [fresh_until, delta, *value.to_row()]
+    #   tombstone: [fresh_until]
+    def _serialize(self, entry: _Entry[V]) -> bytes:
+        if entry.value is None:
+            return pack(self._codec, [entry.fresh_until])
+        return pack(
+            self._codec, [entry.fresh_until, entry.delta, *entry.value.to_row()]
+        )
+
+    def _deserialize(self, data: bytes) -> _Entry[V] | None:
+        try:
+            match unpack(data):
+                case [fresh_until]:
+                    return _Entry(None, fresh_until=fresh_until, delta=0.0)
+                case [fresh_until, delta, *row]:
+                    value = self.value_type.from_row(row)
+                    return _Entry(value, fresh_until=fresh_until, delta=delta)
+                case _:
+                    raise CodecError("unexpected payload layout")
+        except ValueError:  # CodecError, or a row of the wrong arity
+            self._log.warning("cache_decode_failed", exc_info=True)
+            return None
+
+    async def _store(self, entity_id: int, entry: _Entry[V], ttl: int) -> None:
+        key = self.key(entity_id)
+        missing = entry.value is None
+        if missing and self._holds_value(key):
+            return
+
+        # Always set in-memory
+        self._memory[key] = entry
+
+        # Set in Redis if available; a tombstone only where no value is (NX)
+        if self._redis is not None:
+            try:
+                data = self._serialize(entry)
+                with self.metrics.redis_call("set"):
+                    stored = await self._redis.set(key, data, ex=ttl, nx=missing)
+                self._log.debug("cache_set", id=entity_id, missing=missing)
+                if stored:
+                    await self._broadcast(key)
+                else:
+                    # Another process cached the entity: read it from Redis
+                    self._memory.pop(key, None)
+            except Exception as exc:
+                self._redis_failed("redis_set_failed", exc, id=entity_id)
+
+    def _serve(
+        self, entity_id: int, entry: _Entry[V], tier: str
+    ) -> V | Tombstone | None:
+        if entry.is_fresh(time.time()):
+            self._hit(entity_id, tier)
+            return NOT_FOUND if entry.value is None else entry.value
+        if entry.value is None or self._loader is None:
+            return None
+
+        self._hit(entity_id, tier)
+        self.metrics.stale_hits += 1
+        self._log.debug("cache_stale", id=entity_id)
+        self._refresh(entity_id)
+        return entry.value
+
+    def _hit(self, entity_id: int, tier: str) -> None:
+        if tier == "memory":
+            self.metrics.memory_hits += 1
+        else:
+            self.metrics.redis_hits += 1
+        self._log.debug(f"cache_hit_{tier}", id=entity_id)
+
+    def _refresh(self, entity_id: int) -> None:
+        key = self.key(entity_id)
+        if key in self._refreshing:
+            return
+
+        task = asyncio.create_task(self._revalidate(entity_id))
+        self._refreshing[key] = task
+        task.add_done_callback(lambda _: self._refreshing.pop(key, None))
+
+    async def _revalidate(self, entity_id: int) -> None:
+        assert self._loader is not None
+        loader = self._loader
+
+        try:
+            await self._flights.do(
+                self.key(entity_id),
+                lambda: self._fill(entity_id, lambda: loader(entity_id)),
+            )
+            self._log.debug("cache_refreshed", id=entity_id)
+        except Exception:
+            self._log.warning("cache_refresh_failed", id=entity_id, exc_info=True)
+
+    async def _fill(
+        self, entity_id: int, load: Callable[[], Awaitable[M | V | None]]
+    ) -> V | None:
+        started = time.perf_counter()
+        model = await load()
+        if model is None:
+            await self.set_missing(entity_id)
+            return None
+        return await self.set(model, delta=time.perf_counter() - started)
+
+    def _redis_failed(self, event: str, exc: Exception, **context: Any) -> None:
+        if isinstance(exc, CircuitOpenError):
+            # Redis is being skipped on purpose; the breaker logs its transitions
+            return
+        if isinstance(exc, TimeoutError | OSError | RedisError):
+            # Expected during an outage: keep it to one line, no traceback
+            self._log.warning(event, error=repr(exc), **context)
+        else:
+            self._log.warning(event, exc_info=exc, **context)
+
+    async def _broadcast(self, key: str) -> None:
+        if self._bus is not None:
+            await self._bus.publish(key)
@@ -0,0 +1,107 @@
+import asyncio
+from typing import Protocol
+from uuid import uuid4
+
+import structlog
+from redis.asyncio.client import Pipeline
+from redis.exceptions import RedisError
+
+from app.cache.breaker import RedisClient
+from app.cache.config import CACHE_INVALIDATION_CHANNEL
+
+logger = structlog.get_logger("sgbd.cache.invalidation")
+
+RECONNECT_DELAY: float = 1.0
+
+
+class LocalCache(Protocol):
+    def evict_local(self, key: str) -> None: ...
+
+    def clear_local(self) -> None: ...
+
+
+class InvalidationBus:
+    """Broadcasts cache keys over Redis pub/sub so every process evicts its L1.
+
+    Messages are ``"<origin> <key>"``; a process ignores the ones it published
+    itself, since its own L1 already holds the fresh value.
+    """
+
+    def __init__(self, redis: RedisClient, channel: str = CACHE_INVALIDATION_CHANNEL):
+        self._redis = redis
+        self._channel = channel
+        self._origin = uuid4().hex
+        self._caches: list[LocalCache] = []
+        self._task: asyncio.Task[None] | None = None
+
+    def register(self, cache: LocalCache) -> None:
+        self._caches.append(cache)
+
+    async def publish(self, key: str) -> None:
+        await self._redis.publish(self._channel, self._message(key))
+
+    def queue(self, pipe: Pipeline, key: str) -> None:
+        """Queue the broadcast on a pipeline, to share its round trip."""
+        pipe.publish(self._channel, self._message(key))
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def dispatch(self, data: bytes | str) -> None:
+        if isinstance(data, bytes):
+            data = data.decode()
+        origin, _, key = data.partition(" ")
+        if origin == self._origin or not key:
+            return
+        for cache in self._caches:
+            cache.evict_local(key)
+
+    def _message(self, key: str) -> str:
+        return f"{self._origin} {key}"
+
+    def _clear(self) -> None:
+        for cache in self._caches:
+            cache.clear_local()
+
+    async def _listen(self) -> None:
+        # Logged once per outage, not on every reconnect attempt
+        failed = False
+        while True:
+            try:
+                async with self._redis.pubsub() as pubsub:
+                    await pubsub.subscribe(self._channel)
+                    if failed:
+                        logger.info("invalidation_reconnected", channel=self._channel)
+                        failed = False
+                    else:
+                        logger.info("invalidation_subscribed", channel=self._channel)
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self.dispatch(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                if not failed:
+                    self._failed(exc)
+                failed = True
+
+            # Invalidations may have been missed while disconnected
+            self._clear()
+            await asyncio.sleep(RECONNECT_DELAY)
+
+    def _failed(self, exc: Exception) -> None:
+        if isinstance(exc, TimeoutError | OSError | RedisError):
+            # Expected during an outage: keep it to one line, no traceback
+            logger.warning("invalidation_listener_failed", error=repr(exc))
+        else:
+            logger.warning("invalidation_listener_failed", exc_info=exc)
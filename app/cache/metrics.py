@@ -0,0 +1,198 @@
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Protocol
+
+from cachetools import TTLCache
+
+from app.cache.breaker import CircuitOpenError
+
+# Upper bounds (seconds) of the Redis latency histogram buckets
+LATENCY_BUCKETS: tuple[float, ...] = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+)
+
+
+@dataclass(slots=True)
+class Histogram:
+    buckets: tuple[float, ...] = LATENCY_BUCKETS
+    # counts[i] observations fell in (buckets[i - 1], buckets[i]]; the last
+    # slot holds everything above the largest bound
+    counts: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+    sum: float = 0.0
+    count: int = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> Iterator[tuple[float, int]]:
+        total = 0
+        for bound, count in zip(
+            (*self.buckets, float("inf")), self.counts, strict=True
+        ):
+            total += count
+            yield bound, total
+
+
+@dataclass(slots=True)
+class CacheMetrics:
+    """In-process counters for one cache, since the process started."""
+
+    memory_hits: int = 0
+    redis_hits: int = 0
+    misses: int = 0
+    # Hits served past their soft expiry while a refresh runs
+    stale_hits: int = 0
+    # In-memory entries dropped to make room (capacity), or by TTL
+    evictions: int = 0
+    expirations: int = 0
+    redis_errors: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    # Operations not attempted because the circuit breaker was open
+    redis_skipped: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    redis_latency: dict[str, Histogram] = field(
+        default_factory=lambda: defaultdict(Histogram)
+    )
+
+    @contextmanager
+    def redis_call(self, op: str) -> Iterator[None]:
+        """Time one Redis round trip, counting it as an error if it raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        except CircuitOpenError:
+            # Never sent: neither an error nor a latency sample
+            self.redis_skipped[op] += 1
+            raise
+        except Exception:
+            self.redis_errors[op] += 1
+            self.redis_latency[op].observe(time.perf_counter() - started)
+            raise
+        self.redis_latency[op].observe(time.perf_counter() - started)
+
+
+class MeteredTTLCache[K, V](TTLCache[K, V]):
+    """``TTLCache`` that counts evictions and expirations into ``metrics``."""
+
+    def __init__(self, maxsize: int, ttl: float, metrics: CacheMetrics):
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self.metrics = metrics
+
+    def popitem(self) -> tuple[K, V]:
+        item = super().popitem()
+        self.metrics.evictions += 1
+        return item
+
+    def expire(self, time: float | None = None) -> list[tuple[K, V]]:
+        expired = super().expire(time)
+        self.metrics.expirations += len(expired)
+        return expired
+
+    def peek(self, key: K) -> V | None:
+        """The live value for ``key``; same interface as ``TinyLFUCache``."""
+        return self.get(key)
+
+
+class MeteredCache(Protocol):
+    namespace: str
+    metrics: CacheMetrics
+
+    def memory_usage(self) -> tuple[int, int]: ...
+
+
+def render(caches: Iterable[MeteredCache]) -> str:
+    """Render cache metrics in the Prometheus text exposition format."""
+    caches = list(caches)
+    lines: list[str] = []
+
+    def family(name: str, kind: str, doc: str) -> None:
+        lines.append(f"# HELP {name} {doc}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    family("sgbd_cache_hits_total", "counter", "Cache hits by tier.")
+    for c in caches:
+        for tier, value in (
+            ("memory", c.metrics.memory_hits),
+            ("redis", c.metrics.redis_hits),
+        ):
+            lines.append(
+                f'sgbd_cache_hits_total{{cache="{c.namespace}",tier="{tier}"}} {value}'
+            )
+
+    for name, attr, doc in (
+        ("sgbd_cache_misses_total", "misses", "Lookups answered by neither tier."),
+        (
+            "sgbd_cache_stale_hits_total",
+            "stale_hits",
+            "Hits served stale while refreshing.",
+        ),
+        (
+            "sgbd_cache_evictions_total",
+            "evictions",
+            "In-memory entries evicted for capacity.",
+        ),
+        (
+            "sgbd_cache_expirations_total",
+            "expirations",
+            "In-memory entries expired by TTL.",
+        ),
+    ):
+        family(name, "counter", doc)
+        for c in caches:
+            lines.append(f'{name}{{cache="{c.namespace}"}} {getattr(c.metrics, attr)}')
+
+    usage = {c.namespace: c.memory_usage() for c in caches}
+    for index, (name, doc) in enumerate(
+        (
+            ("sgbd_cache_memory_entries", "In-memory entries held."),
+            ("sgbd_cache_memory_maxsize", "In-memory capacity."),
+        )
+    ):
+        family(name, "gauge", doc)
+        for namespace, values in usage.items():
+            lines.append(f'{name}{{cache="{namespace}"}} {values[index]}')
+
+    family("sgbd_cache_redis_errors_total", "counter", "Failed Redis operations.")
+    for c in caches:
+        for op, value in sorted(c.metrics.redis_errors.items()):
+            lines.append(
+                f'sgbd_cache_redis_errors_total{{cache="{c.namespace}",op="{op}"}} {value}'
+            )
+
+    family(
+        "sgbd_cache_redis_skipped_total",
+        "counter",
+        "Redis operations skipped while the circuit breaker was open.",
+    )
+    for c in caches:
+        for op, value in sorted(c.metrics.redis_skipped.items()):
+            lines.append(
+                f'sgbd_cache_redis_skipped_total{{cache="{c.namespace}",op="{op}"}} {value}'
+            )
+
+    name = "sgbd_cache_redis_latency_seconds"
+    family(name, "histogram", "Redis round-trip latency.")
+    for c in caches:
+        for op, hist in sorted(c.metrics.redis_latency.items()):
+            labels = f'cache="{c.namespace}",op="{op}"'
+            for bound, total in hist.cumulative():
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{name}_bucket{{{labels},le="{le}"}} {total}')
+            lines.append(f"{name}_sum{{{labels}}} {hist.sum}")
+            lines.append(f"{name}_count{{{labels}}} {hist.count}")
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,75 @@
+import structlog
+
+from app.cache.book import BookCache
+from app.cache.breaker import RedisClient
+from app.cache.entity import EntityCache
+from app.cache.invalidation import InvalidationBus
+from app.cache.user import UserCache
+from app.db.models.book import Book
+from app.db.models.user import User
+
+logger = structlog.get_logger("sgbd.cache.registry")
+
+
+async def load_book(book_id: int) -> Book | None:
+    """Load a book outside of any request, for background cache refreshes."""
+    from app.db.session import AsyncSessionLocal
+    from app.repositories.book import BookRepository
+
+    async with AsyncSessionLocal() as session:
+        return await BookRepository(session).get_by_id(book_id)
+
+
+async def load_user(user_id: int) -> User | None:
+    """Load a user outside of any request, for background cache refreshes."""
+    from app.db.session import AsyncSessionLocal
+    from app.repositories.user import UserRepository
+
+    async with AsyncSessionLocal() as session:
+        return await UserRepository(session).get_by_id(user_id)
+
+
+class CacheRegistry:
+    """Process-wide caches, shared by every request handled by this worker."""
+
+    def __init__(self, redis: RedisClient | None):
+        self.bus = InvalidationBus(redis) if redis is not None else None
+        self.books = BookCache(redis, self.bus, loader=load_book)
+        self.users = UserCache(redis, self.bus, loader=load_user)
+
+    @property
+    def caches(self) -> list[EntityCache]:
+        return [self.books, self.users]
+
+    async def close(self) -> None:
+        if self.bus is not None:
+            await self.bus.stop()
+        await self.books.close()
+        await self.users.close()
+
+
+_registry: CacheRegistry | None = None
+
+
+async def init_caches(redis: RedisClient | None) -> CacheRegistry:
+    global _registry
+
+    _registry = CacheRegistry(redis)
+    if _registry.bus is not None:
+        _registry.bus.start()
+    logger.info("caches_initialized", redis=redis is not None)
+    return _registry
+
+
+async def close_caches() -> None:
+    global _registry
+
+    if _registry is not None:
+        await _registry.close()
+    _registry = None
+
+
+def get_cache_registry() -> CacheRegistry:
+    if _registry is None:
+        raise RuntimeError("cache registry is not initialized")
+    return _registry
@@ -0,0 +1,42 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key into a single execution.
+
+    The first caller for a key runs the function; callers arriving while it is
+    in flight await the same outcome instead of repeating the work. If the
+    running caller is cancelled, a waiting caller takes over.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, asyncio.Future[Any]] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        while (call := self._calls.get(key)) is not None:
+            try:
+                return await asyncio.shield(call)
+            except asyncio.CancelledError:
+                if not call.cancelled():
+                    raise
+
+        call = asyncio.get_running_loop().create_future()
+        self._calls[key] = call
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            call.cancel()
+            raise
+        except BaseException as exc:
+            call.set_exception(exc)
+            call.exception()  # Mark retrieved when nobody else is waiting
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
@@ -0,0 +1,187 @@
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Iterator
+from typing import Final
+
+from app.cache.metrics import CacheMetrics
+
+# Counters are 4 bits wide, as in TinyLFU; past that only relative order matters
+MAX_COUNT: Final = 15
+_HALVE: Final = bytes(i >> 1 for i in range(256))
+_MISSING: Final = object()
+_GOLDEN: Final = 0x9E3779B97F4A7C15
+_MASK64: Final = (1 << 64) - 1
+_SEEDS: Final = (
+    0xC3A5C85C97CB3127,
+    0xB492B66FBE98F273,
+    0x9AE16A3B2F90404F,
+    0xCBF29CE484222325,
+)
+
+
+class CountMinSketch:
+    """Approximate access frequencies in fixed memory.
+
+    Every ``sample_size`` increments all counters are halved, so the sketch
+    tracks recent popularity rather than all-time totals.
+    """
+
+    def __init__(self, width: int, depth: int = 4, sample_size: int | None = None):
+        if not 1 <= depth <= len(_SEEDS):
+            raise ValueError(f"depth must be between 1 and {len(_SEEDS)}")
+        self.width = 1 << max(width - 1, 1).bit_length()  # Next power of two
+        self._shift = 64 - (self.width.bit_length() - 1)
+        self._rows = [bytearray(self.width) for _ in range(depth)]
+        self.sample_size = sample_size or 10 * width
+        self.additions = 0
+
+    def increment(self, key: Hashable) -> None:
+        added = False
+        for row, index in zip(self._rows, self._indexes(key), strict=True):
+            if row[index] < MAX_COUNT:
+                row[index] += 1
+                added = True
+
+        if added:
+            self.additions += 1
+            if self.additions >= self.sample_size:
+                self.reset()
+
+    def estimate(self, key: Hashable) -> int:
+        return min(
+            row[index]
+            for row, index in zip(self._rows, self._indexes(key), strict=True)
+        )
+
+    def reset(self) -> None:
+        for row in self._rows:
+            row[:] = row.translate(_HALVE)
+        self.additions //= 2
+
+    def _indexes(self, key: Hashable) -> Iterator[int]:
+        # Multiplicative hashing, one seed per row. Python hashes small ints to
+        # themselves, so the top bits of the product are used, not the low ones.
+        h = hash(key)
+        for seed in _SEEDS[: len(self._rows)]:
+            yield ((h ^ seed) * _GOLDEN & _MASK64) >> self._shift
+
+
+class TinyLFUCache[K: Hashable, V]:
+    """Bounded TTL mapping with W-TinyLFU admission and eviction.
+
+    New keys enter a small LRU window. Keys leaving the window compete with
+    the LRU entry of the main segmented LRU (probation + protected) and are
+    admitted only if the sketch has seen them more often, so a one-off scan
+    cannot flush entries that are read repeatedly. Expired entries are
+    dropped lazily, when read.
+
+    Offers the subset of the ``TTLCache`` interface used by ``EntityCache``.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        metrics: CacheMetrics | None = None,
+        *,
+        window_ratio: float = 0.01,
+        protected_ratio: float = 0.8,
+        timer: Callable[[], float] = time.monotonic,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.metrics = metrics or CacheMetrics()
+        self.timer = timer
+        self._window_size = max(1, round(maxsize * window_ratio))
+        self._main_size = max(0, maxsize - self._window_size)
+        self._protected_size = int(self._main_size * protected_ratio)
+        # Wide rows keep collisions rare: 4 counters per entry and row
+        self._sketch = CountMinSketch(4 * maxsize, sample_size=10 * maxsize)
+        self._window: OrderedDict[K, tuple[V, float]] = OrderedDict()
+        self._probation: OrderedDict[K, tuple[V, float]] = OrderedDict()
+        self._protected: OrderedDict[K, tuple[V, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._window) + len(self._probation) + len(self._protected)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._window or key in self._probation or key in self._protected
+
+    def __setitem__(self, key: K, value: V) -> None:
+        # Only reads count as accesses: a miss is followed by a write of the
+        # same key, which must not count twice.
+        item = (value, self.timer() + self.ttl)
+
+        for segment in (self._window, self._probation, self._protected):
+            if key in segment:
+                segment[key] = item
+                segment.move_to_end(key)
+                return
+
+        self._window[key] = item
+        if len(self._window) > self._window_size:
+            self._admit(*self._window.popitem(last=False))
+
+    def get(self, key: K, default: V | None = None) -> V | None:
+        self._sketch.increment(key)
+
+        if key in self._window:
+            segment = self._window
+        elif key in self._protected:
+            segment = self._protected
+        elif key in self._probation:
+            segment = self._probation
+        else:
+            return default
+
+        value, expires = segment[key]
+        if self.timer() >= expires:
+            del segment[key]
+            self.metrics.expirations += 1
+            return default
+
+        if segment is self._probation:
+            # Read again while on probation: promote, demoting protected's LRU
+            del self._probation[key]
+            self._protected[key] = (value, expires)
+            if len(self._protected) > self._protected_size:
+                demoted, demoted_item = self._protected.popitem(last=False)
+                self._probation[demoted] = demoted_item
+        else:
+            segment.move_to_end(key)
+        return value
+
+    def peek(self, key: K) -> V | None:
+        """The live value for ``key``, without counting it as an access."""
+        for segment in (self._window, self._probation, self._protected):
+            if key in segment:
+                value, expires = segment[key]
+                return value if self.timer() < expires else None
+        return None
+
+    def pop(self, key: K, default: object = _MISSING) -> V | None:
+        for segment in (self._window, self._probation, self._protected):
+            if key in segment:
+                return segment.pop(key)[0]
+        if default is _MISSING:
+            raise KeyError(key)
+        return default  # type: ignore[return-value]
+
+    def clear(self) -> None:
+        self._window.clear()
+        self._probation.clear()
+        self._protected.clear()
+
+    def _admit(self, key: K, item: tuple[V, float]) -> None:
+        if len(self._probation) + len(self._protected) < self._main_size:
+            self._probation[key] = item
+            return
+
+        # The candidate evicted from the window duels the main segment's LRU
+        victims = self._probation or self._protected
+        if victims:
+            victim = next(iter(victims))
+            if self._sketch.estimate(key) > self._sketch.estimate(victim):
+                del victims[victim]
+                self._probation[key] = item
+        self.metrics.evictions += 1
@@ -0,0 +1,46 @@
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass, field
+from typing import Any, Self
+
+import orjson
+
+from app.cache.entity import EntityCache
+from app.db.models.user import User
+
+UserLoader = Callable[[int], Awaitable[User | None]]
+
+SCHEMA_VERSION: int = 1
+
+
+@dataclass(frozen=True, slots=True)
+class CachedUser:
+    id: int
+    name: str
+    email: str
+    # JSON body of UserResponse, encoded once so cache hits skip serialization
+    body: bytes = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        body = orjson.dumps({"id": self.id, "name": self.name, "email": self.email})
+        object.__setattr__(self, "body", body)
+
+    @classmethod
+    def from_model(cls, user: User) -> Self:
+        return cls(id=user.id, name=user.name, email=user.email)
+
+    def to_row(self) -> list[Any]:
+        return [self.id, self.name, self.email]
+
+    @classmethod
+    def from_row(cls, row: Sequence[Any]) -> Self:
+        user_id, name, email = row
+        return cls(id=user_id, name=name, email=email)
+
+
+class UserCache(EntityCache[CachedUser, User]):
+    """Two-tier user cache with stale-while-revalidate."""
+
+    namespace = "user"
+    schema_version = SCHEMA_VERSION
+    value_type = CachedUser
+    model_type = User
@@ -0,0 +1,59 @@
+import asyncio
+import time
+from datetime import UTC, datetime, timedelta
+
+import structlog
+
+from app.cache.book import BookCache
+from app.cache.config import (
+    CACHE_WARMUP_SIZE,
+    CACHE_WARMUP_TIMEOUT,
+    CACHE_WARMUP_WINDOW_DAYS,
+)
+from app.repositories.book import BookRepository
+
+logger = structlog.get_logger("sgbd.cache.warmup")
+
+
+async def warm_book_cache(
+    cache: BookCache,
+    *,
+    size: int = CACHE_WARMUP_SIZE,
+    window_days: int = CACHE_WARMUP_WINDOW_DAYS,
+    budget: float = CACHE_WARMUP_TIMEOUT,
+) -> int:
+    """Fill both tiers with the books loaned most in the recent window.
+
+    Ids are ranked with one aggregate query, the books loaded with one query
+    and written to both tiers in one pipeline. Nothing is looked up first, so
+    the hit and miss counters only see request traffic. Gives up after
+    ``budget`` seconds, leaving the caches as they are. Returns the number of
+    books cached.
+    """
+    if size <= 0:
+        return 0
+
+    from app.db.session import AsyncSessionLocal
+
+    started = time.perf_counter()
+    since = datetime.now(UTC) - timedelta(days=window_days)
+
+    try:
+        async with asyncio.timeout(budget), AsyncSessionLocal() as session:
+            books = BookRepository(session)
+            ids = await books.list_most_loaned_ids(since=since, limit=size)
+            loaded = await books.get_by_ids(ids)
+            absent = set(ids).difference(book.id for book in loaded)
+            # Fresh from the database: other processes' copies aren't stale,
+            # so their memory tiers are left alone
+            warmed = await cache.set_many(loaded, missing=absent, publish=False)
+    except TimeoutError:
+        logger.warning("cache_warmup_timed_out", budget=budget)
+        return 0
+    except Exception:
+        logger.warning("cache_warmup_failed", exc_info=True)
+        return 0
+
+    elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+    logger.info("cache_warmed", books=len(warmed), duration_ms=elapsed_ms)
+    return len(warmed)
@@ -20,3 +20,14 @@ def database_url_async() -> URL:
 
 def database_url_sync() -> URL:
     return create_url("postgresql")
+
+
+# Repositories whose hot reads bypass SQLAlchemy and run prepared statements on
+# a raw asyncpg pool: a comma-separated subset of "books,users,loans". Empty
+# (the default) keeps every read on the ORM.
+DB_RAW_READS: frozenset[str] = frozenset(
+    name.strip()
+    for name in os.environ.get("DB_RAW_READS", "").split(",")
+    if name.strip()
+)
+DB_RAW_POOL_SIZE: int = int(os.environ.get("DB_RAW_POOL_SIZE", "10"))
@@ -0,0 +1,127 @@
+"""Server-side SQL functions.
+
+Alembic migrations install these in deployed databases; the models attach them
+to their tables' DDL events too, so ``Base.metadata.create_all`` (tests) gets
+them as well. Keep both in sync when changing a function.
+"""
+
+from textwrap import indent
+
+# checkout_loan's copy search, on its own so the query plan tests can EXPLAIN
+# it: a free copy of :book_id not in :taken, skipping copies locked by
+# concurrent checkouts. The anti-join probes uq_active_loan_per_copy once per
+# copy of the book, so its cost doesn't grow with the loans active elsewhere.
+AVAILABLE_COPY = """\
+SELECT c.id
+FROM book_copies c
+WHERE c.book_id = :book_id
+  AND NOT EXISTS (
+      SELECT 1 FROM loans l
+      WHERE l.copy_id = c.id AND l.returned_at IS NULL
+  )
+  AND c.id <> ALL (:taken)
+LIMIT 1
+FOR UPDATE OF c SKIP LOCKED"""
+
+# Validates and inserts a loan in a single round trip. The loan limit is a
+# conditional increment of users.active_loans: the UPDATE takes the user row
+# lock and checks the limit in one statement, with no count over loans. Each
+# statement takes a fresh snapshot, so the copy search sees everything
+# committed before the lock was granted.
+_CHECKOUT_LOAN = """
+CREATE OR REPLACE FUNCTION checkout_loan(
+    p_user_id integer,
+    p_book_id integer,
+    p_max_active integer,
+    p_loan_days integer
+) RETURNS TABLE (
+    status text,
+    active integer,
+    attempts integer,
+    loan_id integer,
+    copy_id integer,
+    loaned_at timestamptz,
+    due_to timestamptz
+) LANGUAGE plpgsql AS $$
+#variable_conflict use_column
+DECLARE
+    v_copy_id integer;
+    v_taken integer[] := '{}';
+BEGIN
+    active := 0;
+    attempts := 0;
+
+    IF NOT EXISTS (SELECT 1 FROM books b WHERE b.id = p_book_id) THEN
+        status := 'book_not_found';
+        RETURN NEXT;
+        RETURN;
+    END IF;
+
+    -- Serializes concurrent checkouts of the same user; a waiter re-checks
+    -- the limit against the committed counter once the lock is released
+    UPDATE users u SET active_loans = u.active_loans + 1
+    WHERE u.id = p_user_id AND u.active_loans < p_max_active
+    RETURNING u.active_loans INTO active;
+
+    IF NOT FOUND THEN
+        SELECT u.active_loans INTO active FROM users u WHERE u.id = p_user_id;
+        IF NOT FOUND THEN
+            status := 'user_not_found';
+            active := 0;
+        ELSE
+            status := 'max_active_loans_exceeded';
+        END IF;
+        RETURN NEXT;
+        RETURN;
+    END IF;
+
+    LOOP
+{available_copy};
+
+        IF NOT FOUND THEN
+            UPDATE users u SET active_loans = u.active_loans - 1
+            WHERE u.id = p_user_id
+            RETURNING u.active_loans INTO active;
+            status := 'no_copies_available';
+            RETURN NEXT;
+            RETURN;
+        END IF;
+
+        attempts := attempts + 1;
+
+        -- The exception block is a savepoint: a copy taken by a transaction
+        -- that committed after our search only rolls back this insert
+        BEGIN
+            INSERT INTO loans (user_id, copy_id, due_to, fine_cents, version)
+            VALUES (
+                p_user_id,
+                v_copy_id,
+                now() + make_interval(days => p_loan_days),
+                0,
+                1
+            )
+            RETURNING loans.id, loans.copy_id, loans.loaned_at, loans.due_to
+            INTO loan_id, copy_id, loaned_at, due_to;
+
+            status := 'created';
+            RETURN NEXT;
+            RETURN;
+        EXCEPTION WHEN unique_violation THEN
+            v_taken := v_taken || v_copy_id;
+        END;
+    END LOOP;
+END;
+$$
+"""
+
+# The copy search inlined in plpgsql: binds become the function's variables
+_COPY_SEARCH = (
+    AVAILABLE_COPY.replace("SELECT c.id", "SELECT c.id INTO v_copy_id", 1)
+    .replace(":book_id", "p_book_id")
+    .replace(":taken", "v_taken")
+)
+CHECKOUT_LOAN = _CHECKOUT_LOAN.replace(
+    "{available_copy}", indent(_COPY_SEARCH, " " * 8)
+)
+
+DROP_CHECKOUT_LOAN = "DROP FUNCTION IF EXISTS checkout_loan"
@@ -12,7 +12,7 @@ class Book(Base):
     author: Mapped[str] = mapped_column(String(200), nullable=False)
 
     copies = relationship(
-        "BookCopy", back_populates="book", cascade="all, delete-orphan"
+        "BookCopy", back_populates="book", cascade="all, delete-orphan", lazy="raise"
     )
 
     __table_args__ = (
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, func
+from sqlalchemy import DateTime, ForeignKey, Index, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -19,5 +19,9 @@ class BookCopy(Base):
         DateTime(timezone=True), nullable=False, server_default=func.now()
     )
 
-    book = relationship("Book", back_populates="copies", lazy="selectin")
-    loans = relationship("Loan", back_populates="copy", cascade="all, delete-orphan")
+    book = relationship("Book", back_populates="copies", lazy="raise")
+    loans = relationship(
+        "Loan", back_populates="copy", cascade="all, delete-orphan", lazy="raise"
+    )
+
+    __table_args__ = (Index("ix_book_copy_book_id", "book_id"),)
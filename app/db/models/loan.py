@@ -1,9 +1,27 @@
 from datetime import datetime
+from enum import StrEnum
 
-from sqlalchemy import CheckConstraint, DateTime, ForeignKey, Index, Integer, func, text
+from sqlalchemy import (
+    DDL,
+    CheckConstraint,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    event,
+    func,
+    text,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
+from app.db.functions import CHECKOUT_LOAN, DROP_CHECKOUT_LOAN
+
+
+class LoanStatus(StrEnum):
+    ACTIVE = "active"
+    RETURNED = "returned"
+    OVERDUE = "overdue"
 
 
 class Loan(Base):
@@ -35,8 +53,9 @@ class Loan(Base):
 
     __mapper_args__ = {"version_id_col": version}
 
-    user = relationship("User", back_populates="loans", lazy="selectin")
-    copy = relationship("BookCopy", back_populates="loans", lazy="selectin")
+    # Relationships never load implicitly; queries opt in with loader options
+    user = relationship("User", back_populates="loans", lazy="raise")
+    copy = relationship("BookCopy", back_populates="loans", lazy="raise")
 
     __table_args__ = (
         Index(
@@ -51,8 +70,19 @@ class Loan(Base):
             "id",
             postgresql_where=text("returned_at IS NULL"),
         ),
+        # Per-user history, newest first (scanned backwards)
+        Index("idx_loan_user_loaned", "user_id", "loaned_at", "id"),
+        Index(
+            "idx_loan_user_active",
+            "user_id",
+            postgresql_where=text("returned_at IS NULL"),
+        ),
         CheckConstraint(
             "returned_at IS NULL OR returned_at >= loaned_at",
             name="ck_loan_returned_after_loaned",
         ),
     )
+
+
+event.listen(Loan.__table__, "after_create", DDL(CHECKOUT_LOAN))
+event.listen(Loan.__table__, "before_drop", DDL(DROP_CHECKOUT_LOAN))
@@ -1,4 +1,4 @@
-from sqlalchemy import String
+from sqlalchemy import CheckConstraint, Index, Integer, String, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -9,6 +9,22 @@ class User(Base):
 
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String(120), nullable=False)
-    email: Mapped[str] = mapped_column(String(255), unique=True, nullable=False)
+    # Stored as given; unique case-insensitively through uq_user_email_lower
+    email: Mapped[str] = mapped_column(String(255), nullable=False)
 
-    loans = relationship("Loan", back_populates="user", cascade="all, delete-orphan")
+    # Loans not yet returned; maintained by checkout_loan and LoanService.fulfill
+    active_loans: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+
+    loans = relationship(
+        "Loan", back_populates="user", cascade="all, delete-orphan", lazy="raise"
+    )
+
+    __table_args__ = (
+        Index("uq_user_email_lower", func.lower(email), unique=True),
+        CheckConstraint(
+            "active_loans >= 0 AND active_loans <= 3",
+            name="ck_user_active_loans_range",
+        ),
+    )
@@ -0,0 +1,68 @@
+from collections.abc import Collection
+
+import asyncpg
+import structlog
+from sqlalchemy.engine import URL
+
+from app.db.config import DB_RAW_POOL_SIZE, DB_RAW_READS, database_url_sync
+
+logger = structlog.get_logger("sgbd.db.pool")
+
+RAW_REPOSITORIES: frozenset[str] = frozenset({"books", "users", "loans"})
+
+_pool: asyncpg.Pool | None = None
+_repositories: frozenset[str] = frozenset()
+
+
+class Record(asyncpg.Record):
+    """``asyncpg.Record`` that also reads columns as attributes, like a
+    SQLAlchemy ``Row``, so callers handle rows from either backend alike."""
+
+    def __getattr__(self, name: str):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+
+async def init_pool(
+    url: URL | None = None, repositories: Collection[str] = DB_RAW_READS
+) -> None:
+    """Open the raw asyncpg pool for ``repositories``; a no-op when empty.
+
+    If the pool cannot be opened those repositories stay on the ORM.
+    """
+    global _pool, _repositories
+
+    unknown = set(repositories) - RAW_REPOSITORIES
+    if unknown:
+        raise ValueError(f"unknown raw read repositories: {sorted(unknown)!r}")
+    if not repositories:
+        return
+
+    dsn = (url or database_url_sync()).render_as_string(hide_password=False)
+    try:
+        _pool = await asyncpg.create_pool(
+            dsn, min_size=1, max_size=DB_RAW_POOL_SIZE, record_class=Record
+        )
+        _repositories = frozenset(repositories)
+        logger.info("raw_pool_opened", repositories=sorted(_repositories))
+    except Exception:
+        logger.warning("raw_pool_unavailable", exc_info=True)
+        _pool = None
+        _repositories = frozenset()
+
+
+async def close_pool() -> None:
+    global _pool, _repositories
+
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+        _repositories = frozenset()
+        logger.info("raw_pool_closed")
+
+
+def get_raw_pool(repository: str) -> asyncpg.Pool | None:
+    """The raw pool if ``repository`` reads through it, else ``None`` (ORM)."""
+    return _pool if repository in _repositories else None
@@ -5,6 +5,7 @@ from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from app.db.config import database_url_async
+from app.db.transaction import commit, rollback
 
 engine = create_async_engine(database_url_async(), echo=True, future=True)
 SQLAlchemyInstrumentor().instrument(engine=engine.sync_engine)
@@ -17,8 +18,8 @@ async def get_db_async_session() -> AsyncGenerator[AsyncSession]:
     async with AsyncSessionLocal() as session:
         try:
             yield session
-            await session.commit()
+            await commit(session)
         except Exception as exc:
-            await session.rollback()
+            await rollback(session)
             logger.error("transaction_rolled_back", err=str(exc), exc_info=True)
             raise
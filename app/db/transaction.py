@@ -0,0 +1,39 @@
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import structlog
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = structlog.get_logger("sgbd.db.transaction")
+
+_AFTER_COMMIT = "after_commit"
+
+type Callback = Callable[[], Awaitable[Any]]
+
+
+def after_commit(session: AsyncSession, callback: Callback) -> None:
+    """Run ``callback`` once ``session``'s transaction commits.
+
+    For side effects that must not outlive a rolled back transaction, such as
+    cache writes of new rows; a rollback discards the pending callbacks.
+    """
+    session.info.setdefault(_AFTER_COMMIT, []).append(callback)
+
+
+async def commit(session: AsyncSession) -> None:
+    """Commit ``session``, then run its ``after_commit`` callbacks in order.
+
+    The data is already durable when they run, so a failing callback is
+    logged and does not fail the request.
+    """
+    await session.commit()
+    for callback in session.info.pop(_AFTER_COMMIT, []):
+        try:
+            await callback()
+        except Exception:
+            logger.error("after_commit_failed", exc_info=True)
+
+
+async def rollback(session: AsyncSession) -> None:
+    session.info.pop(_AFTER_COMMIT, None)
+    await session.rollback()
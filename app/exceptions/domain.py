@@ -43,3 +43,7 @@ class MaxActiveLoansExceeded(AppException):
 
 class LoanConcurrentModification(AppException):
     code: str = "loan_concurrent_modification"
+
+
+class InvalidCursor(AppException):
+    code: str = "invalid_cursor"
@@ -2,11 +2,19 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
-from app.cache.client import close_redis, init_redis
+from app.cache.client import close_redis, get_redis_client, init_redis
+from app.cache.registry import close_caches, init_caches
+from app.cache.warmup import warm_book_cache
+from app.db.pool import close_pool, init_pool
 
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
+    await init_pool()
     await init_redis()
+    caches = await init_caches(get_redis_client())
+    await warm_book_cache(caches.books)
     yield
+    await close_caches()
     await close_redis()
+    await close_pool()
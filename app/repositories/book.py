@@ -1,10 +1,17 @@
 from collections.abc import Sequence
+from datetime import datetime
 
-from sqlalchemy import select
+from sqlalchemy import Row, func, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql.expression import exists
 
+from app.cache.book import CachedBook
 from app.db.models.book import Book
+from app.db.models.book_copy import BookCopy
+from app.db.models.loan import Loan
+
+type BookRow = Row[tuple[int, str, str]]
 
 
 class BookRepository:
@@ -21,18 +28,50 @@ class BookRepository:
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def get_cached_by_id(self, book_id: int) -> CachedBook | None:
+        # The cache-fill read; RawBookRepository serves it from the raw pool
+        book = await self.get_by_id(book_id)
+        return None if book is None else CachedBook.from_model(book)
+
+    async def get_by_ids(self, book_ids: Sequence[int]) -> Sequence[Book]:
+        stmt = select(Book).where(Book.id.in_(book_ids))
+        result = await self.session.execute(stmt)
+        return result.scalars().all()
+
+    async def list_most_loaned_ids(
+        self, *, since: datetime, limit: int
+    ) -> Sequence[int]:
+        loans = func.count(Loan.id)
+        joined = select(BookCopy.book_id).join(Loan, Loan.copy_id == BookCopy.id)
+        recent = joined.where(Loan.loaned_at >= since).group_by(BookCopy.book_id)
+        stmt = recent.order_by(loans.desc(), BookCopy.book_id).limit(limit)
+        result = await self.session.execute(stmt)
+        return result.scalars().all()
+
     async def get_by_title_and_author(self, title: str, author: str) -> Book | None:
         stmt = select(Book).where(Book.title == title, Book.author == author)
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
-    async def list_all(self, *, offset: int, limit: int) -> Sequence[Book]:
-        order_by = select(Book).order_by(Book.id)
-        stmt = order_by.offset(offset).limit(limit)
+    async def list_rows(self, *, after: int | None, limit: int) -> Sequence[BookRow]:
+        # BookResponse's columns only: plain rows, no identity map
+        stmt = select(Book.id, Book.title, Book.author).order_by(Book.id).limit(limit)
+        if after is not None:
+            stmt = stmt.where(Book.id > after)
         result = await self.session.execute(stmt)
-        return result.scalars().all()
+        return result.all()
 
-    async def create(self, book: Book) -> Book:
-        self.session.add(book)
-        await self.session.flush()
-        return book
+    async def create(self, *, title: str, author: str) -> Book | None:
+        """Insert a book in one round trip; ``None`` if it already exists.
+
+        Conflicts on ``uq_book_title_author`` return no row instead of raising,
+        so the transaction stays usable.
+        """
+        stmt = (
+            insert(Book)
+            .values(title=title, author=author)
+            .on_conflict_do_nothing(constraint="uq_book_title_author")
+            .returning(Book)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none()
@@ -5,7 +5,6 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql.expression import exists
 
 from app.db.models.book_copy import BookCopy
-from app.db.models.loan import Loan
 
 
 class BookCopyRepository:
@@ -27,18 +26,6 @@ class BookCopyRepository:
         result = await self.session.execute(stmt)
         return result.scalars().all()
 
-    async def get_available_for_book(self, book_id: int) -> BookCopy | None:
-        active = select(Loan.copy_id).where(Loan.returned_at.is_(None))
-        active_sub = active.scalar_subquery()
-        stmt = (
-            select(BookCopy)
-            .where(BookCopy.book_id == book_id)
-            .where(BookCopy.id.not_in(active_sub))
-            .limit(1)
-        )
-        result = await self.session.execute(stmt)
-        return result.scalar_one_or_none()
-
     async def create(self, copy: BookCopy) -> BookCopy:
         self.session.add(copy)
         await self.session.flush()
@@ -1,55 +1,176 @@
 from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import datetime
+from enum import StrEnum
 
-from sqlalchemy import func, select
+from sqlalchemy import ColumnElement, Row, Select, and_, func, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from sqlalchemy.sql.base import ExecutableOption
 
-from app.db.models.loan import Loan
+from app.db.models.book_copy import BookCopy
+from app.db.models.loan import Loan, LoanStatus
+
+# Keyset of the active loan listings, matching idx_loan_active_due
+type DueKey = tuple[datetime, int]
+
+# Keyset of a user's history, newest first, matching idx_loan_user_loaned
+type LoanedKey = tuple[datetime, int]
+
+# LoanResponse's columns, for list reads that skip the ORM entity
+type LoanRow = Row[tuple[int, int, int, datetime, datetime, datetime | None, int]]
+
+LOAN_COLUMNS = (
+    Loan.id,
+    Loan.copy_id,
+    Loan.user_id,
+    Loan.loaned_at,
+    Loan.due_to,
+    Loan.returned_at,
+    Loan.fine_cents,
+)
+
+# Loan relationships raise instead of loading; readers that need them pass
+# these (or their own loader options) as ``load``. Joined, so the loan and
+# its relations are still one statement.
+WITH_USER = joinedload(Loan.user, innerjoin=True)
+WITH_BOOK = joinedload(Loan.copy, innerjoin=True).joinedload(
+    BookCopy.book, innerjoin=True
+)
+
+
+class CheckoutStatus(StrEnum):
+    CREATED = "created"
+    BOOK_NOT_FOUND = "book_not_found"
+    USER_NOT_FOUND = "user_not_found"
+    MAX_ACTIVE_LOANS_EXCEEDED = "max_active_loans_exceeded"
+    NO_COPIES_AVAILABLE = "no_copies_available"
+
+
+@dataclass(frozen=True, slots=True)
+class Checkout:
+    """Outcome of ``checkout_loan``; ``loan`` is set only when CREATED."""
+
+    status: CheckoutStatus
+    active: int
+    attempts: int
+    loan: Loan | None = None
+
+
+def _after_due(stmt: Select[tuple[Loan]], after: DueKey | None) -> Select[tuple[Loan]]:
+    order_by = stmt.order_by(Loan.due_to.asc(), Loan.id.asc())
+    if after is None:
+        return order_by
+    # Row comparison, so Postgres seeks idx_loan_active_due past the cursor
+    return order_by.where(tuple_(Loan.due_to, Loan.id) > tuple_(*after))
+
+
+def _status_filter(status: LoanStatus) -> ColumnElement[bool]:
+    match status:
+        case LoanStatus.ACTIVE:
+            return Loan.returned_at.is_(None)
+        case LoanStatus.RETURNED:
+            return Loan.returned_at.is_not(None)
+        case LoanStatus.OVERDUE:
+            return and_(Loan.returned_at.is_(None), Loan.due_to < func.now())
+
+
+def _by_user(
+    user_id: int, status: LoanStatus | None, after: LoanedKey | None
+) -> Select[tuple[Loan]]:
+    stmt = select(Loan).where(Loan.user_id == user_id)
+    if status is not None:
+        stmt = stmt.where(_status_filter(status))
+    if after is not None:
+        stmt = stmt.where(tuple_(Loan.loaned_at, Loan.id) < tuple_(*after))
+    return stmt.order_by(Loan.loaned_at.desc(), Loan.id.desc())
+
+
+def _active(after: DueKey | None) -> Select[tuple[Loan]]:
+    return _after_due(select(Loan).where(Loan.returned_at.is_(None)), after)
+
+
+def _overdue(after: DueKey | None) -> Select[tuple[Loan]]:
+    returned = Loan.returned_at.is_(None)
+    is_due = Loan.due_to < func.now()
+    return _after_due(select(Loan).where(returned, is_due), after)
 
 
 class LoanRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def get_by_id(self, loan_id: int) -> Loan | None:
-        stmt = select(Loan).where(Loan.id == loan_id)
+    async def get_by_id(
+        self, loan_id: int, *, load: Sequence[ExecutableOption] = ()
+    ) -> Loan | None:
+        stmt = select(Loan).where(Loan.id == loan_id).options(*load)
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
-    async def list_by_user(self, user_id: int) -> Sequence[Loan]:
-        stmt = select(Loan).where(Loan.user_id == user_id)
-        result = await self.session.execute(stmt)
-        return result.scalars().all()
-
-    async def active_loan_for_copy(self, copy_id: int) -> Loan | None:
+    async def active_loan_for_copy(
+        self, copy_id: int, *, load: Sequence[ExecutableOption] = ()
+    ) -> Loan | None:
         is_copy = Loan.copy_id == copy_id
         not_returned = Loan.returned_at.is_(None)
-        stmt = select(Loan).where(is_copy, not_returned)
+        stmt = select(Loan).where(is_copy, not_returned).options(*load)
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
-    async def count_active_by_user(self, user_id: int) -> int:
-        was_loaned = Loan.user_id == user_id
-        returned = Loan.returned_at.is_(None)
-        count_from = select(func.count()).select_from(Loan)
-        stmt = count_from.where(was_loaned, returned)
-        result = await self.session.execute(stmt)
-        return result.scalar_one()
+    async def list_by_user_rows(
+        self,
+        user_id: int,
+        *,
+        status: LoanStatus | None,
+        after: LoanedKey | None,
+        limit: int,
+    ) -> Sequence[LoanRow]:
+        stmt = _by_user(user_id, status, after).limit(limit)
+        result = await self.session.execute(stmt.with_only_columns(*LOAN_COLUMNS))
+        return result.all()
 
-    async def list_active(self, *, offset: int, limit: int) -> Sequence[Loan]:
-        active = select(Loan).where(Loan.returned_at.is_(None))
-        order_by = active.order_by(Loan.due_to.asc(), Loan.id.asc())
-        stmt = order_by.offset(offset).limit(limit)
+    async def list_active_rows(
+        self, *, after: DueKey | None, limit: int
+    ) -> Sequence[LoanRow]:
+        stmt = _active(after).limit(limit).with_only_columns(*LOAN_COLUMNS)
         result = await self.session.execute(stmt)
-        return result.scalars().all()
-
-    async def list_overdue(self, *, offset: int, limit: int) -> Sequence[Loan]:
-        returned = Loan.returned_at.is_(None)
-        is_due = Loan.due_to < func.now()
-        overdue = select(Loan).where(returned, is_due)
-        order_by = overdue.order_by(Loan.due_to.asc(), Loan.id.asc())
-        stmt = order_by.offset(offset).limit(limit)
+        return result.all()
+
+    async def list_overdue_rows(
+        self, *, after: DueKey | None, limit: int
+    ) -> Sequence[LoanRow]:
+        stmt = _overdue(after).limit(limit).with_only_columns(*LOAN_COLUMNS)
         result = await self.session.execute(stmt)
-        return result.scalars().all()
+        return result.all()
+
+    async def checkout(
+        self, user_id: int, book_id: int, *, max_active: int, loan_days: int
+    ) -> Checkout:
+        # Validation, copy selection and insert run server-side (see
+        # app.db.functions), in a single round trip
+        checkout = func.checkout_loan(
+            user_id, book_id, max_active, loan_days
+        ).table_valued(
+            "status", "active", "attempts", "loan_id", "copy_id", "loaned_at", "due_to"
+        )
+        result = await self.session.execute(select(checkout))
+        row = result.one()
+
+        status = CheckoutStatus(row.status)
+        if status is not CheckoutStatus.CREATED:
+            return Checkout(status, row.active, row.attempts)
+
+        # Built from the returned row: no refresh, no relationship loads
+        loan = Loan(
+            id=row.loan_id,
+            user_id=user_id,
+            copy_id=row.copy_id,
+            loaned_at=row.loaned_at,
+            due_to=row.due_to,
+            returned_at=None,
+            fine_cents=0,
+            version=1,
+        )
+        return Checkout(status, row.active, row.attempts, loan)
 
     async def save(self, loan: Loan) -> Loan:
         self.session.add(loan)
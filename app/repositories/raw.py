@@ -0,0 +1,84 @@
+"""Raw asyncpg fast path for the hottest reads.
+
+Each class extends its ORM repository and overrides only the hot reads, which
+run on the pool from ``app.db.pool`` instead of the request's session; every
+other method, writes included, still goes through the session. The statements
+are constant strings, so asyncpg prepares each once per pool connection and
+reuses it from its statement cache. Enabled per repository by ``DB_RAW_READS``.
+
+These reads run outside the request's transaction: use them only for
+endpoints that do not read their own writes.
+"""
+
+from collections.abc import Sequence
+
+import asyncpg
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache.book import CachedBook
+from app.cache.user import CachedUser
+from app.db.pool import Record
+from app.repositories.book import BookRepository
+from app.repositories.loan import DueKey, LoanRepository
+from app.repositories.user import UserRepository
+
+BOOK_BY_ID = "SELECT id, title, author FROM books WHERE id = $1"
+
+USER_BY_ID = "SELECT id, name, email FROM users WHERE id = $1"
+
+# Same columns and keyset as LoanRepository.list_active_rows, so both seek
+# idx_loan_active_due and yield the same pages
+ACTIVE_LOANS = """
+SELECT id, copy_id, user_id, loaned_at, due_to, returned_at, fine_cents
+FROM loans
+WHERE returned_at IS NULL
+ORDER BY due_to, id
+LIMIT $1
+"""
+
+ACTIVE_LOANS_AFTER = """
+SELECT id, copy_id, user_id, loaned_at, due_to, returned_at, fine_cents
+FROM loans
+WHERE returned_at IS NULL AND (due_to, id) > ($1, $2)
+ORDER BY due_to, id
+LIMIT $3
+"""
+
+
+class RawBookRepository(BookRepository):
+    def __init__(self, session: AsyncSession, pool: asyncpg.Pool):
+        super().__init__(session)
+        self.pool = pool
+
+    async def get_cached_by_id(self, book_id: int) -> CachedBook | None:
+        # Built straight from the record: the cache stores it as is
+        row = await self.pool.fetchrow(BOOK_BY_ID, book_id)
+        if row is None:
+            return None
+        return CachedBook(id=row["id"], title=row["title"], author=row["author"])
+
+
+class RawUserRepository(UserRepository):
+    def __init__(self, session: AsyncSession, pool: asyncpg.Pool):
+        super().__init__(session)
+        self.pool = pool
+
+    async def get_cached_by_id(self, user_id: int) -> CachedUser | None:
+        row = await self.pool.fetchrow(USER_BY_ID, user_id)
+        if row is None:
+            return None
+        return CachedUser(id=row["id"], name=row["name"], email=row["email"])
+
+
+class RawLoanRepository(LoanRepository):
+    def __init__(self, session: AsyncSession, pool: asyncpg.Pool):
+        super().__init__(session)
+        self.pool = pool
+
+    async def list_active_rows(  # type: ignore[override]
+        self, *, after: DueKey | None, limit: int
+    ) -> Sequence[Record]:
+        # Records reach the response as is: paginate encodes them to JSON
+        if after is None:
+            return await self.pool.fetch(ACTIVE_LOANS, limit)
+        return await self.pool.fetch(ACTIVE_LOANS_AFTER, *after, limit)
@@ -1,22 +1,27 @@
 from collections.abc import Sequence
 
-from sqlalchemy import select
+from sqlalchemy import Row, func, select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql.expression import exists
 
-from app.db.models.loan import Loan
+from app.cache.user import CachedUser
 from app.db.models.user import User
 
+type UserRow = Row[tuple[int, str, str]]
+
 
 class UserRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def list(self, *, offset: int, limit: int) -> Sequence[User]:
-        order_by = select(User).order_by(User.id)
-        stmt = order_by.offset(offset).limit(limit)
+    async def list_rows(self, *, after: int | None, limit: int) -> Sequence[UserRow]:
+        # UserResponse's columns only: plain rows, no identity map
+        stmt = select(User.id, User.name, User.email).order_by(User.id).limit(limit)
+        if after is not None:
+            stmt = stmt.where(User.id > after)
         result = await self.session.execute(stmt)
-        return result.scalars().all()
+        return result.all()
 
     async def exists(self, user_id: int) -> bool:
         stmt = select(exists().where(User.id == user_id))
@@ -26,22 +31,35 @@ class UserRepository:
     async def get_by_id(self, user_id: int) -> User | None:
         return await self.session.get(User, user_id)
 
-    async def get_for_update(self, user_id: int) -> User | None:
-        stmt = select(User).where(User.id == user_id).with_for_update()
-        result = await self.session.execute(stmt)
-        return result.scalar_one_or_none()
+    async def get_cached_by_id(self, user_id: int) -> CachedUser | None:
+        # The cache-fill read; RawUserRepository serves it from the raw pool
+        user = await self.get_by_id(user_id)
+        return None if user is None else CachedUser.from_model(user)
 
     async def get_by_email(self, email: str) -> User | None:
-        stmt = select(User).where(User.email == email)
+        # Case-insensitive, matching (and seeking) uq_user_email_lower
+        stmt = select(User).where(func.lower(User.email) == func.lower(email))
         result = await self.session.execute(stmt)
-        return result.scalars().first()
+        return result.scalar_one_or_none()
 
-    async def create(self, user: User) -> User:
-        self.session.add(user)
-        await self.session.flush()
-        return user
+    async def create(self, *, name: str, email: str) -> User | None:
+        """Insert a user in one round trip; ``None`` if the email is taken,
+        in any letter case.
 
-    async def get_loans(self, user_id: int) -> Sequence[Loan]:
-        stmt = select(Loan).where(Loan.user_id == user_id)
+        The conflict is resolved by Postgres instead of raising, so the
+        transaction stays usable.
+        """
+        stmt = (
+            insert(User)
+            .values(name=name, email=email)
+            .on_conflict_do_nothing(index_elements=[func.lower(User.email)])
+            .returning(User)
+        )
         result = await self.session.execute(stmt)
-        return result.scalars().all()
+        return result.scalar_one_or_none()
+
+    async def decrement_active_loans(self, user_id: int) -> None:
+        # Relative update: no read, and no lost decrement under concurrency
+        active = User.active_loans - 1
+        stmt = update(User).where(User.id == user_id).values(active_loans=active)
+        await self.session.execute(stmt)
@@ -0,0 +1,7 @@
+from app.schemas.wire import WireModel
+
+
+class Page[T](WireModel):
+    items: list[T]
+    # Opaque; pass it back as ?cursor= to get the next page. None on the last.
+    next_cursor: str | None
@@ -1,14 +1,15 @@
 from collections.abc import Sequence
+from functools import partial
 
 import structlog
 from opentelemetry import trace
-from sqlalchemy.exc import IntegrityError
 
-from app.cache.book import BookCache
+from app.cache.book import NOT_FOUND, BookCache, CachedBook
 from app.db.models.book import Book
 from app.db.models.book_copy import BookCopy
+from app.db.transaction import after_commit
 from app.exceptions.domain import BookAlreadyExists, BookNotFound
-from app.repositories.book import BookRepository
+from app.repositories.book import BookRepository, BookRow
 from app.repositories.book_copy import BookCopyRepository
 
 logger = structlog.get_logger("sgbd.services.book")
@@ -23,58 +24,78 @@ class BookService:
         self.copies = copies
         self.cache = cache
 
-    async def list_all(self, *, offset: int = 0, limit: int = 50) -> Sequence[Book]:
+    async def list_all(
+        self, *, after: int | None = None, limit: int = 50
+    ) -> Sequence[BookRow]:
         with tracer.start_as_current_span("BookService.list_all") as span:
-            span.set_attribute("offset", offset)
+            span.set_attribute("first_page", after is None)
             span.set_attribute("limit", limit)
-            books = await self.books.list_all(offset=offset, limit=limit)
+            books = await self.books.list_rows(after=after, limit=limit)
             span.set_attribute("result_count", len(books))
             return books
 
-    async def get_by_id(self, *, book_id: int) -> Book:
+    async def get_by_id(self, *, book_id: int) -> CachedBook:
         structlog.contextvars.bind_contextvars(book_id=book_id)
 
         with tracer.start_as_current_span("BookService.get_by_id") as span:
             span.set_attribute("book_id", book_id)
 
             # Try cache first
-            book = await self.cache.get(book_id)
-            if book is not None:
+            cached = await self.cache.get(book_id)
+            if cached is NOT_FOUND:
                 span.set_attribute("cache_hit", True)
-                return book
+                logger.warning("book_not_found", book_id=book_id, cached=True)
+                raise BookNotFound(book_id=book_id)
+            if cached is not None:
+                span.set_attribute("cache_hit", True)
+                return cached
 
             span.set_attribute("cache_hit", False)
-            book = await self.books.get_by_id(book_id)
+
+            # Concurrent misses share one query and populate the cache once
+            book = await self.cache.get_or_load(
+                book_id, lambda: self.books.get_cached_by_id(book_id)
+            )
 
             if book is None:
                 logger.warning("book_not_found", book_id=book_id)
                 raise BookNotFound(book_id=book_id)
 
-            # Populate cache on DB hit
-            await self.cache.set(book)
             return book
 
+    async def get_many(self, *, book_ids: Sequence[int]) -> list[CachedBook]:
+        with tracer.start_as_current_span("BookService.get_many") as span:
+            span.set_attribute("requested_count", len(book_ids))
+
+            found = await self.cache.get_many_or_load(book_ids, self.books.get_by_ids)
+
+            span.set_attribute("result_count", len(found))
+            return [found[book_id] for book_id in book_ids if book_id in found]
+
     async def create(self, *, title: str, author: str) -> Book:
         with tracer.start_as_current_span("BookService.create") as span:
             span.set_attribute("title", title)
             span.set_attribute("author", author)
 
-            book = Book(title=title, author=author)
+            # One INSERT ... ON CONFLICT DO NOTHING; no IntegrityError to undo
+            created = await self.books.create(title=title, author=author)
 
-            try:
-                created = await self.books.create(book)
-            except IntegrityError as exc:
+            if created is None:
                 logger.warning(
                     "book_creation_failed",
                     reason="book_already_exists",
                     title=title,
                     author=author,
                 )
-                raise BookAlreadyExists(title=title, author=author) from exc
+                raise BookAlreadyExists(title=title, author=author)
 
             structlog.contextvars.bind_contextvars(book_id=created.id)
             span.set_attribute("book_id", created.id)
             logger.info("book_created", book_id=created.id, title=title)
+
+            # Cached only once committed, replacing any tombstone left by
+            # lookups of this id before it existed
+            after_commit(self.books.session, partial(self.cache.set, created))
             return created
 
     async def create_copy(self, *, book_id: int) -> BookCopy:
@@ -1,12 +1,13 @@
 from collections.abc import Sequence
-from datetime import UTC, datetime, timedelta
+from datetime import UTC, datetime
 
 import structlog
 from opentelemetry import trace
-from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm.exc import StaleDataError
 
-from app.db.models.loan import Loan
+from app.cache.entity import NOT_FOUND
+from app.cache.user import UserCache
+from app.db.models.loan import Loan, LoanStatus
 from app.exceptions.domain import (
     BookNotFound,
     LoanAlreadyReturned,
@@ -16,9 +17,13 @@ from app.exceptions.domain import (
     NoCopiesAvailable,
     UserNotFound,
 )
-from app.repositories.book import BookRepository
-from app.repositories.book_copy import BookCopyRepository
-from app.repositories.loan import LoanRepository
+from app.repositories.loan import (
+    CheckoutStatus,
+    DueKey,
+    LoanedKey,
+    LoanRepository,
+    LoanRow,
+)
 from app.repositories.user import UserRepository
 
 LOAN_DAYS: int = 14
@@ -34,26 +39,39 @@ class LoanService:
         self,
         loans: LoanRepository,
         users: UserRepository,
-        books: BookRepository,
-        copies: BookCopyRepository,
+        user_cache: UserCache,
     ):
         self.loans = loans
         self.users = users
-        self.books = books
-        self.copies = copies
+        self.user_cache = user_cache
 
-    async def list_by_user(self, user_id: int) -> Sequence[Loan]:
+    async def list_by_user(
+        self,
+        user_id: int,
+        *,
+        status: LoanStatus | None,
+        after: LoanedKey | None,
+        limit: int,
+    ) -> Sequence[LoanRow]:
         structlog.contextvars.bind_contextvars(user_id=user_id)
 
         with tracer.start_as_current_span("LoanService.list_by_user") as span:
             span.set_attribute("user_id", user_id)
+            span.set_attribute("status", status or "all")
+            span.set_attribute("first_page", after is None)
+            span.set_attribute("limit", limit)
 
-            if not await self.users.exists(user_id):
+            user = await self.user_cache.fetch(
+                user_id, lambda: self.users.get_cached_by_id(user_id)
+            )
+            if user is None:
                 logger.warning("user_not_found", user_id=user_id)
                 raise UserNotFound(user_id=user_id)
 
-            loans = await self.loans.list_by_user(user_id)
-            span.set_attribute("loan_count", len(loans))
+            loans = await self.loans.list_by_user_rows(
+                user_id, status=status, after=after, limit=limit
+            )
+            span.set_attribute("result_count", len(loans))
             return loans
 
     async def create(self, user_id: int, book_id: int) -> Loan:
@@ -63,54 +81,58 @@ class LoanService:
             span.set_attribute("user_id", user_id)
             span.set_attribute("book_id", book_id)
 
-            if not await self.books.exists(book_id):
-                logger.warning("loan_creation_failed", reason="book_not_found")
-                raise BookNotFound(book_id=book_id)
-
-            # Lock user row to serialize concurrent loan creation per user
-            user = await self.users.get_for_update(user_id)
-            if not user:
+            # Ids recently confirmed missing fail without touching the database
+            if await self.user_cache.get(user_id) is NOT_FOUND:
                 logger.warning("loan_creation_failed", reason="user_not_found")
                 raise UserNotFound(user_id=user_id)
 
-            active = await self.loans.count_active_by_user(user_id)
-            span.set_attribute("active_loans", active)
-
-            if active >= MAX_ACTIVE_LOANS:
-                logger.warning(
-                    "loan_creation_failed",
-                    reason="max_loans_exceeded",
-                    active=active,
-                    max_allowed=MAX_ACTIVE_LOANS,
-                )
-                raise MaxActiveLoansExceeded(user_id=user_id, active=active)
-
-            # Find an available copy
-            copy = await self.copies.get_available_for_book(book_id)
-            if not copy:
-                logger.warning("loan_creation_failed", reason="no_copies_available")
-                raise NoCopiesAvailable(book_id=book_id)
-
-            span.set_attribute("copy_id", copy.id)
-
-            now = datetime.now(UTC)
-            due_to = now + timedelta(days=LOAN_DAYS)
-            loan = Loan(user_id=user_id, copy_id=copy.id, due_to=due_to)
+            checkout = await self.loans.checkout(
+                user_id, book_id, max_active=MAX_ACTIVE_LOANS, loan_days=LOAN_DAYS
+            )
+            span.set_attribute("checkout_status", checkout.status)
+            span.set_attribute("active_loans", checkout.active)
+            span.set_attribute("copy_attempts", checkout.attempts)
 
-            try:
-                created = await self.loans.save(loan)
-                span.set_attribute("loan_id", created.id)
+            if (loan := checkout.loan) is not None:
+                span.set_attribute("copy_id", loan.copy_id)
+                span.set_attribute("loan_id", loan.id)
                 logger.info(
                     "loan_created",
-                    loan_id=created.id,
-                    copy_id=copy.id,
-                    due_to=due_to.isoformat(),
+                    loan_id=loan.id,
+                    copy_id=loan.copy_id,
+                    due_to=loan.due_to.isoformat(),
+                    copy_attempts=checkout.attempts,
                 )
-                return created
-            except IntegrityError as exc:
-                # Concurrent request took this copy
-                logger.warning("loan_creation_failed", reason="no_copies_available")
-                raise NoCopiesAvailable(book_id=book_id) from exc
+                return loan
+
+            match checkout.status:
+                case CheckoutStatus.BOOK_NOT_FOUND:
+                    logger.warning("loan_creation_failed", reason="book_not_found")
+                    raise BookNotFound(book_id=book_id)
+
+                case CheckoutStatus.USER_NOT_FOUND:
+                    logger.warning("loan_creation_failed", reason="user_not_found")
+                    await self.user_cache.set_missing(user_id)
+                    raise UserNotFound(user_id=user_id)
+
+                case CheckoutStatus.MAX_ACTIVE_LOANS_EXCEEDED:
+                    logger.warning(
+                        "loan_creation_failed",
+                        reason="max_loans_exceeded",
+                        active=checkout.active,
+                        max_allowed=MAX_ACTIVE_LOANS,
+                    )
+                    raise MaxActiveLoansExceeded(
+                        user_id=user_id, active=checkout.active
+                    )
+
+                case CheckoutStatus.NO_COPIES_AVAILABLE:
+                    logger.warning(
+                        "loan_creation_failed",
+                        reason="no_copies_available",
+                        copies_taken=checkout.attempts,
+                    )
+                    raise NoCopiesAvailable(book_id=book_id)
 
     async def fulfill(self, loan_id: int) -> Loan:
         structlog.contextvars.bind_contextvars(loan_id=loan_id)
@@ -151,23 +173,31 @@ class LoanService:
                 logger.info("loan_returned_on_time")
 
             try:
-                return await self.loans.save(loan)
+                saved = await self.loans.save(loan)
             except StaleDataError as exc:
                 logger.warning("loan_return_failed", reason="concurrent_modification")
                 raise LoanConcurrentModification(loan_id=loan_id) from exc
 
-    async def list_active(self, offset: int, limit: int) -> Sequence[Loan]:
+            # Same transaction as the return: the counter moves with it or not at all
+            await self.users.decrement_active_loans(loan.user_id)
+            return saved
+
+    async def list_active(
+        self, *, after: DueKey | None, limit: int
+    ) -> Sequence[LoanRow]:
         with tracer.start_as_current_span("LoanService.list_active") as span:
-            span.set_attribute("offset", offset)
+            span.set_attribute("first_page", after is None)
             span.set_attribute("limit", limit)
-            loans = await self.loans.list_active(offset=offset, limit=limit)
+            loans = await self.loans.list_active_rows(after=after, limit=limit)
             span.set_attribute("result_count", len(loans))
             return loans
 
-    async def list_overdue(self, offset: int, limit: int) -> Sequence[Loan]:
+    async def list_overdue(
+        self, *, after: DueKey | None, limit: int
+    ) -> Sequence[LoanRow]:
         with tracer.start_as_current_span("LoanService.list_overdue") as span:
-            span.set_attribute("offset", offset)
+            span.set_attribute("first_page", after is None)
             span.set_attribute("limit", limit)
-            loans = await self.loans.list_overdue(offset=offset, limit=limit)
+            loans = await self.loans.list_overdue_rows(after=after, limit=limit)
             span.set_attribute("result_count", len(loans))
             return loans
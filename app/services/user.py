@@ -1,27 +1,30 @@
 from collections.abc import Sequence
+from functools import partial
 
 import structlog
 from opentelemetry import trace
-from sqlalchemy.exc import IntegrityError
 
-from app.db.models.loan import Loan
+from app.cache.entity import NOT_FOUND
+from app.cache.user import CachedUser, UserCache
 from app.db.models.user import User
+from app.db.transaction import after_commit
 from app.exceptions.domain import EmailAlreadyRegistered, UserNotFound
-from app.repositories.user import UserRepository
+from app.repositories.user import UserRepository, UserRow
 
 logger = structlog.get_logger("sgbd.services.user")
 tracer = trace.get_tracer("sgbd.services.user")
 
 
 class UserService:
-    def __init__(self, users: UserRepository):
+    def __init__(self, users: UserRepository, cache: UserCache):
         self.users = users
+        self.cache = cache
 
-    async def list_all(self, *, offset: int, limit: int) -> Sequence[User]:
+    async def list_all(self, *, after: int | None, limit: int) -> Sequence[UserRow]:
         with tracer.start_as_current_span("UserService.list_all") as span:
-            span.set_attribute("offset", offset)
+            span.set_attribute("first_page", after is None)
             span.set_attribute("limit", limit)
-            users = await self.users.list(offset=offset, limit=limit)
+            users = await self.users.list_rows(after=after, limit=limit)
             span.set_attribute("result_count", len(users))
             return users
 
@@ -29,55 +32,49 @@ class UserService:
         with tracer.start_as_current_span("UserService.create") as span:
             span.set_attribute("email", email)
 
-            user = await self.users.get_by_email(email)
+            # One INSERT ... ON CONFLICT DO NOTHING: no lookup beforehand
+            created = await self.users.create(name=name, email=email)
 
-            if user:
+            if created is None:
                 logger.warning(
                     "user_creation_failed", reason="email_registered", email=email
                 )
                 raise EmailAlreadyRegistered(email=email)
 
-            user = User(name=name, email=email)
-
-            try:
-                created = await self.users.create(user)
-            except IntegrityError as exc:
-                logger.warning(
-                    "user_creation_failed", reason="email_registered", email=email
-                )
-                raise EmailAlreadyRegistered(email=email) from exc
-
             structlog.contextvars.bind_contextvars(user_id=created.id)
             span.set_attribute("user_id", created.id)
             logger.info("user_created", user_id=created.id, email=email)
+
+            # Cached only once committed, replacing any tombstone left by
+            # lookups of this id before it existed
+            after_commit(self.users.session, partial(self.cache.set, created))
             return created
 
-    async def get_by_id(self, user_id: int) -> User:
+    async def get_by_id(self, user_id: int) -> CachedUser:
         structlog.contextvars.bind_contextvars(user_id=user_id)
 
         with tracer.start_as_current_span("UserService.get_by_id") as span:
             span.set_attribute("user_id", user_id)
 
-            user = await self.users.get_by_id(user_id)
-
-            if not user:
-                logger.warning("user_not_found", user_id=user_id)
+            # Try cache first
+            cached = await self.cache.get(user_id)
+            if cached is NOT_FOUND:
+                span.set_attribute("cache_hit", True)
+                logger.warning("user_not_found", user_id=user_id, cached=True)
                 raise UserNotFound(user_id=user_id)
+            if cached is not None:
+                span.set_attribute("cache_hit", True)
+                return cached
 
-            return user
+            span.set_attribute("cache_hit", False)
 
-    async def get_loans(self, user_id: int) -> Sequence[Loan]:
-        structlog.contextvars.bind_contextvars(user_id=user_id)
+            # Concurrent misses share one query and populate the cache once
+            user = await self.cache.get_or_load(
+                user_id, lambda: self.users.get_cached_by_id(user_id)
+            )
 
-        with tracer.start_as_current_span("UserService.get_loans") as span:
-            span.set_attribute("user_id", user_id)
-
-            user = await self.users.get_by_id(user_id)
-
-            if not user:
+            if user is None:
                 logger.warning("user_not_found", user_id=user_id)
                 raise UserNotFound(user_id=user_id)
 
-            loans = await self.users.get_loans(user_id)
-            span.set_attribute("loan_count", len(loans))
-            return loans
+            return user
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Consistency audit for the ``users.active_loans`` counter.
+
+Compares each user's counter with the number of loans not yet returned and
+lists the users where they differ; exits non-zero if any does. With ``--fix``
+those counters are recomputed under the user row lock, so concurrent
+checkouts and returns are neither lost nor double counted. Run from the
+repository root with ``PYTHONPATH=. uv run scripts/audit_active_loans.py``.
+"""
+
+import argparse
+import asyncio
+import sys
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from app.db.config import database_url_async
+from app.db.models.loan import Loan
+from app.db.models.user import User
+
+
+def active_count():
+    returned = Loan.returned_at.is_(None)
+    is_user = Loan.user_id == User.id
+    return select(func.count()).where(is_user, returned).scalar_subquery()
+
+
+async def find_drift(conn: AsyncConnection) -> list[tuple[int, int, int]]:
+    actual = active_count()
+    stmt = (
+        select(User.id, User.active_loans, actual)
+        .where(User.active_loans != actual)
+        .order_by(User.id)
+    )
+    result = await conn.execute(stmt)
+    return [tuple(row) for row in result]
+
+
+async def fix_drift(conn: AsyncConnection, user_ids: list[int]) -> None:
+    # Lock first: the recount below then runs with a snapshot taken after
+    # every in-flight checkout or return of these users has committed
+    lock = select(User.id).where(User.id.in_(user_ids)).with_for_update()
+    await conn.execute(lock)
+    recount = (
+        update(User).where(User.id.in_(user_ids)).values(active_loans=active_count())
+    )
+    await conn.execute(recount)
+
+
+async def audit(*, fix: bool) -> int:
+    engine = create_async_engine(database_url_async())
+    try:
+        async with engine.begin() as conn:
+            drift = await find_drift(conn)
+            for user_id, counter, actual in drift:
+                print(f"user {user_id}: active_loans={counter}, actual={actual}")
+            if drift and fix:
+                await fix_drift(conn, [user_id for user_id, _, _ in drift])
+                print(f"fixed {len(drift)} user(s)")
+    finally:
+        await engine.dispose()
+
+    if not drift:
+        print("active_loans is consistent")
+    return 1 if drift and not fix else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--fix", action="store_true", help="recompute the drifted counters"
+    )
+    args = parser.parse_args()
+    sys.exit(asyncio.run(audit(fix=args.fix)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Microbenchmark for the book cache payload encodings.
+
+Compares the previous layout (a JSON object as a UTF-8 str, as stored with
+``decode_responses=True``) against the positional, codec-tagged payloads
+written by ``app.cache.book``. Run from the repository root with
+``PYTHONPATH=. uv run scripts/bench_cache_codec.py``.
+"""
+
+import json
+import timeit
+
+from app.cache.codec import JsonCodec, OrjsonCodec, pack, unpack
+
+NUMBER = 200_000
+
+ENTRY = {
+    "id": 12345,
+    "title": "Memórias Póstumas de Brás Cubas",
+    "author": "Machado de Assis",
+    "fresh_until": 1767225600.123456,
+    "delta": 0.0021,
+}
+ROW = [
+    ENTRY["fresh_until"],
+    ENTRY["delta"],
+    ENTRY["id"],
+    ENTRY["title"],
+    ENTRY["author"],
+]
+
+
+def legacy() -> tuple[int, float, float]:
+    data = json.dumps(ENTRY).encode()
+    enc = timeit.timeit(lambda: json.dumps(ENTRY).encode(), number=NUMBER)
+    dec = timeit.timeit(lambda: json.loads(data.decode()), number=NUMBER)
+    return len(data), enc, dec
+
+
+def codec(c: JsonCodec | OrjsonCodec) -> tuple[int, float, float]:
+    data = pack(c, ROW)
+    enc = timeit.timeit(lambda: pack(c, ROW), number=NUMBER)
+    dec = timeit.timeit(lambda: unpack(data), number=NUMBER)
+    return len(data), enc, dec
+
+
+def main() -> None:
+    results = {
+        "json object (legacy)": legacy(),
+        "json array": codec(JsonCodec()),
+        "orjson array": codec(OrjsonCodec()),
+    }
+
+    print(f"{'encoding':<22}{'bytes':>8}{'encode µs':>12}{'decode µs':>12}")
+    for name, (size, enc, dec) in results.items():
+        enc_us = enc / NUMBER * 1e6
+        dec_us = dec / NUMBER * 1e6
+        print(f"{name:<22}{size:>8}{enc_us:>12.2f}{dec_us:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
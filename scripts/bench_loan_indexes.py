@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""Before/after query plans for the per-user loan indexes.
+
+Seeds a large loan history (skewed, so a few long-time members hold most of
+it), then runs EXPLAIN ANALYZE on the per-user queries without and with
+``idx_loan_user_loaned`` and ``idx_loan_user_active``. Everything happens in
+one transaction that is rolled back, but dropping the indexes locks ``loans``
+meanwhile: point it at a development database (``DB_*`` variables). Run from
+the repository root with ``PYTHONPATH=. uv run scripts/bench_loan_indexes.py``.
+"""
+
+import argparse
+import asyncio
+
+from sqlalchemy import Index, text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from app.db.config import database_url_async
+from app.db.models.loan import Loan
+
+INDEXES = ("idx_loan_user_loaned", "idx_loan_user_active")
+
+SEED_USERS = """
+INSERT INTO users (name, email)
+SELECT 'Bench ' || g, 'bench-' || g || '@bench.invalid'
+FROM generate_series(1, :users) AS g
+"""
+
+# One copy per loan keeps uq_active_loan_per_copy satisfied; 3% stay open
+SEED_LOANS = """
+WITH bench_users AS (
+    SELECT array_agg(id ORDER BY id) AS ids
+    FROM users WHERE email LIKE 'bench-%@bench.invalid'
+), bench_book AS (
+    INSERT INTO books (title, author) VALUES ('Bench', 'Bench') RETURNING id
+), new_copies AS (
+    INSERT INTO book_copies (book_id)
+    SELECT bench_book.id FROM bench_book, generate_series(1, :loans)
+    RETURNING id
+), history AS (
+    SELECT
+        c.id AS copy_id,
+        u.ids[1 + floor(power(random(), 3) * :users)::int] AS user_id,
+        now() - random() * interval '10 years' AS loaned_at,
+        random() < 0.03 AS is_open
+    FROM new_copies c, bench_users u
+)
+INSERT INTO loans (user_id, copy_id, loaned_at, due_to, returned_at, fine_cents, version)
+SELECT
+    user_id,
+    copy_id,
+    loaned_at,
+    loaned_at + interval '14 days',
+    CASE WHEN NOT is_open THEN loaned_at + random() * interval '20 days' END,
+    0,
+    1
+FROM history
+"""
+
+# The heaviest borrower: the worst case for an unindexed history
+TOP_USER = """
+SELECT user_id FROM loans GROUP BY user_id ORDER BY count(*) DESC LIMIT 1
+"""
+
+QUERIES = {
+    "history page": """
+        SELECT * FROM loans WHERE user_id = :user_id
+        ORDER BY loaned_at DESC, id DESC LIMIT 20
+    """,
+    "full history": "SELECT * FROM loans WHERE user_id = :user_id",
+    "active count": """
+        SELECT count(*) FROM loans
+        WHERE user_id = :user_id AND returned_at IS NULL
+    """,
+}
+
+
+def user_indexes() -> list[Index]:
+    return [index for index in Loan.__table__.indexes if index.name in INDEXES]
+
+
+async def explain(conn: AsyncConnection, query: str, user_id: int) -> list[str]:
+    result = await conn.execute(
+        text(f"EXPLAIN (ANALYZE, BUFFERS) {query}"), {"user_id": user_id}
+    )
+    return list(result.scalars())
+
+
+async def report(conn: AsyncConnection, label: str, user_id: int) -> None:
+    await conn.execute(text("ANALYZE loans"))
+    for name, query in QUERIES.items():
+        print(f"--- {name} ({label})")
+        for line in await explain(conn, query, user_id):
+            print(line)
+        print()
+
+
+async def bench(*, users: int, loans: int) -> None:
+    engine = create_async_engine(database_url_async())
+    try:
+        async with engine.connect() as conn:
+            transaction = await conn.begin()
+            try:
+                for index in user_indexes():
+                    await conn.run_sync(index.drop, checkfirst=True)
+
+                params = {"users": users, "loans": loans}
+                await conn.execute(text(SEED_USERS), params)
+                await conn.execute(text(SEED_LOANS), params)
+                user_id = (await conn.execute(text(TOP_USER))).scalar_one()
+
+                await report(conn, "before", user_id)
+                for index in user_indexes():
+                    await conn.run_sync(index.create)
+                await report(conn, "after", user_id)
+            finally:
+                await transaction.rollback()
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument("--loans", type=int, default=2_000_000)
+    args = parser.parse_args()
+    asyncio.run(bench(users=args.users, loans=args.loans))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Latency of the hot reads on the ORM and on the raw asyncpg path.
+
+Times, one after another, the repository read plus the response encoding of
+GET /books/{id}, GET /users/{id} (cache misses) and a /loans/active page, with
+``BookRepository``/``UserRepository``/``LoanRepository`` on a session and with
+their ``app.repositories.raw`` counterparts on the raw pool. Read-only: point
+it at a database with some books, users and active loans (``DB_*``
+variables). Run from the repository root with
+``PYTHONPATH=. uv run scripts/bench_read_backends.py``.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+
+from fastapi import Response
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import app.db.models  # noqa: F401 - configures the mappers
+from app.api.pagination import paginate
+from app.db.config import database_url_async
+from app.db.pool import RAW_REPOSITORIES, close_pool, get_raw_pool, init_pool
+from app.repositories.book import BookRepository
+from app.repositories.loan import LoanRepository
+from app.repositories.raw import (
+    RawBookRepository,
+    RawLoanRepository,
+    RawUserRepository,
+)
+from app.repositories.user import UserRepository
+from app.schemas.loan import LoanResponse
+from app.schemas.page import Page
+
+type Read = Callable[[], Awaitable[bytes]]
+
+
+async def timed(read: Read, number: int) -> float:
+    """Median latency of ``read`` in µs, after a warm-up round."""
+    for _ in range(10):
+        await read()
+    samples = []
+    for _ in range(number):
+        started = time.perf_counter()
+        await read()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1e6
+
+
+def due_key(loan) -> tuple[datetime, int]:
+    return (loan.due_to, loan.id)
+
+
+def page_body(page: Page[LoanResponse] | Response) -> bytes:
+    if isinstance(page, Response):
+        return bytes(page.body)
+    return page.model_dump_json().encode()
+
+
+async def bench(*, number: int, page: int) -> None:
+    engine = create_async_engine(database_url_async())
+    sessions = async_sessionmaker(bind=engine, expire_on_commit=False)
+    await init_pool(repositories=RAW_REPOSITORIES)
+    if (pool := get_raw_pool("books")) is None:
+        raise SystemExit("could not open the raw pool")
+
+    try:
+        async with engine.connect() as conn:
+            book_id = (await conn.execute(text("SELECT min(id) FROM books"))).scalar()
+            user_id = (await conn.execute(text("SELECT min(id) FROM users"))).scalar()
+
+        async def orm_book() -> bytes:
+            async with sessions() as session:
+                return (await BookRepository(session).get_cached_by_id(book_id)).body
+
+        async def raw_book() -> bytes:
+            return (await RawBookRepository(None, pool).get_cached_by_id(book_id)).body
+
+        async def orm_user() -> bytes:
+            async with sessions() as session:
+                return (await UserRepository(session).get_cached_by_id(user_id)).body
+
+        async def raw_user() -> bytes:
+            return (await RawUserRepository(None, pool).get_cached_by_id(user_id)).body
+
+        def active(repository: Callable[[], LoanRepository]) -> Read:
+            async def read() -> bytes:
+                rows = await repository().list_active_rows(after=None, limit=page + 1)
+                return page_body(paginate(LoanResponse, rows, page, due_key))
+
+            return read
+
+        async def orm_active() -> bytes:
+            async with sessions() as session:
+                return await active(lambda: LoanRepository(session))()
+
+        raw_active = active(lambda: RawLoanRepository(None, pool))
+
+        reads = {
+            "GET /books/{id}": (orm_book, raw_book),
+            "GET /users/{id}": (orm_user, raw_user),
+            f"/loans/active ({page})": (orm_active, raw_active),
+        }
+        print(f"{'read':<22}{'orm µs':>10}{'raw µs':>10}{'speedup':>10}")
+        for name, (orm, raw) in reads.items():
+            if await orm() != await raw():
+                raise SystemExit(f"{name}: the backends disagree")
+            before = await timed(orm, number)
+            after = await timed(raw, number)
+            print(f"{name:<22}{before:>10.0f}{after:>10.0f}{before / after:>9.1f}x")
+    finally:
+        await close_pool()
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=2_000)
+    parser.add_argument("--page", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(bench(number=args.number, page=args.page))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Trace-driven hit ratio simulator for the in-memory cache policies.
+
+Replays a sequence of book ids against ``cachetools.TTLCache`` (LRU, the
+default L1) and ``TinyLFUCache`` of the same size, and prints the hit ratio
+of each. Every miss is followed by an insert, as ``EntityCache`` does.
+
+The trace is a file with one id per line (``--trace``); without one, a
+synthetic trace is generated: Zipf-distributed reads over the catalog,
+interrupted by sequential scans of the whole catalog, like a crawler.
+Run from the repository root with
+``PYTHONPATH=. uv run scripts/simulate_cache_policy.py --size 1000``.
+"""
+
+import argparse
+import itertools
+import random
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+from cachetools import TTLCache
+
+from app.cache.tinylfu import TinyLFUCache
+
+TTL: float = float("inf")  # Measure eviction only, not expiry
+
+
+def read_trace(path: Path) -> Iterator[int]:
+    with path.open() as lines:
+        for line in lines:
+            if line := line.strip():
+                yield int(line)
+
+
+def synthetic_trace(
+    *,
+    requests: int,
+    catalog: int,
+    skew: float,
+    scan_every: int,
+    seed: int,
+) -> Iterator[int]:
+    rng = random.Random(seed)
+    weights = list(
+        itertools.accumulate(1 / rank**skew for rank in range(1, catalog + 1))
+    )
+    # Popularity is independent of id order, so scans don't favour hot ids
+    ids = list(range(1, catalog + 1))
+    rng.shuffle(ids)
+
+    emitted = 0
+    while emitted < requests:
+        batch = min(scan_every or requests, requests - emitted)
+        yield from rng.choices(ids, cum_weights=weights, k=batch)
+        emitted += batch
+        if scan_every and emitted < requests:
+            scan = range(1, min(catalog, requests - emitted) + 1)
+            yield from scan
+            emitted += len(scan)
+
+
+def hit_ratio(
+    cache: TTLCache[int, int] | TinyLFUCache[int, int], trace: Iterable[int]
+) -> float:
+    hits = total = 0
+    for book_id in trace:
+        total += 1
+        if cache.get(book_id) is not None:
+            hits += 1
+        else:
+            cache[book_id] = book_id
+    return hits / total if total else 0.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--trace", type=Path, help="file with one id per line")
+    parser.add_argument("--size", type=int, default=1000, help="cache capacity")
+    parser.add_argument("--requests", type=int, default=500_000)
+    parser.add_argument("--catalog", type=int, default=50_000)
+    parser.add_argument("--skew", type=float, default=0.9, help="Zipf exponent")
+    parser.add_argument(
+        "--scan-every", type=int, default=100_000, help="0 disables scans"
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if args.trace:
+        trace = list(read_trace(args.trace))
+    else:
+        trace = list(
+            synthetic_trace(
+                requests=args.requests,
+                catalog=args.catalog,
+                skew=args.skew,
+                scan_every=args.scan_every,
+                seed=args.seed,
+            )
+        )
+
+    policies = {
+        "lru (TTLCache)": TTLCache(maxsize=args.size, ttl=TTL),
+        "w-tinylfu": TinyLFUCache(maxsize=args.size, ttl=TTL),
+    }
+
+    print(f"{len(trace)} requests, {len(set(trace))} distinct ids, size {args.size}")
+    print(f"{'policy':<16}{'hit ratio':>10}")
+    for name, cache in policies.items():
+        print(f"{name:<16}{hit_ratio(cache, trace):>10.2%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@ from collections.abc import AsyncGenerator, Generator
 
 import pytest
 from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event, make_url
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
@@ -12,7 +13,9 @@ from testcontainers.postgres import PostgresContainer
 
 import app.db.models  # noqa: F401 - registers models with Base.metadata
 from app.db.base import Base
+from app.db.pool import RAW_REPOSITORIES, close_pool, init_pool
 from app.db.session import get_db_async_session
+from app.db.transaction import commit
 
 
 @pytest.fixture(scope="session")
@@ -37,6 +40,19 @@ async def engine(postgres: PostgresContainer) -> AsyncGenerator[AsyncEngine]:
     await engine.dispose()
 
 
+@pytest.fixture
+def statements(engine: AsyncEngine) -> Generator[list[str]]:
+    """SQL statements sent by ``engine`` during the test, in order."""
+    executed: list[str] = []
+
+    def capture(_conn, _cursor, statement, _parameters, _context, _many):
+        executed.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    yield executed
+    event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+
 @pytest.fixture
 async def db_session(engine: AsyncEngine) -> AsyncGenerator[AsyncSession]:
     session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
@@ -45,8 +61,18 @@ async def db_session(engine: AsyncEngine) -> AsyncGenerator[AsyncSession]:
         await session.rollback()
 
 
+@pytest.fixture(params=["orm", "raw"])
+def read_backend(request: pytest.FixtureRequest) -> str:
+    """Backend of the hot reads: the API tests run against the ORM and against
+    the raw asyncpg path (``app.repositories.raw``)."""
+    return request.param
+
+
 @pytest.fixture
-async def client(engine: AsyncEngine) -> AsyncGenerator[AsyncClient]:
+async def client(
+    postgres: PostgresContainer, engine: AsyncEngine, read_backend: str
+) -> AsyncGenerator[AsyncClient]:
+    from app.lifespan import lifespan
     from app.main import app
 
     session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
@@ -54,13 +80,22 @@ async def client(engine: AsyncEngine) -> AsyncGenerator[AsyncClient]:
     async def override_session():
         async with session_factory() as session:
             yield session
-            await session.commit()
+            await commit(session)
 
     app.dependency_overrides[get_db_async_session] = override_session
 
-    async with AsyncClient(
-        transport=ASGITransport(app=app), base_url="http://test"
-    ) as client:
-        yield client
+    # ASGITransport does not run the lifespan; enter it so the process-wide
+    # caches exist and start empty for every test database.
+    async with (
+        lifespan(app),
+        AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client,
+    ):
+        if read_backend == "raw":
+            url = make_url(postgres.get_connection_url()).set(drivername="postgresql")
+            await init_pool(url, RAW_REPOSITORIES)
+        try:
+            yield client
+        finally:
+            await close_pool()
 
     app.dependency_overrides.clear()
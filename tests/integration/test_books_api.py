@@ -1,3 +1,7 @@
+from app.api.pagination import MAX_PAGE_SIZE
+from app.repositories.book import BookRepository
+
+
 class TestCreateBook:
     async def test_create_book_success(self, client):
         response = await client.post(
@@ -25,6 +29,23 @@ class TestCreateBook:
         assert response.status_code == 409
         assert response.json()["code"] == "book_already_exists"
 
+    async def test_create_book_is_one_statement(self, client, statements):
+        statements.clear()
+        response = await client.post(
+            "/books", json={"title": "Test Book", "author": "Test Author"}
+        )
+
+        assert response.status_code == 201
+        assert len(statements) == 1
+
+    async def test_conflict_keeps_transaction_usable(self, db_session):
+        books = BookRepository(db_session)
+        await books.create(title="Dom Casmurro", author="Machado de Assis")
+
+        duplicate = await books.create(title="Dom Casmurro", author="Machado de Assis")
+        assert duplicate is None
+        assert await books.create(title="Dom Casmurro", author="Other") is not None
+
     async def test_create_book_same_title_different_author(self, client):
         await client.post(
             "/books",
@@ -84,7 +105,7 @@ class TestListBooks:
         response = await client.get("/books")
 
         assert response.status_code == 200
-        assert len(response.json()) >= 2
+        assert len(response.json()["items"]) >= 2
 
     async def test_list_books_pagination(self, client):
         for i in range(5):
@@ -92,7 +113,37 @@ class TestListBooks:
                 "/books", json={"title": f"Page Book {i}", "author": f"Author {i}"}
             )
 
-        response = await client.get("/books?offset=0&limit=2")
+        response = await client.get("/books?limit=2")
 
         assert response.status_code == 200
-        assert len(response.json()) == 2
+        assert len(response.json()["items"]) == 2
+        assert response.json()["next_cursor"] is not None
+
+    async def test_list_books_cursor_walks_every_book_once(self, client):
+        for i in range(5):
+            await client.post(
+                "/books", json={"title": f"Cursor Book {i}", "author": "Author"}
+            )
+
+        seen: list[int] = []
+        cursor = None
+        while True:
+            params = {"limit": 2} | ({"cursor": cursor} if cursor else {})
+            page = (await client.get("/books", params=params)).json()
+            seen += [book["id"] for book in page["items"]]
+            if (cursor := page["next_cursor"]) is None:
+                break
+
+        assert seen == sorted(set(seen))
+        assert len(seen) >= 5
+
+    async def test_list_books_limit_is_capped(self, client):
+        response = await client.get(f"/books?limit={MAX_PAGE_SIZE + 1}")
+
+        assert response.status_code == 422
+
+    async def test_list_books_invalid_cursor(self, client):
+        response = await client.get("/books?cursor=garbage")
+
+        assert response.status_code == 400
+        assert response.json()["code"] == "invalid_cursor"
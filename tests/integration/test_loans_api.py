@@ -1,4 +1,10 @@
+import asyncio
+
 import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import InvalidRequestError
+
+from app.repositories.loan import WITH_BOOK, WITH_USER, LoanRepository
 
 
 @pytest.fixture
@@ -54,6 +60,17 @@ class TestCreateLoan:
         assert data["fine_cents"] == 0
         assert "due_to" in data
 
+    async def test_create_loan_single_round_trip(self, client, statements, user, book):
+        statements.clear()
+        response = await client.post(
+            "/loans",
+            json={"user_id": user["id"], "book_id": book["id"]},
+        )
+
+        assert response.status_code == 201
+        assert len(statements) == 1
+        assert "checkout_loan" in statements[0]
+
     async def test_create_loan_user_not_found(self, client, book):
         response = await client.post(
             "/loans",
@@ -105,6 +122,34 @@ class TestCreateLoan:
         assert response.json()["code"] == "max_active_loans_exceeded"
         assert response.json()["context"]["active"] == 3
 
+    async def test_concurrent_checkouts_spread_across_copies(self, client):
+        borrowers = 10
+        response = await client.post(
+            "/books", json={"title": "Popular Book", "author": "Test Author"}
+        )
+        book_id = response.json()["id"]
+        for _ in range(borrowers):
+            await client.post(f"/books/{book_id}/copies")
+        users = [
+            (
+                await client.post(
+                    "/users",
+                    json={"name": f"Borrower {i}", "email": f"borrower{i}@email.com"},
+                )
+            ).json()
+            for i in range(borrowers)
+        ]
+
+        responses = await asyncio.gather(
+            *(
+                client.post("/loans", json={"user_id": u["id"], "book_id": book_id})
+                for u in users
+            )
+        )
+
+        assert [r.status_code for r in responses] == [201] * borrowers
+        assert len({r.json()["copy_id"] for r in responses}) == borrowers
+
 
 class TestReturnLoan:
     async def test_return_loan_success(self, client, user, book):
@@ -155,6 +200,34 @@ class TestReturnLoan:
 
         assert response.status_code == 201
 
+    async def test_active_loans_counter(self, client, engine, user, books):
+        async def counter() -> int:
+            async with engine.connect() as conn:
+                result = await conn.execute(
+                    text("SELECT active_loans FROM users WHERE id = :id"),
+                    {"id": user["id"]},
+                )
+                return result.scalar_one()
+
+        loan_ids = []
+        for book in books[:2]:
+            response = await client.post(
+                "/loans", json={"user_id": user["id"], "book_id": book["id"]}
+            )
+            loan_ids.append(response.json()["id"])
+        assert await counter() == 2
+
+        # No copy left: the increment is undone
+        response = await client.post(
+            "/loans", json={"user_id": user["id"], "book_id": books[0]["id"]}
+        )
+        assert response.status_code == 409
+        assert await counter() == 2
+
+        await client.post(f"/loans/{loan_ids[0]}/return")
+        await client.post(f"/loans/{loan_ids[0]}/return")
+        assert await counter() == 1
+
 
 class TestListLoans:
     async def test_list_active_loans(self, client, user, book):
@@ -166,13 +239,29 @@ class TestListLoans:
         response = await client.get("/loans/active")
 
         assert response.status_code == 200
-        assert len(response.json()) >= 1
+        assert len(response.json()["items"]) >= 1
+
+    async def test_list_active_loans_cursor(self, client, user, books):
+        for book in books[:3]:
+            await client.post(
+                "/loans", json={"user_id": user["id"], "book_id": book["id"]}
+            )
+
+        first = (await client.get("/loans/active?limit=2")).json()
+        params = {"limit": 2, "cursor": first["next_cursor"]}
+        second = (await client.get("/loans/active", params=params)).json()
+
+        first_ids = {loan["id"] for loan in first["items"]}
+        second_ids = {loan["id"] for loan in second["items"]}
+        assert len(first_ids) == 2
+        assert second_ids
+        assert not first_ids & second_ids
 
     async def test_list_overdue_loans(self, client):
         response = await client.get("/loans/overdue")
 
         assert response.status_code == 200
-        assert isinstance(response.json(), list)
+        assert isinstance(response.json()["items"], list)
 
     async def test_list_user_loans(self, client, user, book):
         await client.post(
@@ -183,4 +272,102 @@ class TestListLoans:
         response = await client.get(f"/users/{user['id']}/loans")
 
         assert response.status_code == 200
-        assert len(response.json()) >= 1
+        assert len(response.json()["items"]) == 1
+
+    async def test_list_user_loans_newest_first_cursor(self, client, user, books):
+        created = []
+        for book in books[:3]:
+            response = await client.post(
+                "/loans", json={"user_id": user["id"], "book_id": book["id"]}
+            )
+            created.append(response.json()["id"])
+
+        first = (await client.get(f"/loans/users/{user['id']}?limit=2")).json()
+        second = (
+            await client.get(
+                f"/loans/users/{user['id']}",
+                params={"limit": 2, "cursor": first["next_cursor"]},
+            )
+        ).json()
+
+        listed = [loan["id"] for loan in first["items"] + second["items"]]
+        assert listed == created[::-1]
+        assert second["next_cursor"] is None
+
+    async def test_list_user_loans_status_filter(self, client, user, books):
+        loan_ids = []
+        for book in books[:2]:
+            response = await client.post(
+                "/loans", json={"user_id": user["id"], "book_id": book["id"]}
+            )
+            loan_ids.append(response.json()["id"])
+        await client.post(f"/loans/{loan_ids[0]}/return")
+
+        def ids(response):
+            return [loan["id"] for loan in response.json()["items"]]
+
+        url = f"/users/{user['id']}/loans"
+        active = await client.get(url, params={"status": "active"})
+        returned = await client.get(url, params={"status": "returned"})
+        overdue = await client.get(url, params={"status": "overdue"})
+
+        assert ids(active) == [loan_ids[1]]
+        assert ids(returned) == [loan_ids[0]]
+        assert ids(overdue) == []
+
+    async def test_list_user_loans_invalid_status(self, client, user):
+        response = await client.get(
+            f"/loans/users/{user['id']}", params={"status": "lost"}
+        )
+
+        assert response.status_code == 422
+
+
+class TestLoanQueryCount:
+    @pytest.fixture
+    async def loans(self, client, user, books):
+        for book in books[:3]:
+            await client.post(
+                "/loans", json={"user_id": user["id"], "book_id": book["id"]}
+            )
+
+    @pytest.mark.parametrize(
+        "path",
+        ["/loans/active", "/loans/overdue", "/users/{user_id}/loans"],
+    )
+    async def test_one_statement_per_page(
+        self, client, statements, read_backend, user, loans, path
+    ):
+        statements.clear()
+        response = await client.get(
+            path.format(user_id=user["id"]), params={"limit": 2}
+        )
+
+        assert response.status_code == 200
+        # The raw path reads active loans on its own pool, not on the engine
+        raw = read_backend == "raw" and path == "/loans/active"
+        assert len(statements) == (0 if raw else 1)
+
+    async def test_return_loads_no_relationships(self, client, statements, user, books):
+        created = await client.post(
+            "/loans", json={"user_id": user["id"], "book_id": books[0]["id"]}
+        )
+
+        statements.clear()
+        await client.post(f"/loans/{created.json()['id']}/return")
+
+        # Load the loan, update it, decrement the user's counter
+        assert len(statements) == 3
+
+    async def test_eager_loading_is_opt_in(self, db_session, user, loans):
+        repo = LoanRepository(db_session)
+        [row] = await repo.list_active_rows(after=None, limit=1)
+
+        plain = await repo.get_by_id(row.id)
+        with pytest.raises(InvalidRequestError):
+            _ = plain.user
+
+        db_session.expunge_all()
+        loaded = await repo.get_by_id(row.id, load=[WITH_USER, WITH_BOOK])
+        assert loaded.user.id == user["id"]
+        assert loaded.copy.book.author == "Test Author"
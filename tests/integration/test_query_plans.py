@@ -0,0 +1,216 @@
+import json
+from collections.abc import Awaitable, Callable, Iterator, Sequence
+from typing import Any
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.functions import AVAILABLE_COPY
+from app.repositories.loan import LoanRepository
+from app.repositories.user import UserRepository
+
+COPIES_PER_BOOK = 3
+
+# :batch only makes the titles unique; Postgres types it as text
+SEED_LOANED_BOOKS = """
+WITH new_books AS (
+    INSERT INTO books (title, author)
+    SELECT 'Seed ' || :batch || '-' || g, 'Seed Author'
+    FROM generate_series(1, :count) AS g
+    RETURNING id
+), new_copies AS (
+    INSERT INTO book_copies (book_id)
+    SELECT id FROM new_books
+    RETURNING id
+)
+INSERT INTO loans (user_id, copy_id, due_to, fine_cents, version)
+SELECT :user_id, id, now() + interval '14 days', 0, 1 FROM new_copies
+"""
+
+
+async def explain_analyze(
+    session: AsyncSession, run: Callable[[], Awaitable[Any]]
+) -> dict[str, Any]:
+    """Run ``run``, then EXPLAIN ANALYZE the last statement it executed."""
+    executed: list[tuple[str, Any]] = []
+
+    def capture(_conn, _cursor, statement, parameters, _context, _many):
+        executed.append((statement, parameters))
+
+    sync_engine = session.bind.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", capture)
+    try:
+        await run()
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", capture)
+
+    statement, parameters = executed[-1]
+    conn = await session.connection()
+    result = await conn.exec_driver_sql(
+        f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement}", parameters
+    )
+    plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+def nodes(plan: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from nodes(child)
+
+
+def index_names(plan: dict[str, Any]) -> set[str]:
+    return {node["Index Name"] for node in nodes(plan) if "Index Name" in node}
+
+
+def rows_read(plan: dict[str, Any], relation: str) -> int:
+    return sum(
+        node["Actual Rows"] * node["Actual Loops"]
+        for node in nodes(plan)
+        if node.get("Relation Name") == relation
+    )
+
+
+@pytest.fixture
+async def seeded(db_session: AsyncSession) -> dict[str, int]:
+    user_id = (
+        await db_session.execute(
+            text(
+                "INSERT INTO users (name, email) "
+                "VALUES ('Seed', 'seed@example.com') RETURNING id"
+            )
+        )
+    ).scalar_one()
+
+    book_id = (
+        await db_session.execute(
+            text(
+                "INSERT INTO books (title, author) "
+                "VALUES ('Target', 'Seed Author') RETURNING id"
+            )
+        )
+    ).scalar_one()
+    copy_ids = (
+        (
+            await db_session.execute(
+                text(
+                    "INSERT INTO book_copies (book_id) "
+                    "SELECT :book_id FROM generate_series(1, :n) RETURNING id"
+                ),
+                {"book_id": book_id, "n": COPIES_PER_BOOK},
+            )
+        )
+        .scalars()
+        .all()
+    )
+    await db_session.execute(
+        text(
+            "INSERT INTO loans (user_id, copy_id, due_to, fine_cents, version) "
+            "VALUES (:user_id, :copy_id, now() + interval '14 days', 0, 1)"
+        ),
+        {"user_id": user_id, "copy_id": copy_ids[0]},
+    )
+    return {"user_id": user_id, "book_id": book_id}
+
+
+async def seed_active_loans(
+    session: AsyncSession, user_id: int, *, batch: str, count: int
+) -> None:
+    await session.execute(
+        text(SEED_LOANED_BOOKS), {"user_id": user_id, "batch": batch, "count": count}
+    )
+    await session.execute(text("ANALYZE books, book_copies, loans"))
+
+
+def find_available_copy(
+    session: AsyncSession, book_id: int, *, taken: Sequence[int] = ()
+):
+    """checkout_loan's copy search, run on its own."""
+    params = {"book_id": book_id, "taken": list(taken)}
+    return session.execute(text(AVAILABLE_COPY), params)
+
+
+class TestAvailableCopyPlan:
+    async def test_cost_does_not_grow_with_active_loans(self, db_session, seeded):
+        def find():
+            return find_available_copy(db_session, seeded["book_id"])
+
+        await seed_active_loans(db_session, seeded["user_id"], batch="1", count=2_000)
+        small = await explain_analyze(db_session, find)
+
+        await seed_active_loans(db_session, seeded["user_id"], batch="2", count=20_000)
+        large = await explain_analyze(db_session, find)
+
+        # Only this book's copies, and their loans, are ever read
+        for plan in (small, large):
+            assert rows_read(plan, "book_copies") <= COPIES_PER_BOOK
+            assert rows_read(plan, "loans") <= COPIES_PER_BOOK
+
+    # checkout_loan's first attempt searches with nothing taken; retries
+    # exclude the copies that lost a race
+    @pytest.mark.parametrize("taken", [(), (0,)])
+    async def test_uses_indexes(self, db_session, seeded, taken):
+        await seed_active_loans(db_session, seeded["user_id"], batch="1", count=5_000)
+
+        plan = await explain_analyze(
+            db_session,
+            lambda: find_available_copy(db_session, seeded["book_id"], taken=taken),
+        )
+
+        indexes = index_names(plan)
+        assert "ix_book_copy_book_id" in indexes, plan
+        assert "uq_active_loan_per_copy" in indexes, plan
+        assert not any(
+            node["Node Type"] == "Seq Scan" and node.get("Relation Name") == "loans"
+            for node in nodes(plan)
+        )
+
+
+class TestUserLoansPlan:
+    async def test_history_uses_user_index(self, db_session, seeded):
+        loans = LoanRepository(db_session)
+        other = (
+            await db_session.execute(
+                text(
+                    "INSERT INTO users (name, email) "
+                    "VALUES ('Other', 'other@example.com') RETURNING id"
+                )
+            )
+        ).scalar_one()
+        await seed_active_loans(db_session, seeded["user_id"], batch="1", count=5_000)
+
+        def history():
+            return loans.list_by_user_rows(other, status=None, after=None, limit=20)
+
+        plan = await explain_analyze(db_session, history)
+
+        # The plan is in the failure message: it is the evidence being checked
+        assert "idx_loan_user_loaned" in index_names(plan), plan
+        assert not any(
+            node["Node Type"] == "Seq Scan" and node.get("Relation Name") == "loans"
+            for node in nodes(plan)
+        )
+
+
+class TestUserEmailPlan:
+    async def test_lookup_uses_lower_email_index(self, db_session):
+        await db_session.execute(
+            text(
+                "INSERT INTO users (name, email) "
+                "SELECT 'Seed ' || g, 'seed-' || g || '@example.com' "
+                "FROM generate_series(1, 5000) AS g"
+            )
+        )
+        await db_session.execute(text("ANALYZE users"))
+        users = UserRepository(db_session)
+
+        plan = await explain_analyze(
+            db_session, lambda: users.get_by_email("SEED-42@example.com")
+        )
+
+        indexes = {node.get("Index Name") for node in nodes(plan)}
+        assert "uq_user_email_lower" in indexes
+        assert rows_read(plan, "users") == 1
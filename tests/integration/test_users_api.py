@@ -1,3 +1,6 @@
+from app.repositories.user import UserRepository
+
+
 class TestCreateUser:
     async def test_create_user_success(self, client):
         response = await client.post(
@@ -25,6 +28,48 @@ class TestCreateUser:
         assert response.status_code == 409
         assert response.json()["code"] == "email_already_registered"
 
+    async def test_create_user_duplicate_email_other_case(self, client):
+        await client.post(
+            "/users",
+            json={"name": "First User", "email": "duplicate@email.com"},
+        )
+
+        response = await client.post(
+            "/users",
+            json={"name": "Second User", "email": "Duplicate@Email.com"},
+        )
+
+        assert response.status_code == 409
+        assert response.json()["code"] == "email_already_registered"
+
+    async def test_get_by_email_ignores_case(self, db_session):
+        users = UserRepository(db_session)
+        created = await users.create(name="Test User", email="Test.User@email.com")
+
+        found = await users.get_by_email("test.user@EMAIL.COM")
+
+        assert found is not None
+        assert found.id == created.id
+        assert found.email == "Test.User@email.com"
+
+    async def test_create_user_is_one_statement(self, client, statements):
+        statements.clear()
+        response = await client.post(
+            "/users", json={"name": "Test User", "email": "test@email.com"}
+        )
+
+        assert response.status_code == 201
+        assert len(statements) == 1
+
+    async def test_conflict_keeps_transaction_usable(self, db_session):
+        users = UserRepository(db_session)
+        await users.create(name="First User", email="duplicate@email.com")
+
+        assert await users.create(name="Second", email="duplicate@email.com") is None
+        created = await users.create(name="Other User", email="other@email.com")
+        assert created is not None
+        assert created.active_loans == 0
+
     async def test_create_user_invalid_email(self, client):
         response = await client.post(
             "/users",
@@ -68,7 +113,7 @@ class TestListUsers:
         response = await client.get("/users")
 
         assert response.status_code == 200
-        assert len(response.json()) >= 2
+        assert len(response.json()["items"]) >= 2
 
     async def test_list_users_pagination(self, client):
         for i in range(5):
@@ -76,10 +121,14 @@ class TestListUsers:
                 "/users", json={"name": f"Page User {i}", "email": f"page{i}@email.com"}
             )
 
-        response = await client.get("/users?offset=0&limit=2")
+        first = (await client.get("/users?limit=2")).json()
+        cursor = first["next_cursor"]
+        second = await client.get("/users", params={"limit": 2, "cursor": cursor})
 
-        assert response.status_code == 200
-        assert len(response.json()) == 2
+        assert second.status_code == 200
+        assert len(first["items"]) == 2
+        assert len(second.json()["items"]) == 2
+        assert first["items"][-1]["id"] < second.json()["items"][0]["id"]
 
 
 class TestGetUserLoans:
@@ -93,7 +142,7 @@ class TestGetUserLoans:
         response = await client.get(f"/users/{user_id}/loans")
 
         assert response.status_code == 200
-        assert response.json() == []
+        assert response.json() == {"items": [], "next_cursor": None}
 
     async def test_get_user_loans_not_found(self, client):
         response = await client.get("/users/99999/loans")
@@ -0,0 +1,116 @@
+import asyncio
+from typing import Any, Self
+
+import pytest
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self._redis = redis
+        self._commands: list[tuple[str, tuple[Any, ...], dict[str, Any]]] = []
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *_: object) -> None:
+        self._commands.clear()
+
+    def __getattr__(self, name: str):
+        def queue(*args: Any, **kwargs: Any) -> Self:
+            self._commands.append((name, args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self) -> list[Any]:
+        await self._redis.round_trip()
+        results = []
+        for name, args, kwargs in self._commands:
+            results.append(self._redis.apply(name, *args, **kwargs))
+        self._commands.clear()
+        return results
+
+
+class FakeRedis:
+    """In-memory stand-in for the subset of redis.asyncio.Redis the cache uses."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, Any] = {}
+        self.ttls: dict[str, int | None] = {}
+        self.published: list[tuple[str, str]] = []
+        self.round_trips = 0
+        # Failure injection: refuse connections, or answer after a delay
+        self.down = False
+        self.latency = 0.0
+
+    async def round_trip(self) -> None:
+        self.round_trips += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.down:
+            raise ConnectionError("connection refused")
+
+    def apply(self, name: str, *args: Any, **kwargs: Any) -> Any:
+        return getattr(self, f"_{name}")(*args, **kwargs)
+
+    def pipeline(self, transaction: bool = True) -> FakePipeline:
+        return FakePipeline(self)
+
+    def __getattr__(self, name: str):
+        if not hasattr(type(self), f"_{name}"):
+            raise AttributeError(name)
+
+        async def command(*args: Any, **kwargs: Any) -> Any:
+            await self.round_trip()
+            return self.apply(name, *args, **kwargs)
+
+        return command
+
+    def _ping(self) -> bool:
+        return True
+
+    def _get(self, key: str) -> Any:
+        return self.data.get(key)
+
+    def _mget(self, keys: list[str]) -> list[Any]:
+        return [self.data.get(key) for key in keys]
+
+    def _set(
+        self, key: str, value: Any, ex: int | None = None, nx: bool = False
+    ) -> bool | None:
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        self.ttls[key] = ex
+        return True
+
+    def _delete(self, *keys: str) -> int:
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def _publish(self, channel: str, message: str) -> int:
+        self.published.append((channel, message))
+        return 0
+
+
+@pytest.fixture
+def fake_redis() -> FakeRedis:
+    return FakeRedis()
+
+
+class FakeSession:
+    """Stand-in for the transaction boundary of an AsyncSession."""
+
+    def __init__(self) -> None:
+        self.info: dict[str, Any] = {}
+        self.commits = 0
+
+    async def commit(self) -> None:
+        self.commits += 1
+
+    async def rollback(self) -> None:
+        pass
+
+
+@pytest.fixture
+def session() -> FakeSession:
+    return FakeSession()
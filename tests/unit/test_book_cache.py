@@ -0,0 +1,311 @@
+import asyncio
+import dataclasses
+import time
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+from structlog.testing import capture_logs
+
+from app.cache import entity as entity_cache_module
+from app.cache import invalidation
+from app.cache.book import NOT_FOUND, SCHEMA_VERSION, BookCache, CachedBook
+from app.cache.config import (
+    CACHE_FRESH_TTL,
+    CACHE_NEGATIVE_TTL,
+    CACHE_REDIS_TTL,
+)
+from app.cache.invalidation import InvalidationBus
+from app.cache.registry import close_caches, get_cache_registry, init_caches
+from app.db.models.book import Book
+from app.schemas.book import BookResponse
+
+KEY_1 = f"book:v{SCHEMA_VERSION}:1"
+KEY_2 = f"book:v{SCHEMA_VERSION}:2"
+
+
+@pytest.fixture
+def book_cache():
+    return BookCache(redis=None)
+
+
+class TestBookCacheMemory:
+    async def test_miss(self, book_cache):
+        assert await book_cache.get(1) is None
+
+    async def test_set_stores_immutable_value(self, book_cache):
+        book = Book(id=1, title="Dom Casmurro", author="Machado de Assis")
+
+        cached = await book_cache.set(book)
+
+        assert cached == CachedBook(
+            id=1, title="Dom Casmurro", author="Machado de Assis"
+        )
+        assert await book_cache.get(1) is cached
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            cached.title = "Other"  # type: ignore[misc]
+
+
+class TestCachedBook:
+    def test_body_matches_response_model(self):
+        book = CachedBook(id=1, title="Memórias Póstumas", author="Machado de Assis")
+
+        expected = BookResponse(
+            id=1, title="Memórias Póstumas", author="Machado de Assis"
+        )
+
+        assert book.body == expected.model_dump_json().encode()
+
+
+class TestBookCacheTombstones:
+    async def test_set_missing(self, book_cache):
+        await book_cache.set_missing(1)
+
+        assert await book_cache.get(1) is NOT_FOUND
+
+    async def test_tombstone_expires(self, book_cache, monkeypatch):
+        await book_cache.set_missing(1)
+
+        later = time.time() + CACHE_NEGATIVE_TTL + 1
+        monkeypatch.setattr(entity_cache_module.time, "time", lambda: later)
+
+        assert await book_cache.get(1) is None
+
+    async def test_set_replaces_tombstone(self, book_cache):
+        await book_cache.set_missing(1)
+
+        await book_cache.set(Book(id=1, title="Title", author="Author"))
+
+        assert await book_cache.get(1) == CachedBook(
+            id=1, title="Title", author="Author"
+        )
+
+    async def test_tombstone_never_replaces_value(self, fake_redis):
+        # A lookup that missed before a create committed stores its tombstone
+        # after the create cached the new row
+        writer, reader = BookCache(fake_redis), BookCache(fake_redis)
+        await writer.set(Book(id=1, title="Title", author="Author"))
+
+        await writer.set_missing(1)
+        await reader.set_missing(1)
+        await reader.set_many([], missing=[1])
+
+        expected = CachedBook(id=1, title="Title", author="Author")
+        assert await writer.get(1) == expected
+        assert await reader.get(1) == expected
+
+    async def test_tombstone_roundtrips_through_redis(self):
+        redis = AsyncMock()
+        writer = BookCache(redis)
+        await writer.set_missing(1)
+        redis.get.return_value = redis.set.call_args.args[1]
+
+        assert redis.set.call_args.kwargs["ex"] == CACHE_NEGATIVE_TTL
+        assert await BookCache(redis).get(1) is NOT_FOUND
+
+
+class TestBookCacheBatch:
+    async def test_get_many_checks_memory_then_one_mget(self, fake_redis):
+        writer = BookCache(fake_redis)
+        await writer.set_many(
+            [Book(id=i, title=f"Book {i}", author="Author") for i in (1, 2)]
+        )
+        cache = BookCache(fake_redis)
+        await cache.set(Book(id=3, title="Book 3", author="Author"))
+        fake_redis.round_trips = 0
+
+        found = await cache.get_many([1, 2, 3, 4])
+
+        assert sorted(found) == [1, 2, 3]
+        assert fake_redis.round_trips == 1
+
+    async def test_get_many_or_load_backfills_misses(self, fake_redis):
+        cache = BookCache(fake_redis)
+        await cache.set(Book(id=1, title="Book 1", author="Author"))
+        load = AsyncMock(return_value=[Book(id=2, title="Book 2", author="Author")])
+        fake_redis.round_trips = 0
+
+        found = await cache.get_many_or_load([1, 2, 3], load)
+
+        assert sorted(found) == [1, 2]
+        load.assert_awaited_once_with([2, 3])
+        # One MGET for the misses, one pipeline for the writes
+        assert fake_redis.round_trips == 2
+        assert await cache.get(3) is NOT_FOUND
+
+    async def test_set_many_broadcasts_in_pipeline(self, fake_redis):
+        bus = InvalidationBus(fake_redis, channel="test")
+        cache = BookCache(fake_redis, bus)
+
+        await cache.set_many([Book(id=1, title="Book 1", author="Author")], missing=[2])
+
+        assert fake_redis.round_trips == 1
+        assert fake_redis.ttls == {
+            KEY_1: CACHE_REDIS_TTL,
+            KEY_2: CACHE_NEGATIVE_TTL,
+        }
+        assert [m.split()[1] for _, m in fake_redis.published] == [KEY_1, KEY_2]
+
+    async def test_set_many_without_publish(self, fake_redis):
+        bus = InvalidationBus(fake_redis, channel="test")
+        cache = BookCache(fake_redis, bus)
+        await cache.set_many([], missing=[2])
+
+        # The tombstone already there is kept (NX): results line up without
+        # the PUBLISH replies
+        await cache.set_many(
+            [Book(id=1, title="Book 1", author="Author")], missing=[2], publish=False
+        )
+
+        assert [m.split()[1] for _, m in fake_redis.published] == [KEY_2]
+        assert (await cache.get(1)).title == "Book 1"
+        assert await cache.get(2) is NOT_FOUND
+
+
+class TestBookCacheStaleWhileRevalidate:
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        now = [time.time()]
+        monkeypatch.setattr(entity_cache_module.time, "time", lambda: now[0])
+        return now
+
+    async def test_stale_without_loader_is_miss(self, book_cache, clock):
+        await book_cache.set(Book(id=1, title="Title", author="Author"))
+
+        clock[0] += CACHE_FRESH_TTL + 1
+
+        assert await book_cache.get(1) is None
+
+    async def test_stale_is_served_and_refreshed(self, clock):
+        loader = AsyncMock(return_value=Book(id=1, title="New", author="Author"))
+        cache = BookCache(redis=None, loader=loader)
+        await cache.set(Book(id=1, title="Old", author="Author"))
+
+        clock[0] += CACHE_FRESH_TTL + 1
+        stale = await cache.get(1)
+        await asyncio.sleep(0)
+
+        assert stale is not None
+        assert stale.title == "Old"
+        loader.assert_awaited_once_with(1)
+        refreshed = await cache.get(1)
+        assert refreshed is not None
+        assert refreshed.title == "New"
+
+    async def test_stale_refresh_is_not_duplicated(self, clock):
+        release = asyncio.Event()
+
+        async def loader(book_id):
+            await release.wait()
+            return Book(id=book_id, title="New", author="Author")
+
+        cache = BookCache(redis=None, loader=AsyncMock(side_effect=loader))
+        await cache.set(Book(id=1, title="Old", author="Author"))
+
+        clock[0] += CACHE_FRESH_TTL + 1
+        for _ in range(5):
+            await cache.get(1)
+        refreshes = list(cache._refreshing.values())
+        release.set()
+        await asyncio.gather(*refreshes)
+
+        assert len(refreshes) == 1
+        assert (await cache.get(1)).title == "New"
+
+    async def test_early_refresh_before_soft_expiry(self, monkeypatch, clock):
+        loader = AsyncMock(return_value=Book(id=1, title="New", author="Author"))
+        cache = BookCache(redis=None, loader=loader)
+        await cache.set(Book(id=1, title="Old", author="Author"), delta=1.0)
+
+        # A draw close to 1 stretches the early window past the remaining TTL
+        monkeypatch.setattr(entity_cache_module.random, "random", lambda: 1 - 1e-9)
+        clock[0] += CACHE_FRESH_TTL - 5
+        await cache.get(1)
+        await asyncio.sleep(0)
+
+        loader.assert_awaited_once_with(1)
+
+
+class TestBookCacheInvalidation:
+    @pytest.fixture
+    def redis(self):
+        return AsyncMock()
+
+    @pytest.fixture
+    def bus(self, redis):
+        return InvalidationBus(redis, channel="test")
+
+    async def test_set_broadcasts_key(self, redis, bus):
+        cache = BookCache(redis, bus)
+
+        await cache.set(Book(id=1, title="Title", author="Author"))
+
+        channel, message = redis.publish.call_args.args
+        assert channel == "test"
+        assert message.endswith(f" {KEY_1}")
+
+    async def test_foreign_message_evicts_memory(self, redis, bus):
+        cache = BookCache(redis, bus)
+        redis.get.return_value = None
+        await cache.set(Book(id=1, title="Title", author="Author"))
+
+        bus.dispatch(f"other-process {KEY_1}")
+
+        assert await cache.get(1) is None
+
+    async def test_own_message_is_ignored(self, redis, bus):
+        cache = BookCache(redis, bus)
+        await cache.set(Book(id=1, title="Title", author="Author"))
+        _, message = redis.publish.call_args.args
+
+        bus.dispatch(message)
+
+        assert await cache.get(1) is not None
+
+    async def test_delete_evicts_memory(self, redis, bus):
+        cache = BookCache(redis, bus)
+        redis.get.return_value = None
+        await cache.set(Book(id=1, title="Title", author="Author"))
+
+        await cache.delete(1)
+
+        assert await cache.get(1) is None
+        redis.delete.assert_awaited_once_with(KEY_1)
+
+    async def test_outage_is_logged_once(self, redis, bus, monkeypatch):
+        monkeypatch.setattr(invalidation, "RECONNECT_DELAY", 0)
+        pubsub = AsyncMock()
+        pubsub.__aenter__.return_value = pubsub
+
+        async def listen():
+            # The connection closes cleanly, without a message
+            return
+            yield
+
+        pubsub.listen = listen
+        down = RedisConnectionError("connection refused")
+        redis.pubsub = Mock(
+            side_effect=[down, down, down, pubsub, asyncio.CancelledError()]
+        )
+
+        with capture_logs() as logs, pytest.raises(asyncio.CancelledError):
+            await bus._listen()
+
+        assert [(log["event"], log["log_level"]) for log in logs] == [
+            ("invalidation_listener_failed", "warning"),
+            ("invalidation_reconnected", "info"),
+        ]
+        assert "exc_info" not in logs[0]
+
+
+class TestCacheRegistry:
+    async def test_shared_book_cache(self):
+        await init_caches(None)
+        try:
+            assert get_cache_registry().books is get_cache_registry().books
+        finally:
+            await close_caches()
+
+    def test_not_initialized(self):
+        with pytest.raises(RuntimeError):
+            get_cache_registry()
@@ -1,17 +1,21 @@
+import asyncio
 from unittest.mock import AsyncMock
 
 import pytest
-from sqlalchemy.exc import IntegrityError
 
+from app.cache.book import BookCache, CachedBook
 from app.db.models.book import Book
 from app.db.models.book_copy import BookCopy
+from app.db.transaction import commit, rollback
 from app.exceptions.domain import BookAlreadyExists, BookNotFound
 from app.services.book import BookService
 
 
 @pytest.fixture
-def mock_book_repo():
-    return AsyncMock()
+def mock_book_repo(session):
+    repo = AsyncMock()
+    repo.session = session
+    return repo
 
 
 @pytest.fixture
@@ -20,17 +24,13 @@ def mock_copy_repo():
 
 
 @pytest.fixture
-def mock_book_cache():
-    cache = AsyncMock()
-    cache.get.return_value = None  # Default: cache miss
-    return cache
+def book_cache():
+    return BookCache(redis=None)
 
 
 @pytest.fixture
-def book_service(mock_book_repo, mock_copy_repo, mock_book_cache):
-    return BookService(
-        books=mock_book_repo, copies=mock_copy_repo, cache=mock_book_cache
-    )
+def book_service(mock_book_repo, mock_copy_repo, book_cache):
+    return BookService(books=mock_book_repo, copies=mock_copy_repo, cache=book_cache)
 
 
 class TestBookServiceCreate:
@@ -46,10 +46,55 @@ class TestBookServiceCreate:
         assert result.id == 1
         assert result.title == "Dom Casmurro"
         assert result.author == "Machado de Assis"
-        mock_book_repo.create.assert_called_once()
+        mock_book_repo.create.assert_called_once_with(
+            title="Dom Casmurro", author="Machado de Assis"
+        )
+
+    async def test_create_clears_tombstone(
+        self, book_service, mock_book_repo, book_cache
+    ):
+        await book_cache.set_missing(1)
+        mock_book_repo.create.return_value = Book(
+            id=1, title="Dom Casmurro", author="Machado de Assis"
+        )
+
+        await book_service.create(title="Dom Casmurro", author="Machado de Assis")
+        await commit(mock_book_repo.session)
+        result = await book_service.get_by_id(book_id=1)
+
+        assert result.id == 1
+        mock_book_repo.get_cached_by_id.assert_not_called()
+
+    async def test_cache_written_only_after_commit(
+        self, book_service, mock_book_repo, book_cache
+    ):
+        mock_book_repo.create.return_value = Book(
+            id=1, title="Dom Casmurro", author="Machado de Assis"
+        )
+
+        await book_service.create(title="Dom Casmurro", author="Machado de Assis")
+        assert await book_cache.get(1) is None
+
+        await commit(mock_book_repo.session)
+        assert await book_cache.get(1) == CachedBook(
+            id=1, title="Dom Casmurro", author="Machado de Assis"
+        )
+
+    async def test_rollback_leaves_cache_untouched(
+        self, book_service, mock_book_repo, book_cache
+    ):
+        mock_book_repo.create.return_value = Book(
+            id=1, title="Dom Casmurro", author="Machado de Assis"
+        )
+
+        await book_service.create(title="Dom Casmurro", author="Machado de Assis")
+        await rollback(mock_book_repo.session)
+        await commit(mock_book_repo.session)
+
+        assert await book_cache.get(1) is None
 
     async def test_create_already_exists(self, book_service, mock_book_repo):
-        mock_book_repo.create.side_effect = IntegrityError(None, None, Exception())
+        mock_book_repo.create.return_value = None
 
         with pytest.raises(BookAlreadyExists) as exc_info:
             await book_service.create(title="Dom Casmurro", author="Machado de Assis")
@@ -60,7 +105,7 @@ class TestBookServiceCreate:
 
 class TestBookServiceGetById:
     async def test_get_by_id_success(self, book_service, mock_book_repo):
-        mock_book_repo.get_by_id.return_value = Book(
+        mock_book_repo.get_cached_by_id.return_value = CachedBook(
             id=1, title="Dom Casmurro", author="Machado de Assis"
         )
 
@@ -68,45 +113,104 @@ class TestBookServiceGetById:
 
         assert result.id == 1
         assert result.title == "Dom Casmurro"
-        mock_book_repo.get_by_id.assert_called_once_with(1)
+        mock_book_repo.get_cached_by_id.assert_called_once_with(1)
 
     async def test_get_by_id_not_found(self, book_service, mock_book_repo):
-        mock_book_repo.get_by_id.return_value = None
+        mock_book_repo.get_cached_by_id.return_value = None
 
         with pytest.raises(BookNotFound) as exc_info:
             await book_service.get_by_id(book_id=999)
 
         assert exc_info.value.context["book_id"] == 999
 
+    async def test_get_by_id_not_found_is_cached(self, book_service, mock_book_repo):
+        mock_book_repo.get_cached_by_id.return_value = None
+
+        for _ in range(3):
+            with pytest.raises(BookNotFound):
+                await book_service.get_by_id(book_id=999)
+
+        mock_book_repo.get_cached_by_id.assert_called_once_with(999)
+
+    async def test_get_by_id_served_from_cache(self, book_service, mock_book_repo):
+        mock_book_repo.get_cached_by_id.return_value = CachedBook(
+            id=1, title="Dom Casmurro", author="Machado de Assis"
+        )
+
+        first = await book_service.get_by_id(book_id=1)
+        second = await book_service.get_by_id(book_id=1)
+
+        assert isinstance(first, CachedBook)
+        assert second is first
+        mock_book_repo.get_cached_by_id.assert_called_once_with(1)
+
+    async def test_get_by_id_coalesces_concurrent_misses(
+        self, book_service, mock_book_repo
+    ):
+        release = asyncio.Event()
+
+        async def get_cached_by_id(book_id):
+            await release.wait()
+            return CachedBook(
+                id=book_id, title="Dom Casmurro", author="Machado de Assis"
+            )
+
+        mock_book_repo.get_cached_by_id.side_effect = get_cached_by_id
+        tasks = [
+            asyncio.create_task(book_service.get_by_id(book_id=1)) for _ in range(10)
+        ]
+        await asyncio.sleep(0)
+        release.set()
+
+        results = await asyncio.gather(*tasks)
+
+        assert {r.id for r in results} == {1}
+        mock_book_repo.get_cached_by_id.assert_called_once_with(1)
+
+
+class TestBookServiceGetMany:
+    async def test_get_many_loads_misses_in_one_query(
+        self, book_service, mock_book_repo, book_cache
+    ):
+        await book_cache.set(Book(id=1, title="Book 1", author="Author 1"))
+        mock_book_repo.get_by_ids.return_value = [
+            Book(id=3, title="Book 3", author="Author 3")
+        ]
+
+        result = await book_service.get_many(book_ids=[3, 1, 2])
+
+        assert [book.id for book in result] == [3, 1]
+        mock_book_repo.get_by_ids.assert_called_once_with([3, 2])
+
 
 class TestBookServiceListAll:
     async def test_list_all(self, book_service, mock_book_repo):
-        mock_book_repo.list_all.return_value = [
+        mock_book_repo.list_rows.return_value = [
             Book(id=1, title="Book 1", author="Author 1"),
             Book(id=2, title="Book 2", author="Author 2"),
         ]
 
-        result = await book_service.list_all(offset=0, limit=10)
+        result = await book_service.list_all(after=None, limit=10)
 
         assert len(result) == 2
-        mock_book_repo.list_all.assert_called_once_with(offset=0, limit=10)
+        mock_book_repo.list_rows.assert_called_once_with(after=None, limit=10)
 
     async def test_list_all_empty(self, book_service, mock_book_repo):
-        mock_book_repo.list_all.return_value = []
+        mock_book_repo.list_rows.return_value = []
 
-        result = await book_service.list_all(offset=0, limit=10)
+        result = await book_service.list_all(after=None, limit=10)
 
         assert len(result) == 0
 
     async def test_list_all_with_pagination(self, book_service, mock_book_repo):
-        mock_book_repo.list_all.return_value = [
+        mock_book_repo.list_rows.return_value = [
             Book(id=3, title="Book 3", author="Author 3")
         ]
 
-        result = await book_service.list_all(offset=2, limit=1)
+        result = await book_service.list_all(after=2, limit=1)
 
         assert len(result) == 1
-        mock_book_repo.list_all.assert_called_once_with(offset=2, limit=1)
+        mock_book_repo.list_rows.assert_called_once_with(after=2, limit=1)
 
 
 class TestBookServiceCreateCopy:
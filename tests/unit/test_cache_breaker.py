@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+from app.cache.book import BookCache
+from app.cache.breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+    GuardedRedis,
+)
+from app.db.models.book import Book
+
+BOOK_1 = Book(id=1, title="Dom Casmurro", author="Machado de Assis")
+
+
+@pytest.fixture
+async def guarded(fake_redis):
+    breaker = CircuitBreaker(
+        fake_redis.ping, threshold=3, timeout=0.01, probe_interval=0.01
+    )
+    yield GuardedRedis(fake_redis, breaker)
+    await breaker.close()
+
+
+async def _trip(redis: GuardedRedis, fake_redis) -> None:
+    fake_redis.down = True
+    for _ in range(redis.breaker.threshold):
+        with pytest.raises(ConnectionError):
+            await redis.get("key")
+
+
+class TestCircuitBreaker:
+    async def test_opens_after_consecutive_failures(self, guarded, fake_redis):
+        await _trip(guarded, fake_redis)
+        fake_redis.round_trips = 0
+
+        with pytest.raises(CircuitOpenError):
+            await guarded.get("key")
+
+        assert guarded.breaker.state is CircuitState.OPEN
+        assert fake_redis.round_trips == 0
+
+    async def test_success_resets_failures(self, guarded, fake_redis):
+        fake_redis.down = True
+        for _ in range(guarded.breaker.threshold - 1):
+            with pytest.raises(ConnectionError):
+                await guarded.get("key")
+        fake_redis.down = False
+
+        await guarded.get("key")
+
+        assert guarded.breaker.failures == 0
+        assert guarded.breaker.state is CircuitState.CLOSED
+
+    async def test_slow_commands_time_out(self, guarded, fake_redis):
+        fake_redis.latency = 1.0
+
+        with pytest.raises(TimeoutError):
+            await guarded.get("key")
+
+        assert guarded.breaker.failures == 1
+
+    async def test_probe_closes_circuit(self, guarded, fake_redis):
+        await _trip(guarded, fake_redis)
+        fake_redis.down = False
+
+        for _ in range(100):
+            if guarded.breaker.state is CircuitState.CLOSED:
+                break
+            await asyncio.sleep(0.01)
+
+        assert guarded.breaker.state is CircuitState.CLOSED
+        assert await guarded.get("key") is None
+
+    async def test_pipeline_execute_is_guarded(self, guarded, fake_redis):
+        await _trip(guarded, fake_redis)
+        fake_redis.round_trips = 0
+
+        with pytest.raises(CircuitOpenError):
+            async with guarded.pipeline(transaction=False) as pipe:
+                pipe.set("key", b"value")
+                await pipe.execute()
+
+        assert fake_redis.round_trips == 0
+
+
+class TestBookCacheWithOpenCircuit:
+    async def test_skips_redis_and_serves_memory(self, guarded, fake_redis):
+        cache = BookCache(guarded)
+        await cache.set(BOOK_1)
+        await _trip(guarded, fake_redis)
+        fake_redis.round_trips = 0
+
+        assert await cache.get(1) is not None
+        assert await cache.get(2) is None
+        await cache.set(Book(id=3, title="Helena", author="Machado de Assis"))
+        await cache.get_many([4, 5])
+
+        assert fake_redis.round_trips == 0
+        assert cache.metrics.redis_skipped == {"get": 1, "set": 1, "mget": 1}
+        assert cache.metrics.redis_errors == {}
@@ -0,0 +1,54 @@
+import pytest
+
+from app.cache.book import BookCache, CachedBook
+from app.cache.codec import (
+    CodecError,
+    JsonCodec,
+    OrjsonCodec,
+    get_codec,
+    pack,
+    unpack,
+)
+from app.db.models.book import Book
+
+VALUE = [1767225600.5, 0.002, 1, "Memórias Póstumas de Brás Cubas", "Machado"]
+
+
+class TestCodecs:
+    @pytest.mark.parametrize("codec", [JsonCodec(), OrjsonCodec()])
+    def test_roundtrip(self, codec):
+        data = pack(codec, VALUE)
+
+        assert data[0] == codec.id
+        assert unpack(data) == VALUE
+
+    def test_unknown_codec_id(self):
+        with pytest.raises(CodecError):
+            unpack(b"\xff[]")
+
+    def test_malformed_payload(self):
+        with pytest.raises(CodecError):
+            unpack(pack(OrjsonCodec(), VALUE)[:-3])
+
+    def test_get_codec(self):
+        assert isinstance(get_codec("json"), JsonCodec)
+        with pytest.raises(ValueError):
+            get_codec("pickle")
+
+
+class TestBookCacheCodec:
+    async def test_reads_entries_written_by_another_codec(self, fake_redis):
+        writer = BookCache(fake_redis, codec=JsonCodec())
+        await writer.set(Book(id=1, title="Title", author="Author"))
+
+        reader = BookCache(fake_redis, codec=OrjsonCodec())
+
+        assert await reader.get(1) == CachedBook(id=1, title="Title", author="Author")
+
+    async def test_undecodable_entry_is_miss(self, fake_redis):
+        writer = BookCache(fake_redis)
+        await writer.set(Book(id=1, title="Title", author="Author"))
+        for key in fake_redis.data:
+            fake_redis.data[key] = b"\x02{}"
+
+        assert await BookCache(fake_redis).get(1) is None
@@ -0,0 +1,86 @@
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.cache import metrics as metrics_module
+from app.cache.book import BookCache
+from app.cache.metrics import Histogram, MeteredTTLCache
+from app.db.models.book import Book
+
+BOOK_1 = Book(id=1, title="Dom Casmurro", author="Machado de Assis")
+
+
+class TestCacheMetricsCounters:
+    async def test_hits_are_counted_per_tier(self, fake_redis):
+        await BookCache(fake_redis).set(BOOK_1)
+        cache = BookCache(fake_redis)
+
+        await cache.get(1)  # Redis, then copied to memory
+        await cache.get(1)
+        await cache.get(2)
+
+        assert cache.metrics.redis_hits == 1
+        assert cache.metrics.memory_hits == 1
+        assert cache.metrics.misses == 1
+
+    async def test_get_many_counts_each_id(self, fake_redis):
+        await BookCache(fake_redis).set(BOOK_1)
+        cache = BookCache(fake_redis)
+
+        await cache.get_many([1, 2, 3])
+
+        assert cache.metrics.redis_hits == 1
+        assert cache.metrics.misses == 2
+
+    async def test_redis_errors_and_latency(self):
+        redis = AsyncMock()
+        redis.get.side_effect = ConnectionError("down")
+        cache = BookCache(redis)
+
+        assert await cache.get(1) is None
+
+        assert cache.metrics.redis_errors == {"get": 1}
+        assert cache.metrics.redis_latency["get"].count == 1
+        assert cache.metrics.misses == 1
+
+
+class TestMeteredTTLCache:
+    def test_counts_capacity_evictions(self):
+        counters = BookCache(redis=None).metrics
+        memory = MeteredTTLCache(maxsize=2, ttl=60, metrics=counters)
+
+        for key in range(3):
+            memory[key] = key
+
+        assert counters.evictions == 1
+        assert len(memory) == 2
+
+
+class TestHistogram:
+    def test_cumulative_buckets(self):
+        hist = Histogram(buckets=(0.1, 1.0), counts=[0, 0, 0])
+
+        for value in (0.05, 0.1, 0.5, 2.0):
+            hist.observe(value)
+
+        assert list(hist.cumulative()) == [(0.1, 2), (1.0, 3), (float("inf"), 4)]
+        assert hist.count == 4
+        assert hist.sum == pytest.approx(2.65)
+
+
+class TestRender:
+    async def test_prometheus_text(self, fake_redis):
+        cache = BookCache(fake_redis)
+        await cache.set(BOOK_1)
+        await cache.get(1)
+
+        text = metrics_module.render([cache])
+
+        assert "# TYPE sgbd_cache_hits_total counter" in text
+        assert 'sgbd_cache_hits_total{cache="book",tier="memory"} 1' in text
+        assert 'sgbd_cache_memory_entries{cache="book"} 1' in text
+        assert 'sgbd_cache_redis_latency_seconds_count{cache="book",op="set"} 1' in text
+        assert (
+            'sgbd_cache_redis_latency_seconds_bucket{cache="book",op="set",le="+Inf"} 1'
+            in text
+        )
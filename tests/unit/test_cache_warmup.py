@@ -0,0 +1,85 @@
+import asyncio
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock
+
+import pytest
+
+import app.db.session
+from app.cache import warmup
+from app.cache.book import BookCache
+from app.cache.invalidation import InvalidationBus
+from app.db.models.book import Book
+
+
+@pytest.fixture
+def mock_book_repo(monkeypatch):
+    repo = AsyncMock()
+
+    @asynccontextmanager
+    async def session_factory():
+        yield None
+
+    monkeypatch.setattr(app.db.session, "AsyncSessionLocal", session_factory)
+    monkeypatch.setattr(warmup, "BookRepository", lambda _: repo)
+    return repo
+
+
+class TestWarmBookCache:
+    async def test_warms_most_loaned_books(self, mock_book_repo, fake_redis):
+        cache = BookCache(fake_redis)
+        mock_book_repo.list_most_loaned_ids.return_value = [2, 1]
+        mock_book_repo.get_by_ids.return_value = [
+            Book(id=1, title="Book 1", author="Author"),
+            Book(id=2, title="Book 2", author="Author"),
+        ]
+
+        warmed = await warmup.warm_book_cache(cache, size=2)
+
+        assert warmed == 2
+        assert mock_book_repo.list_most_loaned_ids.call_args.kwargs["limit"] == 2
+        mock_book_repo.get_by_ids.assert_called_once_with([2, 1])
+        assert (await cache.get(1)).title == "Book 1"
+
+    async def test_does_not_count_lookups(self, mock_book_repo, fake_redis):
+        cache = BookCache(fake_redis)
+        mock_book_repo.list_most_loaned_ids.return_value = [1, 2]
+        mock_book_repo.get_by_ids.return_value = [
+            Book(id=1, title="Book 1", author="Author")
+        ]
+
+        assert await warmup.warm_book_cache(cache, size=2) == 1
+
+        assert cache.metrics.misses == 0
+        assert cache.metrics.redis_hits == 0
+        assert cache.metrics.memory_hits == 0
+
+    async def test_does_not_broadcast(self, mock_book_repo, fake_redis):
+        cache = BookCache(fake_redis, InvalidationBus(fake_redis, channel="test"))
+        mock_book_repo.list_most_loaned_ids.return_value = [1]
+        mock_book_repo.get_by_ids.return_value = [
+            Book(id=1, title="Book 1", author="Author")
+        ]
+
+        assert await warmup.warm_book_cache(cache, size=1) == 1
+
+        assert fake_redis.published == []
+
+    async def test_gives_up_after_budget(self, mock_book_repo):
+        cache = BookCache(redis=None)
+
+        async def slow(**_):
+            await asyncio.sleep(10)
+
+        mock_book_repo.list_most_loaned_ids.side_effect = slow
+
+        assert await warmup.warm_book_cache(cache, size=10, budget=0.01) == 0
+
+    async def test_failure_does_not_raise(self, mock_book_repo):
+        cache = BookCache(redis=None)
+        mock_book_repo.list_most_loaned_ids.side_effect = OSError("db down")
+
+        assert await warmup.warm_book_cache(cache, size=10) == 0
+
+    async def test_disabled(self, mock_book_repo):
+        assert await warmup.warm_book_cache(BookCache(redis=None), size=0) == 0
+        mock_book_repo.list_most_loaned_ids.assert_not_called()
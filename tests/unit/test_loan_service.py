@@ -2,19 +2,21 @@ from datetime import UTC, datetime, timedelta
 from unittest.mock import AsyncMock
 
 import pytest
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
 
-from app.db.models.book_copy import BookCopy
-from app.db.models.loan import Loan
+from app.cache.user import UserCache
+from app.db.models.loan import Loan, LoanStatus
 from app.db.models.user import User
 from app.exceptions.domain import (
     BookNotFound,
     LoanAlreadyReturned,
+    LoanConcurrentModification,
     LoanNotFound,
     MaxActiveLoansExceeded,
     NoCopiesAvailable,
     UserNotFound,
 )
+from app.repositories.loan import Checkout, CheckoutStatus
 from app.services.loan import (
     DAILY_FINE_CENTS,
     LOAN_DAYS,
@@ -23,7 +25,11 @@ from app.services.loan import (
 )
 
 USER_1: User = User(id=1, name="Test", email="test@email.com")
-COPY_1: BookCopy = BookCopy(id=1, book_id=1)
+FIRST_PAGE = {"status": None, "after": None, "limit": 10}
+
+
+def failed(status: CheckoutStatus, *, active: int = 0, attempts: int = 0) -> Checkout:
+    return Checkout(status, active=active, attempts=attempts)
 
 
 @pytest.fixture
@@ -31,8 +37,6 @@ def mock_repos():
     return {
         "loans": AsyncMock(),
         "users": AsyncMock(),
-        "books": AsyncMock(),
-        "copies": AsyncMock(),
     }
 
 
@@ -41,85 +45,76 @@ def loan_service(mock_repos):
     return LoanService(
         loans=mock_repos["loans"],
         users=mock_repos["users"],
-        books=mock_repos["books"],
-        copies=mock_repos["copies"],
+        user_cache=UserCache(redis=None),
     )
 
 
 class TestLoanServiceCreate:
     async def test_create_success(self, loan_service, mock_repos):
-        mock_repos["books"].exists.return_value = True
-        mock_repos["users"].get_for_update.return_value = USER_1
-        mock_repos["loans"].count_active_by_user.return_value = 0
-        mock_repos["copies"].get_available_for_book.return_value = COPY_1
-        mock_repos["loans"].save.return_value = Loan(
+        loan = Loan(
             id=1,
             user_id=1,
             copy_id=1,
             due_to=datetime.now(UTC) + timedelta(days=LOAN_DAYS),
         )
+        mock_repos["loans"].checkout.return_value = Checkout(
+            CheckoutStatus.CREATED, active=0, attempts=1, loan=loan
+        )
 
         result = await loan_service.create(user_id=1, book_id=1)
 
-        assert result.id == 1
-        assert result.user_id == 1
-        assert result.copy_id == 1
-        mock_repos["books"].exists.assert_called_once_with(1)
-        mock_repos["users"].get_for_update.assert_called_once_with(1)
-        mock_repos["loans"].count_active_by_user.assert_called_once_with(1)
-        mock_repos["copies"].get_available_for_book.assert_called_once_with(1)
-        mock_repos["loans"].save.assert_called_once()
+        assert result is loan
+        mock_repos["loans"].checkout.assert_called_once_with(
+            1, 1, max_active=MAX_ACTIVE_LOANS, loan_days=LOAN_DAYS
+        )
 
     async def test_create_user_not_found(self, loan_service, mock_repos):
-        mock_repos["books"].exists.return_value = True
-        mock_repos["users"].get_for_update.return_value = None
+        mock_repos["loans"].checkout.return_value = failed(
+            CheckoutStatus.USER_NOT_FOUND
+        )
 
         with pytest.raises(UserNotFound) as exc_info:
             await loan_service.create(user_id=999, book_id=1)
 
         assert exc_info.value.context["user_id"] == 999
-        mock_repos["loans"].save.assert_not_called()
+
+    async def test_create_user_tombstone_skips_checkout(self, loan_service, mock_repos):
+        mock_repos["loans"].checkout.return_value = failed(
+            CheckoutStatus.USER_NOT_FOUND
+        )
+
+        with pytest.raises(UserNotFound):
+            await loan_service.create(user_id=999, book_id=1)
+        with pytest.raises(UserNotFound):
+            await loan_service.create(user_id=999, book_id=1)
+
+        mock_repos["loans"].checkout.assert_called_once()
 
     async def test_create_book_not_found(self, loan_service, mock_repos):
-        mock_repos["books"].exists.return_value = False
+        mock_repos["loans"].checkout.return_value = failed(
+            CheckoutStatus.BOOK_NOT_FOUND
+        )
 
         with pytest.raises(BookNotFound) as exc_info:
             await loan_service.create(user_id=1, book_id=999)
 
         assert exc_info.value.context["book_id"] == 999
-        mock_repos["users"].get_for_update.assert_not_called()
-        mock_repos["loans"].save.assert_not_called()
 
     async def test_create_max_loans_exceeded(self, loan_service, mock_repos):
-        mock_repos["books"].exists.return_value = True
-        mock_repos["users"].get_for_update.return_value = USER_1
-        mock_repos["loans"].count_active_by_user.return_value = MAX_ACTIVE_LOANS
+        mock_repos["loans"].checkout.return_value = failed(
+            CheckoutStatus.MAX_ACTIVE_LOANS_EXCEEDED, active=MAX_ACTIVE_LOANS
+        )
 
         with pytest.raises(MaxActiveLoansExceeded) as exc_info:
             await loan_service.create(user_id=1, book_id=1)
 
         assert exc_info.value.context["user_id"] == 1
         assert exc_info.value.context["active"] == MAX_ACTIVE_LOANS
-        mock_repos["loans"].save.assert_not_called()
 
     async def test_create_no_copies_available(self, loan_service, mock_repos):
-        mock_repos["books"].exists.return_value = True
-        mock_repos["users"].get_for_update.return_value = USER_1
-        mock_repos["loans"].count_active_by_user.return_value = 0
-        mock_repos["copies"].get_available_for_book.return_value = None
-
-        with pytest.raises(NoCopiesAvailable) as exc_info:
-            await loan_service.create(user_id=1, book_id=1)
-
-        assert exc_info.value.context["book_id"] == 1
-        mock_repos["loans"].save.assert_not_called()
-
-    async def test_create_concurrent_copy_taken(self, loan_service, mock_repos):
-        mock_repos["books"].exists.return_value = True
-        mock_repos["users"].get_for_update.return_value = USER_1
-        mock_repos["loans"].count_active_by_user.return_value = 0
-        mock_repos["copies"].get_available_for_book.return_value = COPY_1
-        mock_repos["loans"].save.side_effect = IntegrityError(None, None, Exception())
+        mock_repos["loans"].checkout.return_value = failed(
+            CheckoutStatus.NO_COPIES_AVAILABLE, attempts=2
+        )
 
         with pytest.raises(NoCopiesAvailable) as exc_info:
             await loan_service.create(user_id=1, book_id=1)
@@ -141,6 +136,7 @@ class TestLoanServiceFulfill:
         assert result.returned_at is not None
         assert result.fine_cents == 0
         mock_repos["loans"].get_by_id.assert_called_once_with(1)
+        mock_repos["users"].decrement_active_loans.assert_called_once_with(1)
 
     async def test_fulfill_late_with_fine(self, loan_service, mock_repos):
         days_late = 5
@@ -179,50 +175,97 @@ class TestLoanServiceFulfill:
             await loan_service.fulfill(loan_id=1)
 
         assert exc_info.value.context["loan_id"] == 1
+        mock_repos["users"].decrement_active_loans.assert_not_called()
+
+    async def test_fulfill_concurrent_return_keeps_counter(
+        self, loan_service, mock_repos
+    ):
+        loan = Loan(id=1, user_id=1, copy_id=1, due_to=datetime.now(UTC))
+        mock_repos["loans"].get_by_id.return_value = loan
+        mock_repos["loans"].save.side_effect = StaleDataError()
+
+        with pytest.raises(LoanConcurrentModification):
+            await loan_service.fulfill(loan_id=1)
+
+        mock_repos["users"].decrement_active_loans.assert_not_called()
 
 
 class TestLoanServiceListByUser:
     async def test_list_by_user_success(self, loan_service, mock_repos):
-        mock_repos["users"].exists.return_value = True
-        mock_repos["loans"].list_by_user.return_value = [
+        mock_repos["users"].get_cached_by_id.return_value = USER_1
+        mock_repos["loans"].list_by_user_rows.return_value = [
             Loan(id=1, user_id=1, copy_id=1),
             Loan(id=2, user_id=1, copy_id=2),
         ]
 
-        result = await loan_service.list_by_user(user_id=1)
+        result = await loan_service.list_by_user(
+            user_id=1, status=None, after=None, limit=10
+        )
 
         assert len(result) == 2
-        mock_repos["users"].exists.assert_called_once_with(1)
-        mock_repos["loans"].list_by_user.assert_called_once_with(1)
+        mock_repos["users"].get_cached_by_id.assert_called_once_with(1)
+        mock_repos["loans"].list_by_user_rows.assert_called_once_with(
+            1, status=None, after=None, limit=10
+        )
+
+    async def test_list_by_user_with_status_and_cursor(self, loan_service, mock_repos):
+        after = (datetime.now(UTC), 7)
+        mock_repos["users"].get_cached_by_id.return_value = USER_1
+        mock_repos["loans"].list_by_user_rows.return_value = []
+
+        await loan_service.list_by_user(
+            user_id=1, status=LoanStatus.OVERDUE, after=after, limit=10
+        )
+
+        mock_repos["loans"].list_by_user_rows.assert_called_once_with(
+            1, status=LoanStatus.OVERDUE, after=after, limit=10
+        )
+
+    async def test_list_by_user_reuses_cached_user(self, loan_service, mock_repos):
+        mock_repos["users"].get_cached_by_id.return_value = USER_1
+        mock_repos["loans"].list_by_user_rows.return_value = []
+
+        await loan_service.list_by_user(user_id=1, **FIRST_PAGE)
+        await loan_service.list_by_user(user_id=1, **FIRST_PAGE)
+
+        mock_repos["users"].get_cached_by_id.assert_called_once_with(1)
 
     async def test_list_by_user_not_found(self, loan_service, mock_repos):
-        mock_repos["users"].exists.return_value = False
+        mock_repos["users"].get_cached_by_id.return_value = None
 
         with pytest.raises(UserNotFound):
-            await loan_service.list_by_user(user_id=999)
+            await loan_service.list_by_user(user_id=999, **FIRST_PAGE)
+        with pytest.raises(UserNotFound):
+            await loan_service.list_by_user(user_id=999, **FIRST_PAGE)
 
-        mock_repos["loans"].list_by_user.assert_not_called()
+        # The second lookup is answered by the tombstone
+        mock_repos["users"].get_cached_by_id.assert_called_once_with(999)
+        mock_repos["loans"].list_by_user_rows.assert_not_called()
 
 
 class TestLoanServiceListActive:
     async def test_list_active(self, loan_service, mock_repos):
-        mock_repos["loans"].list_active.return_value = [
+        mock_repos["loans"].list_active_rows.return_value = [
             Loan(id=1, user_id=1, copy_id=1),
         ]
 
-        result = await loan_service.list_active(offset=0, limit=10)
+        result = await loan_service.list_active(after=None, limit=10)
 
         assert len(result) == 1
-        mock_repos["loans"].list_active.assert_called_once_with(offset=0, limit=10)
+        mock_repos["loans"].list_active_rows.assert_called_once_with(
+            after=None, limit=10
+        )
 
 
 class TestLoanServiceListOverdue:
     async def test_list_overdue(self, loan_service, mock_repos):
-        mock_repos["loans"].list_overdue.return_value = [
+        mock_repos["loans"].list_overdue_rows.return_value = [
             Loan(id=1, user_id=1, copy_id=1),
         ]
 
-        result = await loan_service.list_overdue(offset=0, limit=10)
+        result = await loan_service.list_overdue(after=None, limit=10)
 
         assert len(result) == 1
-        mock_repos["loans"].list_overdue.assert_called_once_with(offset=0, limit=10)
+        mock_repos["loans"].list_overdue_rows.assert_called_once_with(
+            after=None, limit=10
+        )
@@ -0,0 +1,151 @@
+from collections import namedtuple
+from datetime import UTC, datetime
+
+import pytest
+
+import app.api.pagination
+from app.api.pagination import (
+    INT4_MAX,
+    INT4_MIN,
+    decode_cursor,
+    decode_id_cursor,
+    encode_cursor,
+    paginate,
+)
+from app.exceptions.domain import InvalidCursor
+from app.schemas.book import BookResponse
+from app.schemas.loan import LoanResponse
+from app.schemas.page import Page
+
+DUE = datetime(2026, 1, 15, 12, 30, 0, 123456, tzinfo=UTC)
+
+# Stands in for a SQLAlchemy Row: positional, with attributes and _asdict()
+BookRow = namedtuple("BookRow", ["id", "title", "author"])
+
+LoanRow = namedtuple(
+    "LoanRow", "id copy_id user_id loaned_at due_to returned_at fine_cents"
+)
+
+
+class FakeRecord(dict):
+    """Stands in for app.db.pool.Record, which asyncpg alone can build."""
+
+    def __getattr__(self, name):
+        return self[name]
+
+
+def loan_rows(ids):
+    return [LoanRow(i, i, 1, DUE, DUE.replace(day=i + 15), None, 0) for i in ids]
+
+
+def due_key(loan):
+    return (loan.due_to, loan.id)
+
+
+class TestCursor:
+    def test_id_roundtrip(self):
+        assert decode_id_cursor(encode_cursor((42,))) == 42
+
+    def test_due_key_roundtrip(self):
+        cursor = encode_cursor((DUE, 7))
+
+        assert decode_cursor(cursor, datetime, int) == (DUE, 7)
+
+    def test_cursor_is_url_safe(self):
+        cursor = encode_cursor((DUE, 7))
+
+        assert "=" not in cursor
+        assert "/" not in cursor
+        assert "+" not in cursor
+
+    def test_missing_cursor(self):
+        assert decode_id_cursor(None) is None
+
+    @pytest.mark.parametrize(
+        "cursor",
+        [
+            "not base64!",
+            encode_cursor((1, 2)),  # Wrong arity
+            encode_cursor((DUE,)),  # Wrong type
+            "eyJpZCI6IDF9",  # A JSON object, not an array
+        ],
+    )
+    def test_invalid_cursor(self, cursor):
+        with pytest.raises(InvalidCursor):
+            decode_id_cursor(cursor)
+
+    @pytest.mark.parametrize("value", [INT4_MAX + 1, INT4_MIN - 1, 99999999999])
+    def test_id_out_of_integer_range_is_rejected(self, value):
+        with pytest.raises(InvalidCursor):
+            decode_id_cursor(encode_cursor((value,)))
+
+    def test_id_at_integer_bounds(self):
+        assert decode_id_cursor(encode_cursor((INT4_MAX,))) == INT4_MAX
+        assert decode_id_cursor(encode_cursor((INT4_MIN,))) == INT4_MIN
+
+    def test_naive_timestamp_is_rejected(self):
+        cursor = encode_cursor((DUE.replace(tzinfo=None), 1))
+
+        with pytest.raises(InvalidCursor):
+            decode_cursor(cursor, datetime, int)
+
+
+class TestPaginate:
+    def test_extra_row_yields_next_cursor(self):
+        rows = [BookRow(i, f"Book {i}", "A") for i in (1, 2, 3)]
+
+        page = paginate(BookResponse, rows, 2, lambda book: (book.id,))
+
+        assert [book.id for book in page.items] == [1, 2]
+        assert decode_id_cursor(page.next_cursor) == 2
+
+    def test_last_page_has_no_cursor(self):
+        rows = [BookRow(i, f"Book {i}", "A") for i in (1, 2)]
+
+        page = paginate(BookResponse, rows, 2, lambda book: (book.id,))
+
+        assert len(page.items) == 2
+        assert page.next_cursor is None
+
+    def test_empty_page(self):
+        page = paginate(BookResponse, [], 10, lambda book: (book.id,))
+
+        assert page == Page[BookResponse](items=[], next_cursor=None)
+
+    def test_rows_hydrate_wire_models(self):
+        rows = [BookRow(1, "Dom Casmurro", "Machado de Assis")]
+
+        page = paginate(BookResponse, rows, 10, lambda book: (book.id,))
+
+        assert page.items == [
+            BookResponse(id=1, title="Dom Casmurro", author="Machado de Assis")
+        ]
+        assert page.model_dump_json() == (
+            '{"items":[{"id":1,"title":"Dom Casmurro",'
+            '"author":"Machado de Assis"}],"next_cursor":null}'
+        )
+
+    def test_records_skip_validation(self, monkeypatch):
+        monkeypatch.setattr(app.api.pagination, "Record", FakeRecord)
+        records = [FakeRecord(row._asdict()) for row in loan_rows((1, 2, 3))]
+
+        response = paginate(LoanResponse, records, 2, due_key)
+
+        assert response.media_type == "application/json"
+        page = Page[LoanResponse].model_validate_json(response.body)
+        assert [loan.id for loan in page.items] == [1, 2]
+        assert decode_cursor(page.next_cursor, datetime, int) == (
+            DUE.replace(day=17),
+            2,
+        )
+
+    @pytest.mark.parametrize("ids", [(1, 2, 3), (1, 2)])
+    def test_records_match_rows_byte_for_byte(self, monkeypatch, ids):
+        monkeypatch.setattr(app.api.pagination, "Record", FakeRecord)
+        rows = loan_rows(ids)
+        records = [FakeRecord(row._asdict()) for row in rows]
+
+        expected = paginate(LoanResponse, rows, 2, due_key)
+        response = paginate(LoanResponse, records, 2, due_key)
+
+        assert response.body == expected.model_dump_json().encode()
@@ -0,0 +1,85 @@
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from app.cache.book import BookCache, CachedBook
+from app.cache.user import CachedUser
+from app.db.pool import get_raw_pool, init_pool
+from app.repositories.raw import (
+    ACTIVE_LOANS,
+    ACTIVE_LOANS_AFTER,
+    BOOK_BY_ID,
+    USER_BY_ID,
+    RawBookRepository,
+    RawLoanRepository,
+    RawUserRepository,
+)
+from app.services.book import BookService
+
+DUE = datetime(2026, 1, 15, 12, 30, tzinfo=UTC)
+
+
+@pytest.fixture
+def pool():
+    return AsyncMock()
+
+
+class TestRawBookRepository:
+    async def test_get_cached_by_id_builds_cached_value(self, pool):
+        pool.fetchrow.return_value = {"id": 1, "title": "Dune", "author": "Herbert"}
+
+        book = await RawBookRepository(Mock(), pool).get_cached_by_id(1)
+
+        assert book == CachedBook(id=1, title="Dune", author="Herbert")
+        pool.fetchrow.assert_awaited_once_with(BOOK_BY_ID, 1)
+
+    async def test_get_cached_by_id_not_found(self, pool):
+        pool.fetchrow.return_value = None
+
+        assert await RawBookRepository(Mock(), pool).get_cached_by_id(1) is None
+
+    async def test_cache_stores_value_as_is(self, pool):
+        pool.fetchrow.return_value = {"id": 1, "title": "Dune", "author": "Herbert"}
+        cache = BookCache(redis=None)
+        service = BookService(RawBookRepository(Mock(), pool), AsyncMock(), cache)
+
+        book = await service.get_by_id(book_id=1)
+
+        assert book == CachedBook(id=1, title="Dune", author="Herbert")
+        assert await cache.get(1) == book
+
+
+class TestRawUserRepository:
+    async def test_get_cached_by_id_builds_cached_value(self, pool):
+        pool.fetchrow.return_value = {"id": 1, "name": "Ana", "email": "ana@x.com"}
+
+        user = await RawUserRepository(Mock(), pool).get_cached_by_id(1)
+
+        assert user == CachedUser(id=1, name="Ana", email="ana@x.com")
+        pool.fetchrow.assert_awaited_once_with(USER_BY_ID, 1)
+
+
+class TestRawLoanRepository:
+    async def test_first_page(self, pool):
+        await RawLoanRepository(Mock(), pool).list_active_rows(after=None, limit=51)
+
+        pool.fetch.assert_awaited_once_with(ACTIVE_LOANS, 51)
+
+    async def test_after_cursor(self, pool):
+        repo = RawLoanRepository(Mock(), pool)
+
+        await repo.list_active_rows(after=(DUE, 7), limit=51)
+
+        pool.fetch.assert_awaited_once_with(ACTIVE_LOANS_AFTER, DUE, 7, 51)
+
+
+class TestRawPool:
+    async def test_disabled_by_default(self):
+        await init_pool(repositories=())
+
+        assert get_raw_pool("books") is None
+
+    async def test_unknown_repository(self):
+        with pytest.raises(ValueError, match="copies"):
+            await init_pool(repositories=["copies"])
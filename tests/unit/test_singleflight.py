@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from app.cache.singleflight import SingleFlight
+
+
+@pytest.fixture
+def flights():
+    return SingleFlight()
+
+
+class TestSingleFlight:
+    async def test_concurrent_calls_share_result(self, flights):
+        calls = 0
+        release = asyncio.Event()
+
+        async def fn():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return "value"
+
+        tasks = [asyncio.create_task(flights.do("key", fn)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await asyncio.gather(*tasks) == ["value"] * 5
+        assert calls == 1
+
+    async def test_exception_is_shared(self, flights):
+        release = asyncio.Event()
+
+        async def fn():
+            await release.wait()
+            raise ValueError("boom")
+
+        tasks = [asyncio.create_task(flights.do("key", fn)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        assert all(isinstance(r, ValueError) for r in results)
+
+    async def test_sequential_calls_run_again(self, flights):
+        calls = 0
+
+        async def fn():
+            nonlocal calls
+            calls += 1
+            return calls
+
+        assert await flights.do("key", fn) == 1
+        assert await flights.do("key", fn) == 2
+
+    async def test_waiter_takes_over_when_leader_cancelled(self, flights):
+        calls = 0
+        release = asyncio.Event()
+
+        async def fn():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return calls
+
+        leader = asyncio.create_task(flights.do("key", fn))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flights.do("key", fn))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await follower == 2
+        with pytest.raises(asyncio.CancelledError):
+            await leader
@@ -0,0 +1,112 @@
+import pytest
+from cachetools import TTLCache
+
+from app.cache.book import BookCache
+from app.cache.metrics import CacheMetrics
+from app.cache.tinylfu import MAX_COUNT, CountMinSketch, TinyLFUCache
+from app.db.models.book import Book
+
+
+class TestCountMinSketch:
+    def test_estimates_increments(self):
+        sketch = CountMinSketch(width=64)
+
+        for _ in range(3):
+            sketch.increment("hot")
+        sketch.increment("cold")
+
+        assert sketch.estimate("hot") >= 3
+        assert sketch.estimate("cold") >= 1
+        assert sketch.estimate("hot") > sketch.estimate("cold")
+
+    def test_counters_saturate(self):
+        sketch = CountMinSketch(width=64, sample_size=1000)
+
+        for _ in range(MAX_COUNT + 10):
+            sketch.increment("key")
+
+        assert sketch.estimate("key") == MAX_COUNT
+
+    def test_reset_halves_counters(self):
+        sketch = CountMinSketch(width=64, sample_size=8)
+
+        for _ in range(8):
+            sketch.increment("key")
+
+        assert sketch.estimate("key") == 4
+        assert sketch.additions == 4
+
+
+class TestTinyLFUCache:
+    def test_respects_maxsize(self):
+        metrics = CacheMetrics()
+        cache = TinyLFUCache(maxsize=10, ttl=60, metrics=metrics)
+
+        for key in range(100):
+            cache[key] = key
+
+        assert len(cache) == 10
+        assert metrics.evictions == 90
+
+    def test_hot_keys_survive_a_scan(self):
+        lru: TTLCache[int, int] = TTLCache(maxsize=100, ttl=60)
+        tinylfu: TinyLFUCache[int, int] = TinyLFUCache(maxsize=100, ttl=60)
+        hot = range(50)
+
+        for cache in (lru, tinylfu):
+            for _ in range(5):
+                for key in hot:
+                    if cache.get(key) is None:
+                        cache[key] = key
+            for key in range(1000, 2000):
+                if cache.get(key) is None:
+                    cache[key] = key
+
+        assert not any(key in lru for key in hot)
+        assert all(key in tinylfu for key in hot)
+
+    def test_entries_expire(self):
+        now = [0.0]
+        metrics = CacheMetrics()
+        cache = TinyLFUCache(maxsize=10, ttl=5, metrics=metrics, timer=lambda: now[0])
+        cache["key"] = "value"
+
+        now[0] = 5.0
+
+        assert cache.get("key") is None
+        assert "key" not in cache
+        assert metrics.expirations == 1
+
+    def test_update_replaces_value(self):
+        cache = TinyLFUCache(maxsize=10, ttl=60)
+        cache["key"] = "old"
+        cache["key"] = "new"
+
+        assert cache.get("key") == "new"
+        assert len(cache) == 1
+
+    def test_pop_and_clear(self):
+        cache = TinyLFUCache(maxsize=10, ttl=60)
+        cache["a"] = 1
+        cache["b"] = 2
+
+        assert cache.pop("a") == 1
+        assert cache.pop("a", None) is None
+        with pytest.raises(KeyError):
+            cache.pop("a")
+
+        cache.clear()
+        assert len(cache) == 0
+
+
+class TestEntityCachePolicy:
+    async def test_tinylfu_policy(self):
+        cache = BookCache(redis=None, memory_policy="tinylfu")
+        await cache.set(Book(id=1, title="Dom Casmurro", author="Machado de Assis"))
+
+        assert (await cache.get(1)).title == "Dom Casmurro"
+        assert cache.memory_usage() == (1, 1000)
+
+    def test_unknown_policy(self):
+        with pytest.raises(ValueError, match="unknown cache memory policy"):
+            BookCache(redis=None, memory_policy="fifo")
@@ -0,0 +1,42 @@
+from unittest.mock import AsyncMock
+
+from app.cache.book import BookCache
+from app.cache.entity import NOT_FOUND
+from app.cache.user import SCHEMA_VERSION, CachedUser, UserCache
+from app.db.models.book import Book
+from app.db.models.user import User
+from app.schemas.user import UserResponse
+
+
+class TestCachedUser:
+    def test_body_matches_response_model(self):
+        user = CachedUser(id=1, name="Capitu", email="capitu@example.com")
+
+        expected = UserResponse(id=1, name="Capitu", email="capitu@example.com")
+
+        assert user.body == expected.model_dump_json().encode()
+
+
+class TestUserCache:
+    async def test_roundtrips_through_redis(self, fake_redis):
+        writer = UserCache(fake_redis)
+        await writer.set(User(id=1, name="Capitu", email="capitu@example.com"))
+
+        cached = await UserCache(fake_redis).get(1)
+
+        assert f"user:v{SCHEMA_VERSION}:1" in fake_redis.data
+        assert cached == CachedUser(id=1, name="Capitu", email="capitu@example.com")
+
+    async def test_namespaces_do_not_collide(self, fake_redis):
+        await BookCache(fake_redis).set(Book(id=1, title="Dom Casmurro", author="A"))
+
+        assert await UserCache(fake_redis).get(1) is None
+
+    async def test_fetch_loads_once_and_honours_tombstones(self):
+        cache = UserCache(redis=None)
+        load = AsyncMock(return_value=None)
+
+        assert await cache.fetch(1, load) is None
+        assert await cache.get(1) is NOT_FOUND
+        assert await cache.fetch(1, load) is None
+        load.assert_awaited_once()
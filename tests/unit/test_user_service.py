@@ -1,26 +1,34 @@
+import asyncio
 from unittest.mock import AsyncMock
 
 import pytest
 
-from app.db.models.loan import Loan
+from app.cache.user import CachedUser, UserCache
 from app.db.models.user import User
+from app.db.transaction import commit, rollback
 from app.exceptions.domain import EmailAlreadyRegistered, UserNotFound
 from app.services.user import UserService
 
 
 @pytest.fixture
-def mock_user_repo():
-    return AsyncMock()
+def mock_user_repo(session):
+    repo = AsyncMock()
+    repo.session = session
+    return repo
 
 
 @pytest.fixture
-def user_service(mock_user_repo):
-    return UserService(users=mock_user_repo)
+def user_cache():
+    return UserCache(redis=None)
+
+
+@pytest.fixture
+def user_service(mock_user_repo, user_cache):
+    return UserService(users=mock_user_repo, cache=user_cache)
 
 
 class TestUserServiceCreate:
     async def test_create_success(self, user_service, mock_user_repo):
-        mock_user_repo.get_by_email.return_value = None
         mock_user_repo.create.return_value = User(
             id=1, name="Test", email="test@email.com"
         )
@@ -30,80 +38,138 @@ class TestUserServiceCreate:
         assert result.id == 1
         assert result.name == "Test"
         assert result.email == "test@email.com"
-        mock_user_repo.get_by_email.assert_called_once_with("test@email.com")
-        mock_user_repo.create.assert_called_once()
+        mock_user_repo.create.assert_called_once_with(
+            name="Test", email="test@email.com"
+        )
+        mock_user_repo.get_by_email.assert_not_called()
 
-    async def test_create_email_already_registered(self, user_service, mock_user_repo):
-        mock_user_repo.get_by_email.return_value = User(
-            id=1, name="Existing", email="test@email.com"
+    async def test_create_clears_tombstone(self, user_service, mock_user_repo):
+        mock_user_repo.get_cached_by_id.return_value = None
+        with pytest.raises(UserNotFound):
+            await user_service.get_by_id(1)
+
+        mock_user_repo.create.return_value = User(
+            id=1, name="Test", email="test@email.com"
         )
+        await user_service.create(name="Test", email="test@email.com")
+        await commit(mock_user_repo.session)
+
+        result = await user_service.get_by_id(1)
+
+        assert result == CachedUser(id=1, name="Test", email="test@email.com")
+        mock_user_repo.get_cached_by_id.assert_called_once_with(1)
+
+    async def test_cache_written_only_after_commit(
+        self, user_service, mock_user_repo, user_cache
+    ):
+        mock_user_repo.create.return_value = User(
+            id=1, name="Test", email="test@email.com"
+        )
+
+        await user_service.create(name="Test", email="test@email.com")
+        assert await user_cache.get(1) is None
+
+        await commit(mock_user_repo.session)
+        assert await user_cache.get(1) == CachedUser(
+            id=1, name="Test", email="test@email.com"
+        )
+
+    async def test_rollback_leaves_cache_untouched(
+        self, user_service, mock_user_repo, user_cache
+    ):
+        mock_user_repo.create.return_value = User(
+            id=1, name="Test", email="test@email.com"
+        )
+
+        await user_service.create(name="Test", email="test@email.com")
+        await rollback(mock_user_repo.session)
+        await commit(mock_user_repo.session)
+
+        assert await user_cache.get(1) is None
+
+    async def test_create_email_already_registered(self, user_service, mock_user_repo):
+        mock_user_repo.create.return_value = None
 
         with pytest.raises(EmailAlreadyRegistered) as exc_info:
             await user_service.create(name="Test", email="test@email.com")
 
         assert exc_info.value.context["email"] == "test@email.com"
-        mock_user_repo.create.assert_not_called()
 
 
 class TestUserServiceGetById:
     async def test_get_by_id_success(self, user_service, mock_user_repo):
-        mock_user_repo.get_by_id.return_value = User(
+        mock_user_repo.get_cached_by_id.return_value = CachedUser(
             id=1, name="Test", email="test@email.com"
         )
 
         result = await user_service.get_by_id(1)
 
         assert result.id == 1
-        mock_user_repo.get_by_id.assert_called_once_with(1)
+        mock_user_repo.get_cached_by_id.assert_called_once_with(1)
 
     async def test_get_by_id_not_found(self, user_service, mock_user_repo):
-        mock_user_repo.get_by_id.return_value = None
+        mock_user_repo.get_cached_by_id.return_value = None
 
         with pytest.raises(UserNotFound) as exc_info:
             await user_service.get_by_id(999)
 
         assert exc_info.value.context["user_id"] == 999
 
+    async def test_get_by_id_reuses_cache(self, user_service, mock_user_repo):
+        mock_user_repo.get_cached_by_id.return_value = CachedUser(
+            id=1, name="Test", email="test@email.com"
+        )
 
-class TestUserServiceListAll:
-    async def test_list_all(self, user_service, mock_user_repo):
-        mock_user_repo.list.return_value = [
-            User(id=1, name="User 1", email="user1@email.com"),
-            User(id=2, name="User 2", email="user2@email.com"),
-        ]
+        await user_service.get_by_id(1)
+        result = await user_service.get_by_id(1)
 
-        result = await user_service.list_all(offset=0, limit=10)
+        assert result.id == 1
+        mock_user_repo.get_cached_by_id.assert_called_once_with(1)
 
-        assert len(result) == 2
-        mock_user_repo.list.assert_called_once_with(offset=0, limit=10)
+    async def test_get_by_id_coalesces_concurrent_misses(
+        self, user_service, mock_user_repo
+    ):
+        release = asyncio.Event()
 
-    async def test_list_all_empty(self, user_service, mock_user_repo):
-        mock_user_repo.list.return_value = []
+        async def slow_get_cached_by_id(user_id):
+            await release.wait()
+            return CachedUser(id=user_id, name="Test", email="test@email.com")
 
-        result = await user_service.list_all(offset=0, limit=10)
+        mock_user_repo.get_cached_by_id.side_effect = slow_get_cached_by_id
 
-        assert len(result) == 0
+        tasks = [asyncio.create_task(user_service.get_by_id(1)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks)
 
+        assert {r.id for r in results} == {1}
+        mock_user_repo.get_cached_by_id.assert_called_once_with(1)
 
-class TestUserServiceGetLoans:
-    async def test_get_loans_success(self, user_service, mock_user_repo):
-        mock_user_repo.get_by_id.return_value = User(
-            id=1, name="Test", email="test@email.com"
-        )
-        mock_user_repo.get_loans.return_value = [
-            Loan(id=1, user_id=1, copy_id=1),
-            Loan(id=2, user_id=1, copy_id=2),
+    async def test_get_by_id_not_found_is_cached(self, user_service, mock_user_repo):
+        mock_user_repo.get_cached_by_id.return_value = None
+
+        for _ in range(2):
+            with pytest.raises(UserNotFound):
+                await user_service.get_by_id(999)
+
+        mock_user_repo.get_cached_by_id.assert_called_once_with(999)
+
+
+class TestUserServiceListAll:
+    async def test_list_all(self, user_service, mock_user_repo):
+        mock_user_repo.list_rows.return_value = [
+            User(id=1, name="User 1", email="user1@email.com"),
+            User(id=2, name="User 2", email="user2@email.com"),
         ]
 
-        result = await user_service.get_loans(1)
+        result = await user_service.list_all(after=None, limit=10)
 
         assert len(result) == 2
-        mock_user_repo.get_loans.assert_called_once_with(1)
+        mock_user_repo.list_rows.assert_called_once_with(after=None, limit=10)
 
-    async def test_get_loans_user_not_found(self, user_service, mock_user_repo):
-        mock_user_repo.get_by_id.return_value = None
+    async def test_list_all_empty(self, user_service, mock_user_repo):
+        mock_user_repo.list_rows.return_value = []
 
-        with pytest.raises(UserNotFound):
-            await user_service.get_loans(999)
+        result = await user_service.list_all(after=None, limit=10)
 
-        mock_user_repo.get_loans.assert_not_called()
+        assert len(result) == 0